@@ -2,6 +2,7 @@ import os
 from dotenv import load_dotenv
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+import query_monitor
 
 # Environment variables load kar rahe hain .env file se
 load_dotenv()
@@ -12,6 +13,9 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 # Engine bana rahe hain jo actual connection maintain karega database ke sath
 engine = create_engine(DATABASE_URL)
 
+# Har request ki query count/time + slow query log (query_monitor.py dekho)
+query_monitor.install(engine)
+
 # SessionLocal class: Jab bhi humein DB se baat karni hogi, hum iska instance banayenge
 # autocommit=False rakha hai taaki hum khud decide karein kab save karna hai
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -1,9 +1,14 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Query, Header
+from fastapi.responses import JSONResponse, PlainTextResponse
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Any
+from typing import List, Any, Optional
+import asyncio
 import os
-from database import create_db
+from contextlib import asynccontextmanager
+from database import engine
+from migrations import check_schema_version
+import query_monitor
+import policy_audit
 import modal.todo as models
 import modal.user as user_models
 import schema.todo as schemas
@@ -20,20 +25,46 @@ from utils import (
     get_db,
     # RoleChecker, # We will use PolicyChecker now
 )
+import policy_engine as pe
 from policy_engine import Action, ResourceType
-from policies import PolicyChecker
-import uvicorn
-import pyotp
-import qrcode
-import io
-import base64
-import random
-import string
-from utils_email import send_welcome_email
+from policies import (
+    PolicyChecker,
+    UserPolicyChecker,
+    can_many,
+    invalidate_todo_meta,
+    set_todo_meta,
+)
 from utils_cache import cache
+from services.login_history import record_login, get_login_stats
+from services.ai_insights import bump_todo_version
+from modal.user import LoginStatus
 from datetime import datetime
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tables ab migrations banati hain (scripts/migrate_db.py).
+    # Boot par sirf recorded schema version check hota hai — koi DDL nahi.
+    check_schema_version(engine)
+    from services.email_outbox import EMAIL_OUTBOX_WORKER_ENABLED, outbox
+
+    if EMAIL_OUTBOX_WORKER_ENABLED:
+        outbox.start()  # Restart se pehle ki pending/retry mails bhi
+    yield
+    await asyncio.to_thread(outbox.close)  # Worker thread join blocking hai — loop par nahi
+    from services.user_provisioning import shutdown_hash_pool
+
+    shutdown_hash_pool()
+    from services.ai_jobs import job_queue
+
+    await job_queue.stop()  # AI workers band
+    policy_audit.sink.close()  # Pending audit records flush
+    from services.http_pool import aclose_all
+
+    await aclose_all()  # Pooled LLM connections band karo
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 # Custom Exception Handler to match Node.js error format ({"error": "message"})
@@ -42,6 +73,7 @@ async def custom_http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"error": exc.detail},
+        headers=exc.headers,  # e.g. Retry-After (429), WWW-Authenticate (401)
     )
 
 
@@ -57,11 +89,21 @@ app.add_middleware(
     allow_credentials=_cors_raw.strip() != "*",
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "X-DB-Time"],
 )
 
-# Start hote hi database tables create kar dega agar nahi hain
-create_db()
 
+# Per-request DB query count/time — response headers mein bhejte hain
+@app.middleware("http")
+async def db_query_metrics(request: Request, call_next):
+    stats, token = query_monitor.start_request(request.url.path)
+    try:
+        response = await call_next(request)
+    finally:
+        query_monitor.end_request(token)
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers["X-DB-Time"] = f"{stats.total_ms:.2f}"
+    return response
 
 @app.get("/", tags=["Health"])
 def home():
@@ -76,17 +118,15 @@ def health():
 # --- Auth Routes (Login/Signup) ---
 
 
-# Helper to log context
+# Helper to log context (history row + daily rollup)
 def log_login_context(db: Session, user_id: int, request: Request, status: str):
-    history = user_models.LoginHistory(
-        user_id=user_id,
-        ip_address=request.client.host,
+    record_login(
+        db,
+        user_id,
+        status,
+        ip_address=request.client.host if request.client else None,
         user_agent=request.headers.get("user-agent"),
-        status=status,
-        timestamp=datetime.utcnow(),
     )
-    db.add(history)
-    db.commit()
 
 
 @app.post("/register", response_model=user_schemas.Token, tags=["Auth"])
@@ -125,7 +165,9 @@ async def login(
 
     # Agar user nahi mila ya password galat hai to error
     if not user or not verify_password(form_data.password, user.password):
-        # Security: Log failed attempt (Optional implementation)
+        # Security: Known user ka failed attempt log karo (rollup mein count hota hai)
+        if user:
+            log_login_context(db, user.id, request, LoginStatus.FAILED)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -134,7 +176,10 @@ async def login(
 
     # Context Logging
     log_login_context(
-        db, user.id, request, "MFA_PENDING" if user.mfa_enabled else "SUCCESS"
+        db,
+        user.id,
+        request,
+        LoginStatus.MFA_PENDING if user.mfa_enabled else LoginStatus.SUCCESS,
     )
 
     # MFA Logic
@@ -164,6 +209,12 @@ async def mfa_setup(
     db: Session = Depends(get_db),
     current_user: user_models.User = Depends(get_current_user),
 ):
+    # Lazy imports: MFA setup rare hai, qrcode/PIL cold start mein load nahi karne
+    import base64
+    import io
+    import pyotp
+    import qrcode
+
     # Generate new Secret
     secret = pyotp.random_base32()
 
@@ -190,6 +241,8 @@ async def mfa_verify(
     db: Session = Depends(get_db),
     current_user: user_models.User = Depends(get_current_user),
 ):
+    import pyotp
+
     if not current_user.mfa_secret:
         raise HTTPException(
             status_code=400, detail="MFA setup not initiated. Call /setup first."
@@ -216,6 +269,8 @@ async def mfa_login(
     db: Session = Depends(get_db),
     current_user: user_models.User = Depends(get_current_user),
 ):
+    import pyotp
+
     if not current_user.mfa_enabled:
         raise HTTPException(status_code=400, detail="MFA not enabled for user")
 
@@ -268,11 +323,15 @@ def login_for_access_token(
 
 
 @app.post("/admin/users", tags=["Admin"])
-async def create_user_by_admin(
+def create_user_by_admin(
     user_data: user_schemas.UserCreate,
     db: Session = Depends(get_db),
     _: user_models.User = Depends(PolicyChecker(Action.UPDATE, ResourceType.USER)),
 ):
+    from utils_email import WELCOME_SUBJECT, welcome_email_html
+    from services.email_outbox import outbox, queue_email
+    from services.user_provisioning import temp_password
+
     # Check if user already exists
     if (
         db.query(user_models.User)
@@ -284,7 +343,7 @@ async def create_user_by_admin(
         )
 
     # Generare Random Password
-    raw_password = "".join(random.choices(string.ascii_letters + string.digits, k=10))
+    raw_password = temp_password()
     hashed = get_password_hash(raw_password)
 
     new_user = user_models.User(
@@ -294,23 +353,63 @@ async def create_user_by_admin(
         role=user_data.role,  # "USER" or "ADMIN"
     )
     db.add(new_user)
+    # Welcome mail outbox mein, user ke saath same commit — SMTP background worker karta hai
+    email = queue_email(
+        db, user_data.email, WELCOME_SUBJECT, welcome_email_html(user_data.email, raw_password)
+    )
     db.commit()
+    outbox.notify()
 
-    # Send Email
-    email_success = await send_welcome_email(user_data.email, raw_password)
+    # Delivery fail ho to: GET /admin/emails/{emailId}, phir reset-password
+    return {
+        "message": "User created successfully. Welcome email queued.",
+        "userId": new_user.id,
+        "emailId": email.id,
+    }
 
-    if email_success:
-        return {
-            "message": "User created successfully. Email sent.",
-            "userId": new_user.id,
-        }
-    else:
-        # Fallback for when email fails (e.g. invalid credentials)
-        return {
-            "message": "User created, but email failed. Here is the temp password:",
-            "userId": new_user.id,
-            "temp_password": raw_password,
-        }
+
+_BULK_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/json-lines": "jsonl",
+}
+
+
+@app.post("/admin/users/bulk", tags=["Admin"])
+async def bulk_create_users_by_admin(
+    request: Request,
+    format: str | None = Query(None, pattern="^(csv|jsonl)$"),
+    db: Session = Depends(get_db),
+    _: user_models.User = Depends(PolicyChecker(Action.UPDATE, ResourceType.USER)),
+):
+    """
+    CSV (header: email,name,role) ya JSON lines, raw request body mein stream karo.
+    Har row ka result milta hai; welcome mails outbox se jaati hain.
+    """
+    from tempfile import SpooledTemporaryFile
+    from starlette.concurrency import run_in_threadpool
+    from services.user_provisioning import BULK_USER_MAX_BYTES, provision_users
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = format or _BULK_CONTENT_TYPES.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=415, detail="Send text/csv or application/x-ndjson (or ?format=)"
+        )
+
+    # Body chunk-by-chunk spool — 10k rows bhi poori memory mein ek saath nahi
+    with SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > BULK_USER_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="Upload too large")
+            spool.write(chunk)
+        spool.seek(0)
+        # bcrypt + DB kaam event loop se bahar; hashing process pool mein
+        return await run_in_threadpool(provision_users, db, spool, fmt)
 
 
 @app.get("/admin/users", response_model=List[user_schemas.UserRead], tags=["Admin"])
@@ -328,7 +427,7 @@ def get_users_by_admin(
 def delete_user_by_admin(
     user_id: int,
     db: Session = Depends(get_db),
-    _: user_models.User = Depends(PolicyChecker(Action.DELETE, ResourceType.USER)),
+    _: user_models.User = Depends(UserPolicyChecker(Action.DELETE)),
 ):
     user = db.query(user_models.User).filter(user_models.User.id == user_id).first()
     if not user:
@@ -338,6 +437,7 @@ def delete_user_by_admin(
     db.query(models.Todo).filter(models.Todo.user_id == user_id).delete()
     db.delete(user)
     db.commit()
+    cache.clear_all()  # Deleted todos ka cached metadata bhi hatao
     return {"message": "User deleted successfully"}
 
 
@@ -348,7 +448,7 @@ def update_user_by_admin(
     user_id: int,
     user_update: user_schemas.UserUpdate,
     db: Session = Depends(get_db),
-    _: user_models.User = Depends(PolicyChecker(Action.UPDATE, ResourceType.USER)),
+    _: user_models.User = Depends(UserPolicyChecker(Action.UPDATE)),
 ):
     db_user = db.query(user_models.User).filter(user_models.User.id == user_id).first()
     if not db_user:
@@ -364,6 +464,117 @@ def update_user_by_admin(
     return db_user
 
 
+@app.post("/admin/users/{user_id}/reset-password", tags=["Admin"])
+def reset_password_by_admin(
+    user_id: int,
+    deliver: bool = Query(True, description="false = don't email, return the temp password"),
+    db: Session = Depends(get_db),
+    _: user_models.User = Depends(UserPolicyChecker(Action.UPDATE)),
+):
+    """
+    Naya temp password. Welcome/reset mail permanently fail ho gayi ho (outbox
+    body scrub kar deta hai) to yahi recovery path hai; `deliver=false` par
+    password response mein — admin khud share kare.
+    """
+    from utils_email import PASSWORD_RESET_SUBJECT, password_reset_email_html
+    from services.email_outbox import outbox, queue_email
+    from services.user_provisioning import temp_password
+
+    db_user = db.query(user_models.User).filter(user_models.User.id == user_id).first()
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    raw_password = temp_password()
+    db_user.password = get_password_hash(raw_password)
+    if not deliver:
+        db.commit()
+        return {
+            "message": "Password reset. No email sent — here is the temp password:",
+            "userId": user_id,
+            "temp_password": raw_password,
+        }
+
+    email = queue_email(
+        db,
+        db_user.email,
+        PASSWORD_RESET_SUBJECT,
+        password_reset_email_html(db_user.email, raw_password),
+    )
+    db.commit()
+    outbox.notify()
+    return {"message": "Password reset. Email queued.", "userId": user_id, "emailId": email.id}
+
+
+@app.get("/admin/emails/{email_id}", tags=["Admin"])
+def get_email_status_by_admin(
+    email_id: int,
+    db: Session = Depends(get_db),
+    _: user_models.User = Depends(PolicyChecker(Action.READ, ResourceType.SYSTEM)),
+):
+    from modal.email import EmailOutbox
+
+    row = db.query(EmailOutbox).filter(EmailOutbox.id == email_id).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Email not found")
+    return {
+        "emailId": row.id,
+        "to": row.to_address,
+        "subject": row.subject,
+        "status": row.status,
+        "attempts": row.attempts,
+        "lastError": row.last_error,
+        "createdAt": row.created_at,
+        "sentAt": row.sent_at,
+    }
+
+
+@app.get("/admin/users/{user_id}/login-stats", tags=["Admin"])
+def get_login_stats_by_admin(
+    user_id: int,
+    days: int = Query(30, ge=1, le=366),
+    db: Session = Depends(get_db),
+    _: user_models.User = Depends(UserPolicyChecker(Action.READ)),
+):
+    # Precomputed LoginRollup se padhta hai — history table scan nahi hota
+    return get_login_stats(db, user_id, days)
+
+
+@app.get("/admin/policy-audit/stats", tags=["Admin"])
+def get_policy_audit_stats(
+    _: user_models.User = Depends(PolicyChecker(Action.READ, ResourceType.SYSTEM)),
+):
+    # Sampled/dropped/written counters of the async audit writer
+    return policy_audit.sink.stats()
+
+
+@app.get("/admin/metrics", tags=["Admin"])
+def get_metrics(
+    format: str = Query("json", pattern="^(json|prometheus)$"),
+    _: user_models.User = Depends(PolicyChecker(Action.READ, ResourceType.SYSTEM)),
+):
+    from services.llm_metrics import metrics
+    from services.llm_client import coalescing_stats
+    from services.llm_cache import response_cache
+    from services.circuit_breaker import snapshot_all
+    from services.ai_jobs import job_queue
+    from services.prompt_builder import prompt_stats
+    from services.email_outbox import outbox
+
+    # Prometheus scrape ke liye text format (sirf LLM histograms/counters)
+    if format == "prometheus":
+        return PlainTextResponse(metrics.render_prometheus())
+    return {
+        "llm": metrics.snapshot(),
+        "cache": response_cache.stats(),
+        "circuits": snapshot_all(),
+        "coalescing": coalescing_stats(),
+        "jobs": job_queue.stats(),
+        "prompts": prompt_stats.snapshot(),
+        "policyAudit": policy_audit.sink.stats(),
+        "emailOutbox": outbox.stats(),
+    }
+
+
 # --- Todo Routes (Protected) ---
 # Yahan "current_user" dependency use kar rahe hain, matlab bina login kiye ye nahi chalega
 
@@ -374,7 +585,6 @@ def read_todos(
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: user_models.User = Depends(get_current_user),
-    _: Any = Depends(PolicyChecker(Action.READ, ResourceType.TODO)),
 ):
     # Cache Key
     cache_key = f"todos:{current_user.id}:{skip}:{limit}"
@@ -384,16 +594,14 @@ def read_todos(
 
     # Query base: Sirf top-level todos la rahe hain (jinka koi parent nahi hai)
     # joinedload use kar rahe hain taaki owner details bhi saath mein mil jayein
+    # Authorization SQL mein hi: policy engine ka READ predicate (admin = sab, user = apne)
     query = (
         db.query(models.Todo)
         .options(joinedload(models.Todo.owner))
         .filter(models.Todo.parent_id.is_(None))
+        .filter(pe.predicate(current_user, Action.READ, ResourceType.TODO))
     )
 
-    # Agar user ADMIN nahi hai, toh sirf uske apne todos dikhao
-    if current_user.role != "ADMIN":
-        query = query.filter(models.Todo.user_id == current_user.id)
-
     todos = query.offset(skip).limit(limit).all()
 
     # Set Cache
@@ -412,6 +620,7 @@ def create_todo(
     # Naya todo bana rahe hain, user_id automatically current user ki daal rahe hain
     db_todo = models.Todo(**todo.dict(), user_id=current_user.id)
     db.add(db_todo)
+    bump_todo_version(db, current_user.id)  # Stored AI briefing/coach ab stale
     db.commit()
     db.refresh(db_todo)
 
@@ -438,11 +647,14 @@ def update_todo(
 
     # Increment Version (Etag)
     db_todo.version += 1
+    bump_todo_version(db, db_todo.user_id)
 
     db.commit()
     db.refresh(db_todo)
 
     cache.clear_all()  # Invalidate Cache
+    # Naya version turant cache mein, taaki bulk can_many ko DB na jana pade
+    set_todo_meta(pe.ResourceMeta(db_todo.id, db_todo.user_id, db_todo.version))
 
     return db_todo
 
@@ -453,89 +665,435 @@ def delete_todo(
     db: Session = Depends(get_db),
     target_todo: models.Todo = Depends(PolicyChecker(Action.DELETE, ResourceType.TODO)),
 ):
+    bump_todo_version(db, target_todo.user_id)
     db.delete(target_todo)
     db.commit()
 
     cache.clear_all()  # Invalidate Cache
+    invalidate_todo_meta(todo_id)
 
     return {"ok": True}
 
 
+@app.post("/todos/bulk-delete", tags=["Todos"])
+def bulk_delete_todos(
+    body: schemas.TodoBulkDelete,
+    db: Session = Depends(get_db),
+    current_user: user_models.User = Depends(get_current_user),
+):
+    # Saari ids ka authorization ek IN query mein (per-todo PolicyChecker nahi)
+    allowed, denied = can_many(
+        db, current_user, Action.DELETE, ResourceType.TODO, body.ids
+    )
+    deleted = []
+    if allowed:
+        # ORM delete taaki children cascade ho jayein. allowed stale cached meta se
+        # aa sakta hai — loaded row par dobara check, aur sirf wahi ids report
+        owners = set()
+        for todo in db.query(models.Todo).filter(models.Todo.id.in_(allowed)):
+            if not pe.can(current_user, Action.DELETE, ResourceType.TODO, todo):
+                continue
+            db.delete(todo)
+            deleted.append(todo.id)
+            owners.add(todo.user_id)
+        for owner_id in owners:
+            bump_todo_version(db, owner_id)
+        db.commit()
+        # Todo lists + resource meta dono isi cache mein — ek hi invalidation
+        cache.clear_all()
+
+    # Jo ids exist nahi karti (ya ab allowed nahi) wo denied, can_many jaisa
+    denied = set(body.ids) - set(deleted)
+    return {"deleted": sorted(deleted), "denied": sorted(denied)}
+
+
 # --- AI Routes (proxy — API keys stay on server) ---
 
 
-@app.post("/ai/split", response_model=ai_schemas.AISplitResponse, tags=["AI"])
-def ai_split_route(
+# `Prefer: respond-async` wale clients ke liye: itni der result ka wait, phir 202 + jobId
+AI_JOB_WAIT_SECONDS = float(os.getenv("AI_JOB_WAIT_SECONDS", "30"))
+
+# OpenAPI: opt-in 202 ka shape (response_model sirf 200 ka hai)
+_AI_ASYNC_RESPONSES = {
+    202: {
+        "description": "Sent only with `Prefer: respond-async`: job still running, "
+        'body is {"jobId", "status", "poll"} — poll GET /ai/jobs/{jobId}'
+    }
+}
+
+
+def prefers_async(prefer: Optional[str] = Header(None)) -> bool:
+    """RFC 7240 `Prefer: respond-async` — client 202 + poll handle kar sakta hai."""
+    return prefer is not None and "respond-async" in prefer.lower()
+
+
+async def _run_charged(user_id: int, cost: int, call, units: int = 1):
+    """
+    Job worker ke andar: cost pehle hi kat chuka hai. Provider tak call gaya hi
+    nahi (poora cache hit / invalid input) to refund. Merged batch mein sirf
+    provider tak gaye items ka charge — baaki units wapas.
+    """
+    from services.ai_rate_limit import refund
+    from services.llm_client import track_llm_calls
+
+    with track_llm_calls() as calls:
+        try:
+            return await call()
+        finally:
+            if calls.provider_calls == 0:
+                await refund(user_id, cost)
+            elif calls.unbilled_units:
+                await refund(user_id, cost // units * min(calls.unbilled_units, units))
+
+
+async def _submit_ai_job(user_id: int, kind: str, call, priority: int, units: int = 1):
+    from services.ai_jobs import job_queue
+    from services.ai_rate_limit import consume_or_raise, refund
+
+    # Check + consume atomic; limit khatam ho to queue slot hi mat lo
+    cost = await consume_or_raise(user_id, kind, units)
+    try:
+        return await job_queue.submit(
+            user_id, kind, lambda: _run_charged(user_id, cost, call, units), priority
+        )
+    except HTTPException:
+        await refund(user_id, cost)  # Queue full — job bana hi nahi
+        raise
+
+
+async def _charged_ai_call(user_id: int, kind: str, call, respond_async: bool = False):
+    """
+    AI call ko bounded job pool se chalao (CRUD threadpool/loop LLM latency se
+    alag rehta hai). Default: result aane tak wait (route ka response_model hi
+    milta hai). `respond_async` par sirf AI_JOB_WAIT_SECONDS, phir 202 + jobId.
+    """
+    from services.ai_jobs import job_queue, DONE, FAILED, PRIORITY_INTERACTIVE
+
+    job = await _submit_ai_job(user_id, kind, call, PRIORITY_INTERACTIVE)
+    await job_queue.wait(job, AI_JOB_WAIT_SECONDS if respond_async else None)
+    if job.status == DONE:
+        return job.result
+    if job.status == FAILED:
+        raise HTTPException(status_code=job.error[0], detail=job.error[1])
+    # Abhi bhi queue/running — client /ai/jobs/{id} poll kare
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={"jobId": job.id, "status": job.status, "poll": f"/ai/jobs/{job.id}"},
+    )
+
+
+def _ai_job_call(user_id: int, kind: str, payload: dict):
+    """Job kind + raw payload -> validated LLM call (same schemas as /ai/* routes)."""
+    from services.ai_insights import briefing_for_user, coach_for_user
+    from services.llm_client import ai_boss_lore, ai_parse_task, ai_split
+
+    if kind == "split":
+        body = ai_schemas.AISplitRequest.model_validate(payload)
+        return lambda: ai_split(body.text)
+    if kind == "coach":
+        body = ai_schemas.AICoachRequest.model_validate(payload)
+        return lambda: coach_for_user(user_id, body.todos, body.focusTaskId)
+    if kind == "boss-lore":
+        body = ai_schemas.AIBossLoreRequest.model_validate(payload)
+        return lambda: ai_boss_lore(body.taskText, body.subtaskCount, body.progress)
+    if kind == "briefing":
+        body = ai_schemas.AIBriefingRequest.model_validate(payload)
+        return lambda: briefing_for_user(user_id, body.todos, body.userName)
+    body = ai_schemas.AIParseTaskRequest.model_validate(payload)
+    return lambda: ai_parse_task(body.input)
+
+
+@app.post(
+    "/ai/split",
+    response_model=ai_schemas.AISplitResponse,
+    responses=_AI_ASYNC_RESPONSES,
+    tags=["AI"],
+)
+async def ai_split_route(
     body: ai_schemas.AISplitRequest,
     current_user: user_models.User = Depends(get_ai_user),
+    respond_async: bool = Depends(prefers_async),
 ):
-    from services.ai_rate_limit import check_rate_limit, increment_rate_limit
     from services.llm_client import ai_split
 
-    check_rate_limit(current_user.id)
-    increment_rate_limit(current_user.id)
-    return ai_split(body.text)
+    return await _charged_ai_call(
+        current_user.id, "split", lambda: ai_split(body.text), respond_async
+    )
 
 
-@app.post("/ai/coach", response_model=ai_schemas.AICoachResponse, tags=["AI"])
-def ai_coach_route(
+@app.post(
+    "/ai/coach",
+    response_model=ai_schemas.AICoachResponse,
+    responses=_AI_ASYNC_RESPONSES,
+    tags=["AI"],
+)
+async def ai_coach_route(
     body: ai_schemas.AICoachRequest,
     current_user: user_models.User = Depends(get_ai_user),
+    respond_async: bool = Depends(prefers_async),
 ):
-    from services.ai_rate_limit import check_rate_limit, increment_rate_limit
-    from services.llm_client import ai_coach
+    from services.ai_insights import coach_for_user
 
-    check_rate_limit(current_user.id)
-    increment_rate_limit(current_user.id)
-    try:
-        return ai_coach(body.todos, body.focusTaskId)
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
+    return await _charged_ai_call(
+        current_user.id,
+        "coach",
+        lambda: coach_for_user(current_user.id, body.todos, body.focusTaskId),
+        respond_async,
+    )
 
 
-@app.post("/ai/boss-lore", response_model=ai_schemas.AIBossLoreResponse, tags=["AI"])
-def ai_boss_lore_route(
+@app.post(
+    "/ai/boss-lore",
+    response_model=ai_schemas.AIBossLoreResponse,
+    responses=_AI_ASYNC_RESPONSES,
+    tags=["AI"],
+)
+async def ai_boss_lore_route(
     body: ai_schemas.AIBossLoreRequest,
     current_user: user_models.User = Depends(get_ai_user),
+    respond_async: bool = Depends(prefers_async),
 ):
-    from services.ai_rate_limit import check_rate_limit, increment_rate_limit
     from services.llm_client import ai_boss_lore
 
-    check_rate_limit(current_user.id)
-    increment_rate_limit(current_user.id)
-    return ai_boss_lore(body.taskText, body.subtaskCount, body.progress)
+    return await _charged_ai_call(
+        current_user.id,
+        "boss-lore",
+        lambda: ai_boss_lore(body.taskText, body.subtaskCount, body.progress),
+        respond_async,
+    )
 
 
-@app.post("/ai/briefing", response_model=ai_schemas.AIBriefingResponse, tags=["AI"])
-def ai_briefing_route(
+@app.post(
+    "/ai/briefing",
+    response_model=ai_schemas.AIBriefingResponse,
+    responses=_AI_ASYNC_RESPONSES,
+    tags=["AI"],
+)
+async def ai_briefing_route(
     body: ai_schemas.AIBriefingRequest,
     current_user: user_models.User = Depends(get_ai_user),
+    respond_async: bool = Depends(prefers_async),
 ):
-    from services.ai_rate_limit import check_rate_limit, increment_rate_limit
-    from services.llm_client import ai_briefing
-
-    check_rate_limit(current_user.id)
-    increment_rate_limit(current_user.id)
-    return ai_briefing(body.todos, body.userName)
+    from services.ai_insights import briefing_for_user
+
+    # Same todos payload (aur todo_version same) ho to stored briefing turant
+    return await _charged_ai_call(
+        current_user.id,
+        "briefing",
+        lambda: briefing_for_user(current_user.id, body.todos, body.userName),
+        respond_async,
+    )
 
 
-@app.post("/ai/parse-task", response_model=ai_schemas.AIParseTaskResponse, tags=["AI"])
-def ai_parse_task_route(
+@app.post(
+    "/ai/parse-task",
+    response_model=ai_schemas.AIParseTaskResponse,
+    responses=_AI_ASYNC_RESPONSES,
+    tags=["AI"],
+)
+async def ai_parse_task_route(
     body: ai_schemas.AIParseTaskRequest,
     current_user: user_models.User = Depends(get_ai_user),
+    respond_async: bool = Depends(prefers_async),
 ):
-    from services.ai_rate_limit import check_rate_limit, increment_rate_limit
     from services.llm_client import ai_parse_task
 
-    check_rate_limit(current_user.id)
-    increment_rate_limit(current_user.id)
-    return ai_parse_task(body.input)
+    return await _charged_ai_call(
+        current_user.id, "parse-task", lambda: ai_parse_task(body.input), respond_async
+    )
+
+
+async def _charged_ai_stream(user_id: int, kind: str, make_events):
+    """
+    SSE response: cost upfront atomically kaato; stream khatam (ya disconnect)
+    hone par refund agar provider tak call gaya hi nahi (poora cache hit).
+    """
+    from fastapi.responses import StreamingResponse
+    from services.ai_rate_limit import consume_or_raise, refund
+    from services.llm_client import LLMCallStats
+
+    stats = LLMCallStats()
+    events = make_events(stats)
+    cost = await consume_or_raise(user_id, kind)
+
+    async def body():
+        try:
+            async for chunk in events:
+                yield chunk
+        finally:
+            if stats.provider_calls == 0:
+                await refund(user_id, cost)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Streaming variants: `partial` events (fields jaise-jaise bante hain), phir `final`
+@app.post("/ai/briefing/stream", tags=["AI"])
+async def ai_briefing_stream_route(
+    body: ai_schemas.AIBriefingRequest,
+    current_user: user_models.User = Depends(get_ai_user),
+):
+    from services.llm_stream import briefing_events
+
+    return await _charged_ai_stream(
+        current_user.id,
+        "briefing",
+        lambda stats: briefing_events(body.todos, body.userName, stats),
+    )
+
+
+@app.post("/ai/coach/stream", tags=["AI"])
+async def ai_coach_stream_route(
+    body: ai_schemas.AICoachRequest,
+    current_user: user_models.User = Depends(get_ai_user),
+):
+    from services.llm_stream import coach_events
+
+    try:
+        return await _charged_ai_stream(
+            current_user.id,
+            "coach",
+            lambda stats: coach_events(body.todos, body.focusTaskId, stats),
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+# Fire-and-poll: job queue mein daalo, GET /ai/jobs/{id} se result lo
+def _batch_result(
+    item: ai_schemas.AIBatchItem, job, result=None, job_index: Optional[int] = None
+) -> dict:
+    from services.ai_jobs import DONE, FAILED
+
+    out = {"id": item.id, "kind": item.kind, "jobId": job.id, "jobIndex": job_index}
+    if job.status == DONE:
+        data = result if result is not None else job.result
+        return {**out, "status": "ok", "result": data.model_dump()}
+    if job.status == FAILED:
+        return {**out, "status": "error", "error": {"status": job.error[0], "detail": job.error[1]}}
+    return {**out, "status": "pending"}
+
+
+@app.post("/ai/batch", response_model=ai_schemas.AIBatchResponse, tags=["AI"])
+async def ai_batch_route(
+    body: ai_schemas.AIBatchRequest,
+    current_user: user_models.User = Depends(get_ai_user),
+):
+    """
+    Dashboard ke saare AI calls ek request mein. Boss-lore items ek hi provider
+    prompt mein merge hote hain; baaki apne apne job mein concurrently chalte hain.
+    Har item ka apna status — ek fail ho to baaki ka result phir bhi milta hai.
+    Merged boss-lore pending ho to sab items ka jobId same hai; us job ka result
+    {"items": [...]} hai aur item ka answer `items[jobIndex]` par.
+    """
+    from pydantic import ValidationError
+    from services.ai_jobs import job_queue, PRIORITY_INTERACTIVE
+    from services.llm_client import ai_boss_lore_many
+
+    user_id = current_user.id
+    results: List[Any] = [None] * len(body.items)
+    units = []  # (kind, item indexes, call)
+    lore = []  # (index, AIBossLoreRequest)
+
+    for i, item in enumerate(body.items):
+        try:
+            if item.kind == "boss-lore":
+                lore.append((i, ai_schemas.AIBossLoreRequest.model_validate(item.payload)))
+                continue
+            units.append((item.kind, [i], _ai_job_call(user_id, item.kind, item.payload)))
+        except ValidationError as exc:
+            results[i] = {
+                "id": item.id,
+                "kind": item.kind,
+                "status": "error",
+                "error": {"status": 422, "detail": exc.errors(include_url=False)},
+            }
+    if len(lore) == 1:
+        i = lore[0][0]
+        units.append(("boss-lore", [i], _ai_job_call(user_id, "boss-lore", body.items[i].payload)))
+    elif lore:
+        requests = [req for _, req in lore]
+        units.append(("boss-lore", [i for i, _ in lore], lambda: ai_boss_lore_many(requests)))
+
+    # Har unit apna charge + job; 429 / queue full sirf us unit ke items ko fail karta hai
+    jobs = []
+    for kind, indexes, call in units:
+        try:
+            job = await _submit_ai_job(
+                user_id, kind, call, PRIORITY_INTERACTIVE, units=len(indexes)
+            )
+        except HTTPException as exc:
+            for i in indexes:
+                results[i] = {
+                    "id": body.items[i].id,
+                    "kind": kind,
+                    "status": "error",
+                    "error": {"status": exc.status_code, "detail": exc.detail},
+                }
+            continue
+        jobs.append((job, indexes))
+
+    await asyncio.gather(*(job_queue.wait(job, AI_JOB_WAIT_SECONDS) for job, _ in jobs))
+    for job, indexes in jobs:
+        if len(indexes) > 1:
+            lore_results = job.result.items if job.result is not None else [None] * len(indexes)
+            for n, (i, lore_result) in enumerate(zip(indexes, lore_results)):
+                results[i] = _batch_result(body.items[i], job, lore_result, job_index=n)
+        else:
+            for i in indexes:
+                results[i] = _batch_result(body.items[i], job)
+    return {"results": results}
+
+
+@app.post(
+    "/ai/jobs",
+    response_model=ai_schemas.AIJobStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["AI"],
+)
+async def create_ai_job(
+    body: ai_schemas.AIJobRequest,
+    current_user: user_models.User = Depends(get_ai_user),
+):
+    from pydantic import ValidationError
+
+    try:
+        call = _ai_job_call(current_user.id, body.kind, body.payload)
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors(include_url=False))
+    job = await _submit_ai_job(current_user.id, body.kind, call, body.priority)
+    return job.to_dict()
+
+
+@app.get("/ai/jobs/{job_id}", response_model=ai_schemas.AIJobStatus, tags=["AI"])
+async def get_ai_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=30, description="Seconds to wait for completion"),
+    current_user: user_models.User = Depends(get_ai_user),
+):
+    from services.ai_jobs import job_queue
+
+    job = job_queue.get(job_id)
+    # Doosre user ka job 404 — existence leak nahi
+    if job is None or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    await job_queue.wait(job, wait)
+    return job.to_dict()
 
 
 @app.get("/ai/status", tags=["AI"])
 def ai_status(current_user: user_models.User = Depends(get_ai_user)):
-    from services.ai_rate_limit import get_remaining, DEFAULT_LIMIT
-    from services.llm_client import is_ai_configured, AI_PROVIDER, AI_MODEL
+    from services.ai_rate_limit import get_remaining, DEFAULT_LIMIT, ROUTE_COSTS
+    from services.llm_client import is_ai_configured, coalescing_stats, AI_PROVIDER, AI_MODEL
+    from services.llm_cache import response_cache
+    from services.circuit_breaker import snapshot_all
+    from services.ai_jobs import job_queue
+    from services.prompt_builder import prompt_stats
+    from services.llm_metrics import metrics
 
     return {
         "configured": is_ai_configured(),
@@ -543,8 +1101,17 @@ def ai_status(current_user: user_models.User = Depends(get_ai_user)):
         "model": AI_MODEL,
         "remainingToday": get_remaining(current_user.id),
         "dailyLimit": DEFAULT_LIMIT,
+        "routeCosts": ROUTE_COSTS,
+        "cache": response_cache.stats(),
+        "circuits": snapshot_all(),
+        "coalescing": coalescing_stats(),
+        "jobs": job_queue.stats(),
+        "prompts": prompt_stats.snapshot(),
+        "metrics": metrics.summary(),
     }
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
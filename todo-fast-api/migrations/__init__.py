@@ -0,0 +1,13 @@
+from migrations.runner import (
+    check_schema_version,
+    get_current_version,
+    latest_version,
+    run_migrations,
+)
+
+__all__ = [
+    "check_schema_version",
+    "get_current_version",
+    "latest_version",
+    "run_migrations",
+]
@@ -0,0 +1,110 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+
+# Migration building blocks. Har helper idempotent hai, taaki aadha chala
+# migration dobara chalane par bhi safe rahe.
+
+
+def is_postgres(engine: Engine) -> bool:
+    return engine.dialect.name == "postgresql"
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def add_column_if_missing(engine: Engine, table: str, column: str, ddl: str) -> bool:
+    """`ddl` = type + default, e.g. "INTEGER DEFAULT 1"."""
+    columns = {c["name"] for c in inspect(engine).get_columns(table)}
+    if column in columns:
+        return False
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(column)} {ddl}")
+        )
+    return True
+
+
+def create_tables_if_missing(engine: Engine, tables: Iterable) -> None:
+    for table in tables:
+        table.create(bind=engine, checkfirst=True)
+
+
+def _drop_invalid_pg_index(conn: Connection, name: str) -> None:
+    # Fail hua CONCURRENTLY build INVALID index chhod deta hai;
+    # IF NOT EXISTS use skip kar dega, isliye pehle hata do
+    invalid = conn.execute(
+        text(
+            "SELECT 1 FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid "
+            "WHERE c.relname = :name AND NOT i.indisvalid"
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {_quote(name)}"))
+
+
+def create_index_online(
+    engine: Engine,
+    name: str,
+    table: str,
+    columns: Iterable[str],
+    unique: bool = False,
+) -> None:
+    """
+    Postgres par CREATE INDEX CONCURRENTLY (writes block nahi hote).
+    CONCURRENTLY transaction ke andar nahi chal sakta, isliye AUTOCOMMIT connection.
+    SQLite par normal CREATE INDEX IF NOT EXISTS.
+    """
+    cols = ", ".join(_quote(c) for c in columns)
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+
+    if is_postgres(engine):
+        with engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as conn:
+            _drop_invalid_pg_index(conn, name)
+            conn.execute(
+                text(
+                    f"CREATE {kind} CONCURRENTLY IF NOT EXISTS {_quote(name)} "
+                    f"ON {_quote(table)} ({cols})"
+                )
+            )
+        return
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"CREATE {kind} IF NOT EXISTS {_quote(name)} ON {_quote(table)} ({cols})")
+        )
+
+
+def backfill_in_batches(
+    engine: Engine,
+    table: str,
+    set_clause: str,
+    where_clause: str,
+    batch_size: int = 1000,
+    key: str = "id",
+    params: Optional[dict] = None,
+) -> int:
+    """
+    Bade table ko chhote batches mein update karta hai. Har batch apna commit hai,
+    isliye row locks sirf `batch_size` rows par aur thodi der ke liye lagte hain.
+    `where_clause` aisi honi chahiye ki update ke baad row match na kare,
+    warna loop khatam nahi hoga.
+    """
+    t, k = _quote(table), _quote(key)
+    stmt = text(
+        f"UPDATE {t} SET {set_clause} WHERE {k} IN "
+        f"(SELECT {k} FROM {t} WHERE {where_clause} LIMIT :batch_size)"
+    )
+    total = 0
+    while True:
+        with engine.begin() as conn:
+            result = conn.execute(stmt, {**(params or {}), "batch_size": batch_size})
+        if not result.rowcount:
+            return total
+        total += result.rowcount
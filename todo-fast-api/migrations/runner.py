@@ -0,0 +1,124 @@
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    func,
+    select,
+    text,
+)
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from migrations.ops import is_postgres
+
+logger = logging.getLogger("migrations")
+
+# Startup behaviour:
+#   SCHEMA_CHECK=warn (default) | strict (version peeche ho to boot fail) | off
+#   AUTO_MIGRATE=true — startup par pending migrations chala do (dev ke liye)
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "warn").lower()
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
+
+# Alag MetaData taaki app ka create_all is table ko na chhede
+_meta = MetaData()
+schema_version = Table(
+    "schema_version",
+    _meta,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Postgres advisory lock key — do workers ek saath migrate na karein
+_LOCK_KEY = 72_034_101
+
+
+def _migrations():
+    # Lazy import: versions.py saare models load karta hai
+    from migrations.versions import MIGRATIONS
+
+    return MIGRATIONS
+
+
+def latest_version() -> int:
+    return max(v for v, _, _ in _migrations())
+
+
+def get_current_version(engine: Engine) -> int:
+    """Sirf ek SELECT — koi DDL ya schema reflection nahi."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    except DBAPIError:
+        # schema_version table hi nahi hai = kabhi migrate nahi hua
+        return 0
+
+
+@contextmanager
+def _migration_lock(engine: Engine):
+    if not is_postgres(engine):
+        yield
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": _LOCK_KEY})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": _LOCK_KEY})
+
+
+def run_migrations(engine: Engine, target: Optional[int] = None) -> list[int]:
+    """Pending migrations order mein chalata hai; har ek ke baad version record hota hai."""
+    applied = []
+    with _migration_lock(engine):
+        _meta.create_all(bind=engine, checkfirst=True)
+        current = get_current_version(engine)
+        for version, name, upgrade in _migrations():
+            if version <= current or (target is not None and version > target):
+                continue
+            logger.info("Applying migration %04d_%s", version, name)
+            upgrade(engine)
+            with engine.begin() as conn:
+                conn.execute(
+                    schema_version.insert().values(
+                        version=version, name=name, applied_at=datetime.utcnow()
+                    )
+                )
+            applied.append(version)
+    return applied
+
+
+def check_schema_version(engine: Engine) -> int:
+    """
+    Worker boot par chalta hai. Recorded version compare karta hai; DDL sirf tab
+    jab AUTO_MIGRATE on ho aur DB sach mein peeche ho.
+    """
+    if SCHEMA_CHECK == "off" and not AUTO_MIGRATE:
+        return -1
+
+    current = get_current_version(engine)
+    latest = latest_version()
+    if current >= latest:
+        return current
+
+    if AUTO_MIGRATE:
+        run_migrations(engine)
+        return latest_version()
+
+    message = (
+        f"Database schema is at version {current}, app expects {latest}. "
+        "Run `python scripts/migrate_db.py` before starting the app."
+    )
+    if SCHEMA_CHECK == "strict":
+        raise RuntimeError(message)
+    logger.warning(message)
+    return current
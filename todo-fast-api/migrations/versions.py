@@ -0,0 +1,74 @@
+from sqlalchemy.engine import Engine
+
+from database import Base
+from migrations.ops import (
+    add_column_if_missing,
+    backfill_in_batches,
+    create_index_online,
+    create_tables_if_missing,
+)
+import modal.user as user_models
+import modal.audit as audit_models
+import modal.ai as ai_models
+import modal.email as email_models
+import modal.todo  # noqa: F401  Necessary to register Todo model in metadata
+
+
+# Naya migration = naya function + MIGRATIONS list ke end mein entry.
+# Version numbers kabhi reuse/reorder mat karna — DB mein recorded hote hain.
+
+
+def m0001_baseline(engine: Engine) -> None:
+    # Fresh DB: saari tables. Purana DB: scripts/migrate_db.py wale columns.
+    Base.metadata.create_all(bind=engine)
+    add_column_if_missing(engine, "User", "role", "VARCHAR DEFAULT 'USER'")
+    add_column_if_missing(engine, "User", "mfa_enabled", "BOOLEAN DEFAULT FALSE")
+    add_column_if_missing(engine, "User", "mfa_secret", "VARCHAR")
+    add_column_if_missing(engine, "Todo", "version", "INTEGER DEFAULT 1")
+
+
+def m0002_login_history_indexes(engine: Engine) -> None:
+    create_tables_if_missing(
+        engine,
+        [
+            user_models.LoginHistoryArchive.__table__,
+            user_models.LoginRollup.__table__,
+        ],
+    )
+    create_index_online(
+        engine,
+        "ix_LoginHistory_user_id_timestamp",
+        "LoginHistory",
+        ["user_id", "timestamp"],
+    )
+    create_index_online(engine, "ix_LoginHistory_timestamp", "LoginHistory", ["timestamp"])
+
+
+def m0003_todo_owner_index(engine: Engine) -> None:
+    # List query: WHERE userId = ? AND parentId IS NULL
+    create_index_online(engine, "ix_Todo_userId_parentId", "Todo", ["userId", "parentId"])
+    # ALTER ... DEFAULT 1 se pehle wali rows mein version NULL reh gaya tha
+    backfill_in_batches(engine, "Todo", "version = 1", "version IS NULL")
+
+
+def m0004_policy_decision_log(engine: Engine) -> None:
+    create_tables_if_missing(engine, [audit_models.PolicyDecisionLog.__table__])
+
+
+def m0005_ai_insight_cache(engine: Engine) -> None:
+    add_column_if_missing(engine, "User", "todo_version", "INTEGER NOT NULL DEFAULT 0")
+    create_tables_if_missing(engine, [ai_models.AIInsightCache.__table__])
+
+
+def m0006_email_outbox(engine: Engine) -> None:
+    create_tables_if_missing(engine, [email_models.EmailOutbox.__table__])
+
+
+MIGRATIONS = [
+    (1, "baseline", m0001_baseline),
+    (2, "login_history_indexes", m0002_login_history_indexes),
+    (3, "todo_owner_index", m0003_todo_owner_index),
+    (4, "policy_decision_log", m0004_policy_decision_log),
+    (5, "ai_insight_cache", m0005_ai_insight_cache),
+    (6, "email_outbox", m0006_email_outbox),
+]
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, UniqueConstraint
+from database import Base
+from datetime import datetime
+
+
+# User ke latest AI briefing/coach answers. User.todo_version match kare tabhi valid;
+# todo write hote hi version badh jata hai aur ye row stale ho jati hai.
+class AIInsightCache(Base):
+    __tablename__ = "AIInsightCache"
+    __table_args__ = (
+        UniqueConstraint("user_id", "kind", name="uq_AIInsightCache_user_id_kind"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    kind = Column(String, nullable=False)  # "briefing" / "coach"
+    todo_version = Column(Integer, nullable=False)
+    # Todos ke alawa request params (userName, focusTaskId) ka hash
+    payload_hash = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)  # Validated response model JSON
+    created_at = Column(DateTime, default=datetime.utcnow)
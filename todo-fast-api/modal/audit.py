@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
+from database import Base
+from datetime import datetime
+
+
+# Policy decisions ka compliance log. policy_audit.py background mein batch insert karta hai.
+class PolicyDecisionLog(Base):
+    __tablename__ = "PolicyDecisionLog"
+    __table_args__ = (
+        Index("ix_PolicyDecisionLog_user_id_timestamp", "user_id", "timestamp"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    user_id = Column(Integer, nullable=True)
+    role = Column(String, nullable=True)
+    action = Column(String)
+    resource_type = Column(String)
+    resource_id = Column(Integer, nullable=True)
+    allowed = Column(Boolean)
+    latency_us = Column(Integer)  # Decision latency (microseconds)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from database import Base
+from datetime import datetime
+
+
+# Transactional outbox: request sirf row likhti hai (same transaction), SMTP
+# services/email_outbox.py ka background worker karta hai.
+class EmailOutbox(Base):
+    __tablename__ = "EmailOutbox"
+    __table_args__ = (
+        Index("ix_EmailOutbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    to_address = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    # Temp passwords hote hain — send (ya final failure) ke baad NULL kar diya jaata hai
+    body = Column(Text, nullable=True)
+    status = Column(String, nullable=False, default="pending")  # pending/sending/sent/failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Worker claim: kis worker ne kab uthaya (crash ho to stale claim dobara pending)
+    claim_token = Column(String(32), nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
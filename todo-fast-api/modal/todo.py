@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.sql import func
 from database import Base
@@ -6,6 +6,8 @@ from database import Base
 
 class Todo(Base):
     __tablename__ = "Todo"  # Table ka naam (Prisma ke saath match kiya hai)
+    # List query (user ke top-level todos) ke liye; migration 0003 online banata hai
+    __table_args__ = (Index("ix_Todo_userId_parentId", "userId", "parentId"),)
 
     # Columns define kar rahe hain
     id = Column(Integer, primary_key=True, index=True)
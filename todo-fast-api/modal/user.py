@@ -1,4 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Boolean,
+    ForeignKey,
+    DateTime,
+    Date,
+    Index,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -10,6 +20,12 @@ class UserRole(str, enum.Enum):
     ADMIN = "ADMIN"
 
 
+class LoginStatus(str, enum.Enum):
+    SUCCESS = "SUCCESS"
+    FAILED = "FAILED"
+    MFA_PENDING = "MFA_PENDING"
+
+
 # User Model - Ye 'User' table banayega database mein
 class User(Base):
     __tablename__ = "User"
@@ -24,6 +40,9 @@ class User(Base):
     mfa_enabled = Column(Boolean, default=False)
     mfa_secret = Column(String, nullable=True)
 
+    # Har todo write par +1 — stored AI briefing/coach isi version se stale hote hain
+    todo_version = Column(Integer, default=0, nullable=False, server_default="0")
+
     # User ke saare todos ka relationship
     todos = relationship("Todo", back_populates="owner")
     login_history = relationship("LoginHistory", back_populates="user")
@@ -31,6 +50,11 @@ class User(Base):
 
 class LoginHistory(Base):
     __tablename__ = "LoginHistory"
+    # "Recent logins" queries hamesha user + time range par hoti hain
+    __table_args__ = (
+        Index("ix_LoginHistory_user_id_timestamp", "user_id", "timestamp"),
+        Index("ix_LoginHistory_timestamp", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("User.id"))
@@ -40,3 +64,37 @@ class LoginHistory(Base):
     status = Column(String)  # SUCCESS, FAILED, MFA_PENDING
 
     user = relationship("User", back_populates="login_history")
+
+
+# Retention job purani LoginHistory rows yahan move karta hai (rolling archive).
+# FK nahi rakha taaki deleted users ki history bhi audit ke liye bachi rahe.
+class LoginHistoryArchive(Base):
+    __tablename__ = "LoginHistoryArchive"
+    __table_args__ = (
+        Index("ix_LoginHistoryArchive_user_id_timestamp", "user_id", "timestamp"),
+    )
+
+    id = Column(Integer, primary_key=True)  # Original LoginHistory id
+    user_id = Column(Integer)
+    ip_address = Column(String)
+    user_agent = Column(String)
+    timestamp = Column(DateTime)
+    status = Column(String)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+
+# Per-user, per-day counters. Login ke time hi increment hote hain,
+# isliye admin stats ke liye history scan nahi karna padta.
+class LoginRollup(Base):
+    __tablename__ = "LoginRollup"
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_LoginRollup_user_id_day"),
+        Index("ix_LoginRollup_day", "day"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    day = Column(Date, nullable=False)
+    success_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    mfa_pending_count = Column(Integer, default=0, nullable=False)
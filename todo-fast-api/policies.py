@@ -1,6 +1,6 @@
 from fastapi import Depends, HTTPException, status, Header
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Dict, Iterable, Optional, Set, Tuple
 import policy_engine as pe
 from utils import get_current_user, get_db
 from modal.user import User
@@ -8,7 +8,41 @@ from modal.todo import Todo
 from utils_cache import cache
 
 
+_TODO_META_TTL = 60
+
+
+def todo_meta_cache_key(todo_id: int) -> str:
+    return f"resource:meta:todo:{todo_id}"
+
+
+def get_todo_meta(todo_id: int) -> Optional[pe.ResourceMeta]:
+    cached = cache.get(todo_meta_cache_key(todo_id))
+    if not cached:
+        return None
+    return pe.ResourceMeta(todo_id, cached["user_id"], cached["version"])
+
+
+def set_todo_meta(meta: pe.ResourceMeta) -> None:
+    cache.set(
+        todo_meta_cache_key(meta.id),
+        {"user_id": meta.user_id, "version": meta.version},
+        ttl_seconds=_TODO_META_TTL,
+    )
+
+
+def invalidate_todo_meta(todo_id: int) -> None:
+    cache.delete(todo_meta_cache_key(todo_id))
+
+
 class PolicyChecker:
+    """
+    Route dependency: authorization + Etag check.
+    TODO routes (update/delete) ko ORM Todo chahiye, isliye row hamesha load
+    hoti hai aur Etag/owner check usi row ke against — doosre worker / Fastify
+    write se stale hua cached meta yahan use nahi hota. Cached meta sirf
+    can_many (bulk) ka fast path hai; yahan load hui row se refresh hota hai.
+    """
+
     def __init__(self, action: pe.Action, resource_type: pe.ResourceType):
         self.action = action
         self.resource_type = resource_type
@@ -20,57 +54,101 @@ class PolicyChecker:
         user: User = Depends(get_current_user),
         db: Session = Depends(get_db),
     ):
-        # 1. Identity Caching (User Context)
-        # We cache the user's role and basic info to avoid frequent DB lookups
-        cache_key_user = f"user:policy_context:{user.id}"
-        cached_user_context = cache.get(cache_key_user)
-
-        if not cached_user_context:
-            # Simple context structure
-            user_context = {"id": user.id, "role": user.role}
-            cache.set(cache_key_user, user_context, ttl_seconds=300)  # 5 min
-
-        resource = None
-
-        # 2. Resource Handling & Caching
+        # 1. Resource Handling
         if self.resource_type == pe.ResourceType.TODO and todo_id:
-            # Check Resource Cache first
-            cache_key_res = f"resource:meta:todo:{todo_id}"
-            cached_res = cache.get(cache_key_res)
-
-            if cached_res:
-                # We need a proper SQLAlchemy object or a mock for 'can' check
-                # For now, we fetch from DB if not in cache, or use cached attributes
-                resource = db.query(Todo).filter(Todo.id == todo_id).first()
-            else:
-                resource = db.query(Todo).filter(Todo.id == todo_id).first()
-                if resource:
-                    # Cache basic metadata for policy checks
-                    res_meta = {
-                        "user_id": resource.user_id,
-                        "version": resource.version,
-                    }
-                    cache.set(cache_key_res, res_meta, ttl_seconds=60)
-
-            if not resource:
+            resource = db.query(Todo).filter(Todo.id == todo_id).first()
+            if resource is None:
+                invalidate_todo_meta(todo_id)  # Cache mein ho sakta hai, DB se delete ho chuka
                 raise HTTPException(status_code=404, detail="Todo not found")
+            meta = pe.ResourceMeta(resource.id, resource.user_id, resource.version)
+            set_todo_meta(meta)
 
-            # 3. Etag / Concurrency Validation (If applicable)
+            # 2. Etag / Concurrency Validation (If applicable)
             if (
                 self.action in [pe.Action.UPDATE, pe.Action.DELETE]
                 and if_match is not None
+                and meta.version != if_match
             ):
-                if resource.version != if_match:
-                    raise HTTPException(
-                        status_code=status.HTTP_412_PRECONDITION_FAILED,
-                        detail=f"Etag Mismatch: Current version is {resource.version}, but you provided {if_match}.",
-                    )
+                raise HTTPException(
+                    status_code=status.HTTP_412_PRECONDITION_FAILED,
+                    detail=f"Etag Mismatch: Current version is {meta.version}, but you provided {if_match}.",
+                )
 
-        # 4. Policy Evaluation Engine
+            # 3. Policy Evaluation Engine (descriptor par)
+            self._authorize(user, meta)
+            return resource
+
+        self._authorize(user, None)
+        return user
+
+    def _authorize(self, user: User, resource) -> None:
         if not pe.can(user, self.action, self.resource_type, resource):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Forbidden: You do not have {self.action} permission on this {self.resource_type}.",
             )
 
-        return resource or user
+
+class UserPolicyChecker(PolicyChecker):
+    """
+    /admin/users/{user_id}/... routes: path ka target user hi resource (self ya
+    admin). Alag dependency, taaki baaki PolicyChecker routes par `user_id`
+    query param ban kar resource na ban jaye.
+    """
+
+    def __init__(self, action: pe.Action):
+        super().__init__(action, pe.ResourceType.USER)
+
+    async def __call__(self, user_id: int, user: User = Depends(get_current_user)):
+        self._authorize(user, pe.ResourceMeta(user_id, user_id))
+        return user
+
+
+# Bulk chunk size — ek IN query mein itni ids (DB param limits se neeche)
+_BULK_CHUNK = 5000
+
+_META_COLUMNS = {
+    pe.ResourceType.TODO: (Todo, Todo.id, Todo.user_id, Todo.version),
+    pe.ResourceType.USER: (User, User.id, None, None),
+}
+
+
+def can_many(
+    db: Session,
+    user: User,
+    action: pe.Action,
+    resource_type: pe.ResourceType,
+    ids: Iterable[int],
+) -> Tuple[Set[int], Set[int]]:
+    """
+    Vectorized `pe.can`: sirf ownership metadata (id, userId) ek IN query se
+    (ya metadata cache se) laata hai. Returns (allowed, denied); jo ids exist
+    nahi karti wo denied mein aati hain.
+    """
+    wanted = set(ids)
+    metas: Dict[int, pe.ResourceMeta] = {}
+
+    if resource_type == pe.ResourceType.TODO:
+        for rid in wanted:
+            meta = get_todo_meta(rid)
+            if meta:
+                metas[rid] = meta
+
+    _, id_col, owner_col, version_col = _META_COLUMNS[resource_type]
+    columns = [c for c in (id_col, owner_col, version_col) if c is not None]
+    missing = sorted(wanted - metas.keys())
+    for start in range(0, len(missing), _BULK_CHUNK):
+        chunk = missing[start : start + _BULK_CHUNK]
+        for row in db.query(*columns).filter(id_col.in_(chunk)):
+            if resource_type == pe.ResourceType.TODO:
+                metas[row[0]] = pe.ResourceMeta(row[0], row[1], row[2])
+                set_todo_meta(metas[row[0]])
+            else:
+                metas[row[0]] = pe.ResourceMeta(row[0])
+
+    allowed = {
+        rid
+        for rid, meta in metas.items()
+        if pe.can(user, action, resource_type, meta)
+    }
+    return allowed, wanted - allowed
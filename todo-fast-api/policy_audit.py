@@ -0,0 +1,171 @@
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("policy.audit")
+
+POLICY_AUDIT_ENABLED = os.getenv("POLICY_AUDIT_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Allow decisions ka itna hissa log hota hai; denies hamesha log hote hain
+POLICY_AUDIT_SAMPLE_RATE = float(os.getenv("POLICY_AUDIT_SAMPLE_RATE", "0.1"))
+POLICY_AUDIT_QUEUE_SIZE = int(os.getenv("POLICY_AUDIT_QUEUE_SIZE", "10000"))
+POLICY_AUDIT_BATCH_SIZE = int(os.getenv("POLICY_AUDIT_BATCH_SIZE", "500"))
+POLICY_AUDIT_FLUSH_MS = int(os.getenv("POLICY_AUDIT_FLUSH_MS", "1000"))
+
+
+class PolicyAuditSink:
+    """
+    Request path sirf ek bounded queue mein record daalta hai (put_nowait);
+    ek background thread batches mein DB mein likhta hai. Queue full ho to
+    record drop hota hai aur `dropped` count badhta hai — request kabhi wait nahi karti.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = POLICY_AUDIT_ENABLED,
+        sample_rate: float = POLICY_AUDIT_SAMPLE_RATE,
+        max_queue: int = POLICY_AUDIT_QUEUE_SIZE,
+        batch_size: int = POLICY_AUDIT_BATCH_SIZE,
+        flush_ms: int = POLICY_AUDIT_FLUSH_MS,
+    ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        # Counters threadpool workers (sync routes) se concurrently badhte hain —
+        # `+=` atomic nahi, isliye LLMMetrics jaisa lock
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    def record(
+        self,
+        user: Any,
+        action: Any,
+        res_type: Any,
+        resource: Any,
+        allowed: bool,
+        latency_s: float,
+    ) -> None:
+        if not self.enabled:
+            return
+        if allowed and random.random() >= self.sample_rate:
+            with self._lock:
+                self.sampled_out += 1
+            return
+
+        item = {
+            "timestamp": datetime.utcnow(),
+            "user_id": getattr(user, "id", None),
+            "role": getattr(user, "role", None),
+            "action": getattr(action, "value", action),
+            "resource_type": getattr(res_type, "value", res_type),
+            "resource_id": getattr(resource, "id", None),
+            "allowed": allowed,
+            "latency_us": int(latency_s * 1_000_000),
+        }
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+        else:
+            with self._lock:
+                self.recorded += 1
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="policy-audit-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch: List[Dict[str, Any]] = []
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        # Lazy import: audit off ho to DB/models load nahi hote
+        from database import SessionLocal
+        from modal.audit import PolicyDecisionLog
+
+        db = SessionLocal()
+        try:
+            db.bulk_insert_mappings(PolicyDecisionLog, batch)
+            db.commit()
+            with self._lock:
+                self.written += len(batch)
+        except Exception as exc:
+            db.rollback()
+            with self._lock:
+                self.failed += len(batch)
+            logger.warning("Policy audit batch of %d failed: %s", len(batch), exc)
+        finally:
+            db.close()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Shutdown par pending records flush karo."""
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = {
+                "recorded": self.recorded,
+                "sampledOut": self.sampled_out,
+                "dropped": self.dropped,
+                "written": self.written,
+                "failed": self.failed,
+            }
+        return {
+            "enabled": self.enabled,
+            "sampleRate": self.sample_rate,
+            **counters,
+            "queued": self._queue.qsize(),
+        }
+
+
+# Global Audit Sink
+sink = PolicyAuditSink()
@@ -1,6 +1,13 @@
+import json
+import os
+import time
 from enum import Enum
-from typing import Any, Optional, Dict
-from modal.user import User
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from sqlalchemy import and_, false, not_, or_, true
+from sqlalchemy.sql.elements import ColumnElement
+from modal.user import User, UserRole
+from modal.todo import Todo
+import policy_audit
 
 
 class Action(str, Enum):
@@ -13,6 +20,228 @@ class Action(str, Enum):
 class ResourceType(str, Enum):
     TODO = "TODO"
     USER = "USER"
+    # Ops data (metrics, audit counters) — koi row nahi; sirf admin-full-access match karta hai
+    SYSTEM = "SYSTEM"
+
+
+class ResourceMeta:
+    """
+    Lightweight stand-in for an ORM row: just the attributes policies look at.
+    `can()` evaluates it exactly like a loaded Todo/User.
+    """
+
+    __slots__ = ("id", "user_id", "version")
+
+    def __init__(
+        self,
+        id: int,
+        user_id: Optional[int] = None,
+        version: Optional[int] = None,
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.version = version
+
+
+class Condition:
+    """
+    Precompiled rule condition.
+    `check` runs on a loaded resource, `sql` is its pushdown form for list
+    queries, and `on_missing_resource` is the constant result when no resource
+    is given (None = depends on user/context, so not memoizable).
+    """
+
+    __slots__ = ("name", "check", "sql", "on_missing_resource")
+
+    def __init__(
+        self,
+        name: str,
+        check: Callable[[Any, Any, Optional[Dict]], bool],
+        sql: Callable[[Any, Any, Optional[Dict]], ColumnElement],
+        on_missing_resource: Optional[bool] = None,
+    ):
+        self.name = name
+        self.check = check
+        self.sql = sql
+        self.on_missing_resource = on_missing_resource
+
+
+def _business_hours(user, resource, context) -> bool:
+    # Environment/Context Based Rule (AWS/Conditions Style)
+    hour = (context or {}).get("hour")
+    return hour is not None and 9 <= hour <= 18
+
+
+CONDITIONS: Dict[str, Condition] = {
+    c.name: c
+    for c in [
+        Condition(
+            "resource_owner",
+            lambda user, res, ctx: res is not None and res.user_id == user.id,
+            lambda user, model, ctx: model.user_id == user.id,
+            on_missing_resource=False,
+        ),
+        Condition(
+            "resource_self_or_collection",
+            lambda user, res, ctx: res is None or res.id == user.id,
+            lambda user, model, ctx: model.id == user.id,
+            on_missing_resource=True,
+        ),
+        Condition(
+            "business_hours",
+            _business_hours,
+            lambda user, model, ctx: true() if _business_hours(user, None, ctx) else false(),
+        ),
+    ]
+}
+
+_MODELS = {ResourceType.TODO: Todo, ResourceType.USER: User}
+
+
+class PolicyEntry:
+    """Compiled rules for one (role, action, resource_type) key."""
+
+    __slots__ = ("allow", "deny", "static", "no_resource")
+
+    def __init__(self, allow: List[Tuple], deny: List[Tuple]):
+        self.allow = _minimize(allow)
+        self.deny = _minimize(deny)
+        # Koi rule conditions nahi dekhta -> decision sirf key par depend karta hai
+        self.static = None
+        if () in self.deny:
+            self.static = False
+        elif not self.deny and () in self.allow:
+            self.static = True
+        elif not any(self.deny) and not any(self.allow):
+            self.static = bool(self.allow) and not self.deny
+        # Resource/context ke bina wala decision bhi key se hi tay ho sakta hai
+        self.no_resource = _constant_without_resource(self.allow, self.deny)
+
+    def decide(self, user, resource, context) -> bool:
+        for conditions in self.deny:
+            if all(c.check(user, resource, context) for c in conditions):
+                return False
+        for conditions in self.allow:
+            if all(c.check(user, resource, context) for c in conditions):
+                return True
+        return False
+
+
+def _minimize(rules: List[Tuple]) -> Tuple[Tuple, ...]:
+    """
+    Duplicate condition sets hatao, aur jo set kisi chhote set ka superset hai
+    wo bhi (chhota set pass hua to rule waise bhi match karega). Isse rules
+    hazaron mein ho tab bhi har key par sirf kuch distinct checks bachte hain.
+    """
+    unique = sorted({frozenset(r) for r in rules}, key=len)
+    kept: List[frozenset] = []
+    for conditions in unique:
+        if not any(k <= conditions for k in kept):
+            kept.append(conditions)
+    return tuple(tuple(sorted(k, key=lambda c: c.name)) for k in kept)
+
+
+def _constant_without_resource(allow, deny) -> Optional[bool]:
+    def rule_result(conditions):
+        results = [c.on_missing_resource for c in conditions]
+        if any(r is False for r in results):
+            return False
+        if all(r is True for r in results):
+            return True
+        return None
+
+    for conditions in deny:
+        r = rule_result(conditions)
+        if r is None:
+            return None
+        if r:
+            return False
+    results = [rule_result(conditions) for conditions in allow]
+    if any(r is True for r in results):
+        return True
+    if any(r is None for r in results):
+        return None
+    return False
+
+
+class PolicyTable:
+    def __init__(self, rules: List[Dict]):
+        self.rules = rules
+        # (role, action, resource_type) -> ([allow conditions], [deny conditions])
+        self._index: Dict[Tuple[str, Action, ResourceType], Tuple[List, List]] = {}
+        for rule in rules:
+            self._add(rule)
+        # Saare entries yahin compile — request path par koi compile/lock nahi.
+        # Rules/UserRole se bahar ka role sirf "*" rules wale entry par girta hai.
+        roles = {role for rule in rules for role in rule["roles"] if role != "*"}
+        roles.update(role.value for role in UserRole)
+        self._entries: Dict[Tuple[str, Action, ResourceType], PolicyEntry] = {}
+        self._wildcard: Dict[Tuple[Action, ResourceType], PolicyEntry] = {}
+        for action in Action:
+            for res_type in ResourceType:
+                self._wildcard[(action, res_type)] = self._compile(("*",), action, res_type)
+                for role in roles:
+                    self._entries[(role, action, res_type)] = self._compile(
+                        (role, "*"), action, res_type
+                    )
+
+    def _add(self, rule: Dict) -> None:
+        effect = rule.get("effect", "allow")
+        if effect not in ("allow", "deny"):
+            raise ValueError(f"Policy rule {rule.get('id')}: unknown effect {effect!r}")
+        try:
+            conditions = tuple(CONDITIONS[name] for name in rule.get("when", []))
+        except KeyError as exc:
+            raise ValueError(
+                f"Policy rule {rule.get('id')}: unknown condition {exc.args[0]!r}"
+            )
+
+        actions = list(Action) if "*" in rule["actions"] else [Action(a) for a in rule["actions"]]
+        resources = (
+            list(ResourceType)
+            if "*" in rule["resources"]
+            else [ResourceType(r) for r in rule["resources"]]
+        )
+        for role in rule["roles"]:
+            for action in actions:
+                for res_type in resources:
+                    allow, deny = self._index.setdefault((role, action, res_type), ([], []))
+                    (deny if effect == "deny" else allow).append(conditions)
+
+    def _compile(self, roles: Tuple[str, ...], action: Action, res_type: ResourceType) -> PolicyEntry:
+        # Role-specific + wildcard rules merge karke ek entry
+        allow, deny = [], []
+        for r in roles:
+            a, d = self._index.get((r, action, res_type), ([], []))
+            allow += a
+            deny += d
+        return PolicyEntry(allow, deny)
+
+    def entry(self, role: str, action: Action, res_type: ResourceType) -> PolicyEntry:
+        entry = self._entries.get((role, action, res_type))
+        if entry is None:
+            return self._wildcard[(action, res_type)]
+        return entry
+
+
+def load_rules() -> List[Dict]:
+    path = os.getenv("POLICY_RULES_FILE")
+    if path:
+        with open(path) as f:
+            return json.load(f)
+    from policy_rules import POLICY_RULES
+
+    return POLICY_RULES
+
+
+_table = PolicyTable(load_rules())
+
+
+def reload_rules(rules: Optional[List[Dict]] = None) -> PolicyTable:
+    """Rules dobara compile karta hai (file badli ho ya benchmark/tests ke liye)."""
+    global _table
+    _table = PolicyTable(rules if rules is not None else load_rules())
+    return _table
 
 
 def can(
@@ -25,37 +254,51 @@ def can(
     """
     Policy-Based Access Control (PBAC) Engine.
     Determines if a user can perform an action on a resource based on attributes and context.
+    Rules policy_rules.py mein hain; yahan sirf compiled table ka lookup hota hai.
     """
-    # 1. Global Admin Rule (GCP Style)
-    # Admins have full access to everything in this system
-    if user.role == "ADMIN":
-        return True
+    if not policy_audit.sink.enabled:
+        return _decide(user, action, res_type, resource, context)
 
-    # 2. Resource Specific Rules
-    if res_type == ResourceType.TODO:
-        # Anyone can create a Todo
-        if action == Action.CREATE:
-            return True
+    started = time.perf_counter()
+    allowed = _decide(user, action, res_type, resource, context)
+    policy_audit.sink.record(
+        user, action, res_type, resource, allowed, time.perf_counter() - started
+    )
+    return allowed
 
-        # For READ, UPDATE, DELETE, we need to check ownership
-        if resource:
-            # Only the owner can manage their own Todo items
-            return resource.user_id == user.id
-
-    if res_type == ResourceType.USER:
-        # Users can READ their own profile
-        if action == Action.READ:
-            if resource:
-                return resource.id == user.id
-            return True  # Viewing general user list might be restricted in reality
-
-    # 3. Environment/Context Based Rules (AWS/Conditions Style)
-    if context:
-        # Example: Business Hours check (Can be expanded)
-        # current_hour = context.get("hour")
-        # if action == Action.DELETE and (current_hour < 9 or current_hour > 18):
-        #     return False
-        pass
-
-    # Default Deny (Security Best Practice)
-    return False
+
+def _decide(user, action, res_type, resource, context) -> bool:
+    entry = _table.entry(user.role, action, res_type)
+    if entry.static is not None:
+        return entry.static
+    if resource is None and context is None and entry.no_resource is not None:
+        return entry.no_resource
+    return entry.decide(user, resource, context)
+
+
+def predicate(
+    user: User,
+    action: Action,
+    res_type: ResourceType,
+    context: Optional[Dict] = None,
+) -> ColumnElement:
+    """
+    SQL pushdown of `can()` for list queries.
+    Returns a filter expression that matches exactly the rows for which
+    `can(user, action, res_type, row)` is True, so list endpoints fetch only
+    authorized rows. Built from the same compiled rules
+    (scripts/check_policy_pushdown.py verifies both agree).
+    """
+    entry = _table.entry(user.role, action, res_type)
+    if entry.static is not None:
+        return true() if entry.static else false()
+
+    model = _MODELS[res_type]
+
+    def clause(conditions):
+        return and_(true(), *(c.sql(user, model, context) for c in conditions))
+
+    allowed = or_(false(), *(clause(c) for c in entry.allow))
+    if not entry.deny:
+        return allowed
+    return and_(allowed, not_(or_(false(), *(clause(c) for c in entry.deny))))
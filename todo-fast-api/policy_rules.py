@@ -0,0 +1,46 @@
+# Declarative PBAC rules. policy_engine inhe startup par compile karke
+# (role, action, resource_type) dispatch table bana deta hai.
+#
+# Rule fields:
+#   id        — naam (debugging/audit ke liye)
+#   effect    — "allow" (default) ya "deny"; matching deny hamesha jeetta hai
+#   roles     — user.role values, "*" = koi bhi
+#   actions   — Action values, "*" = saare
+#   resources — ResourceType values, "*" = saare
+#   when      — condition names (policy_engine.CONDITIONS); saari true honi chahiye
+#
+# Koi rule match na ho to Default Deny.
+# POLICY_RULES_FILE env var se same structure wali JSON file bhi de sakte ho.
+
+POLICY_RULES = [
+    # Global Admin Rule (GCP Style): admins ke paas sab kuch
+    {
+        "id": "admin-full-access",
+        "roles": ["ADMIN"],
+        "actions": ["*"],
+        "resources": ["*"],
+    },
+    # Anyone can create a Todo
+    {
+        "id": "todo-create",
+        "roles": ["*"],
+        "actions": ["CREATE"],
+        "resources": ["TODO"],
+    },
+    # Only the owner can read/manage their own Todo items
+    {
+        "id": "todo-owner",
+        "roles": ["*"],
+        "actions": ["READ", "UPDATE", "DELETE"],
+        "resources": ["TODO"],
+        "when": ["resource_owner"],
+    },
+    # Users can READ their own profile (list view without a resource is allowed)
+    {
+        "id": "user-read-self",
+        "roles": ["*"],
+        "actions": ["READ"],
+        "resources": ["USER"],
+        "when": ["resource_self_or_collection"],
+    },
+]
@@ -0,0 +1,114 @@
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("db.queries")
+
+# Is se zyada time lene wali query slow log mein jaati hai
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "200"))
+# Ek request mein same statement shape itni baar se zyada = N+1 suspect
+N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "10"))
+# Dev mode: N+1 warnings on (production mein shor nahi chahiye)
+QUERY_DEBUG = os.getenv("DB_QUERY_DEBUG", "false").lower() in ("1", "true", "yes")
+
+
+class RequestQueryStats:
+    __slots__ = ("path", "count", "total_ms", "shapes", "warned")
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+        self.warned: set = set()
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "db_query_stats", default=None
+)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%\(\w+\)s|%s|\?|:\w+|\$\d+")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Literals/params ko `?` bana deta hai taaki same shape ki queries group ho sakein."""
+    sql = _STRING_RE.sub("?", statement)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(?...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def start_request(path: str = ""):
+    stats = RequestQueryStats(path)
+    return stats, _current.set(stats)
+
+
+def end_request(token) -> None:
+    _current.reset(token)
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    stats = _current.get()
+    shape = None
+    if elapsed_ms >= SLOW_QUERY_MS:
+        shape = normalize_sql(statement)
+        logger.warning(
+            "Slow query (%.1fms)%s: %s",
+            elapsed_ms,
+            f" [{stats.path}]" if stats else "",
+            shape,
+        )
+
+    if stats is None:
+        return
+    stats.count += 1
+    stats.total_ms += elapsed_ms
+
+    if not QUERY_DEBUG:
+        return
+    shape = shape or normalize_sql(statement)
+    stats.shapes[shape] += 1
+    if stats.shapes[shape] > N_PLUS_ONE_THRESHOLD and shape not in stats.warned:
+        stats.warned.add(shape)
+        logger.warning(
+            "Possible N+1 [%s]: statement repeated >%d times: %s",
+            stats.path,
+            N_PLUS_ONE_THRESHOLD,
+            shape,
+        )
+
+
+def _handle_error(context):
+    # Failed statement ka after_cursor_execute nahi aata; start time stack saaf rakho
+    conn = context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def install(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
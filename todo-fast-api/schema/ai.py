@@ -51,6 +51,10 @@ class AIBossLoreResponse(BaseModel):
     defeatMessage: str
 
 
+class AIBossLoreBatchResponse(BaseModel):
+    items: List[AIBossLoreResponse]
+
+
 class AIBriefingRequest(BaseModel):
     todos: List[TodoSummary]
     userName: str = "there"
@@ -70,3 +74,55 @@ class AIParseTaskRequest(BaseModel):
 class AIParseTaskResponse(BaseModel):
     parent: str
     subtasks: List[str]
+
+
+AIJobKind = Literal["split", "coach", "boss-lore", "briefing", "parse-task"]
+
+
+class AIJobRequest(BaseModel):
+    kind: AIJobKind
+    # Same body jo matching /ai/<kind> route leta hai
+    payload: dict
+    # Background band 5-9 (chhota = pehle). 0-4 interactive /ai/* routes ke liye
+    # reserved — client bulk jobs ko live requests se aage nahi kar sakta
+    priority: int = Field(5, ge=5, le=9)
+
+
+class AIJobStatus(BaseModel):
+    jobId: str
+    kind: str
+    status: Literal["queued", "running", "done", "failed"]
+    priority: int
+    result: Optional[dict] = None
+    error: Optional[dict] = None
+    queuedMs: Optional[float] = None
+    runMs: Optional[float] = None
+
+
+class AIBatchItem(BaseModel):
+    # Client ka apna correlation id (e.g. todo id), response mein wapas
+    id: Optional[str] = Field(None, max_length=64)
+    kind: AIJobKind
+    # Same body jo matching /ai/<kind> route leta hai
+    payload: dict
+
+
+class AIBatchRequest(BaseModel):
+    items: List[AIBatchItem] = Field(..., min_length=1, max_length=10)
+
+
+class AIBatchItemResult(BaseModel):
+    id: Optional[str] = None
+    kind: str
+    # pending = AI_JOB_WAIT_SECONDS mein khatam nahi hua; jobId poll karo
+    status: Literal["ok", "error", "pending"]
+    result: Optional[dict] = None
+    error: Optional[dict] = None
+    jobId: Optional[str] = None
+    # Merged boss-lore items ek hi job share karte hain; poll result ke
+    # `items` list mein is item ki position
+    jobIndex: Optional[int] = None
+
+
+class AIBatchResponse(BaseModel):
+    results: List[AIBatchItemResult]
@@ -25,6 +25,11 @@ class TodoUpdate(BaseModel):
     # parent_id usually update nahi karte, but agar karna ho to optional rakho
 
 
+# Bulk delete: ek request mein kai todos (authorization ek hi query mein)
+class TodoBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=5000)
+
+
 # TodoRead: Jab API se data wapas ata hai to is format mein ayega
 class TodoRead(TodoBase):
     id: int
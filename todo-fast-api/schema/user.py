@@ -16,6 +16,13 @@ class UserCreate(BaseModel):
     role: UserRole = UserRole.USER
 
 
+# Bulk import (CSV / JSON lines) ki ek row — password server generate karke mail karta hai
+class BulkUserRow(BaseModel):
+    email: EmailStr
+    name: str | None = None
+    role: UserRole = UserRole.USER
+
+
 # Login ke liye schema
 class UserLogin(BaseModel):
     email: EmailStr
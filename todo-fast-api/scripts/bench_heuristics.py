@@ -0,0 +1,73 @@
+import sys
+import os
+import argparse
+import random
+import time
+
+# Add parent directory to path so we can import 'services'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from services.heuristics import heuristic_split, parse_task_rules
+from check_heuristics import legacy_rules, legacy_split, random_case
+
+
+def inputs(size: int, count: int, seed: int) -> list[str]:
+    """`size` chars tak ke mixed inputs: prose, comma lists, bullets, "X: a, b"."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(count):
+        shape = i % 4
+        if shape == 0:
+            text = random_case(rng, size)
+        elif shape == 1:
+            text = ", ".join(f"step {n} and check" for n in range(size // 20 + 1))
+        elif shape == 2:
+            text = "Project\n" + "\n".join(f"- item {n}" for n in range(size // 10 + 1))
+        else:
+            text = "Trip: " + "; ".join(f"pack thing {n}" for n in range(size // 16 + 1))
+        out.append(text[:size])
+    return out
+
+
+def per_call_us(fn, texts: list[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - started) / (rounds * len(texts)) * 1e6
+
+
+def _new_path(text: str):
+    # ai_parse_task ka no-LLM path: rules, warna split
+    stripped = text.strip()
+    return parse_task_rules(stripped) or heuristic_split(stripped)
+
+
+def _legacy_path(text: str):
+    stripped = text.strip()
+    return legacy_rules(stripped) or legacy_split(stripped)
+
+
+# Usage: python scripts/bench_heuristics.py --sizes 50,500,2000,4000
+def main():
+    parser = argparse.ArgumentParser(description="Offline split/parse-task micro-benchmark")
+    parser.add_argument("--sizes", default="50,200,1000,4000")
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'chars':>6} {'legacy us':>10} {'new us':>8} {'speedup':>8} {'new QPS':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        texts = inputs(size, args.count, args.seed)
+        legacy = per_call_us(_legacy_path, texts, args.rounds)
+        new = per_call_us(_new_path, texts, args.rounds)
+        print(
+            f"{size:>6} {legacy:>10.1f} {new:>8.1f} {legacy / new:>7.2f}x "
+            f"{1e6 / new:>9.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
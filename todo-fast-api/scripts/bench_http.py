@@ -0,0 +1,470 @@
+import sys
+import os
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path so we can import 'database' / 'utils'
+sys.path.append(APP_DIR)
+
+import httpx
+
+BENCH_PASSWORD = "bench-pass-123"
+BENCH_DOMAIN = "bench.example.com"
+
+# Server process ka env: mock provider, quota/outbox band, taaki sirf app ka kaam napa jaye
+SERVER_ENV = {
+    "AI_PROVIDER": "mock",
+    "AI_MOCK_LATENCY": "fixed:20",
+    "AI_MOCK_SEED": "42",
+    "AI_MAX_REQUESTS_PER_USER_PER_DAY": "100000000",
+    "EMAIL_OUTBOX_WORKER_ENABLED": "false",
+}
+
+_SPLIT_TEXTS = [
+    "Plan the team offsite",
+    "Buy milk, eggs and bread",
+    "Launch website\n- design mockups\n- build pages\n- deploy",
+    "Write quarterly report with charts, summary and appendix",
+    "Move house: pack boxes, book van; update address",
+]
+
+
+# --- Seeding ---
+
+
+def seed(users: int, todos_per_user: int) -> dict:
+    """
+    Bench users (ek ADMIN) + todos. Idempotent: pehle se seeded DB par sirf
+    kami wali rows banti hain. Sabka password same — ek hi bcrypt hash.
+    """
+    from sqlalchemy import insert
+
+    import modal.todo as todo_models
+    import modal.user as user_models
+    from database import SessionLocal, engine
+    from migrations import run_migrations
+    from utils import create_access_token, get_password_hash
+
+    run_migrations(engine)
+    emails = [f"bench-user-{i}@{BENCH_DOMAIN}" for i in range(users)]
+    admin_email = f"bench-admin@{BENCH_DOMAIN}"
+
+    db = SessionLocal()
+    try:
+        existing = {
+            email: user_id
+            for user_id, email in db.query(user_models.User.id, user_models.User.email).filter(
+                user_models.User.email.in_(emails + [admin_email])
+            )
+        }
+        missing = [e for e in emails + [admin_email] if e not in existing]
+        if missing:
+            hashed = get_password_hash(BENCH_PASSWORD)
+            rows = [
+                {
+                    "email": e,
+                    "password": hashed,
+                    "name": e.split("@")[0],
+                    "role": "ADMIN" if e == admin_email else "USER",
+                }
+                for e in missing
+            ]
+            for user_id, email in db.execute(
+                insert(user_models.User).returning(user_models.User.id, user_models.User.email),
+                rows,
+            ):
+                existing[email] = user_id
+
+        user_ids = [existing[e] for e in emails]
+        counts = _todo_counts(db, todo_models.Todo, user_ids)
+        todo_rows = [
+            {"text": f"Bench todo {n} for user {user_id}", "done": n % 3 == 0, "user_id": user_id}
+            for user_id in user_ids
+            for n in range(counts.get(user_id, 0), todos_per_user)
+        ]
+        if todo_rows:
+            db.execute(insert(todo_models.Todo), todo_rows)
+        db.commit()
+    finally:
+        db.close()
+
+    ttl = timedelta(hours=6)
+    return {
+        "emails": emails,
+        "tokens": [create_access_token({"sub": e}, ttl) for e in emails],
+        "admin_token": create_access_token({"sub": admin_email}, ttl),
+    }
+
+
+def _todo_counts(db, todo_model, user_ids: List[int]) -> Dict[int, int]:
+    from sqlalchemy import func
+
+    return dict(
+        db.query(todo_model.user_id, func.count(todo_model.id))
+        .filter(todo_model.user_id.in_(user_ids))
+        .group_by(todo_model.user_id)
+        .all()
+    )
+
+
+# --- Server ---
+
+
+def start_server(port: int, workers: int, database_url: str, extra_env: Dict[str, str]):
+    env = {**os.environ, **SERVER_ENV, **extra_env, "DATABASE_URL": database_url}
+    cmd = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+    proc = subprocess.Popen(cmd, cwd=APP_DIR, env=env)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"uvicorn exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit("uvicorn did not become healthy in 60s")
+
+
+def stop_server(proc) -> None:
+    proc.terminate()
+    try:
+        proc.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+# --- Load ---
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.enabled = False
+
+    def add(self, op: str, seconds: float, status: int) -> None:
+        if not self.enabled:
+            return
+        self.latencies.setdefault(op, []).append(seconds)
+        codes = self.statuses.setdefault(op, {})
+        codes[str(status)] = codes.get(str(status), 0) + 1
+        if status >= 400 or status == 0:
+            self.errors[op] = self.errors.get(op, 0) + 1
+
+
+async def timed(client: httpx.AsyncClient, rec: Recorder, op: str, method: str, url: str, **kw):
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kw)
+        status = response.status_code
+    except httpx.HTTPError:
+        response, status = None, 0
+    rec.add(op, time.perf_counter() - started, status)
+    return response
+
+
+def _auth(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def op_login(client, rec, ctx, worker: int, rng: random.Random) -> None:
+    email = rng.choice(ctx["emails"])
+    await timed(
+        client, rec, "POST /login", "POST", "/login",
+        json={"email": email, "password": BENCH_PASSWORD},
+    )
+
+
+async def op_todos_read(client, rec, ctx, worker: int, rng: random.Random) -> None:
+    token = ctx["tokens"][worker % len(ctx["tokens"])]
+    await timed(client, rec, "GET /todos", "GET", "/todos", headers=_auth(token))
+
+
+async def op_todos_write(client, rec, ctx, worker: int, rng: random.Random) -> None:
+    # create -> update (If-Match: version) -> delete, har worker apne user par
+    headers = _auth(ctx["tokens"][worker % len(ctx["tokens"])])
+    created = await timed(
+        client, rec, "POST /todos", "POST", "/todos",
+        headers=headers, json={"text": f"bench write {rng.random():.6f}"},
+    )
+    if created is None or created.status_code != 200:
+        return
+    todo_id = created.json()["id"]
+    await timed(
+        client, rec, "PUT /todos/{id}", "PUT", f"/todos/{todo_id}",
+        headers={**headers, "If-Match": "1"}, json={"done": True},
+    )
+    await timed(
+        client, rec, "DELETE /todos/{id}", "DELETE", f"/todos/{todo_id}",
+        headers={**headers, "If-Match": "2"},
+    )
+
+
+async def op_admin_users(client, rec, ctx, worker: int, rng: random.Random) -> None:
+    await timed(
+        client, rec, "GET /admin/users", "GET", "/admin/users",
+        headers=_auth(ctx["admin_token"]),
+    )
+
+
+def _todo_summaries(rng: random.Random) -> List[dict]:
+    return [
+        {"id": n, "text": f"Bench todo {n}", "done": rng.random() < 0.3, "subtaskCount": n % 3}
+        for n in range(1, rng.randint(3, 8))
+    ]
+
+
+async def op_ai(client, rec, ctx, worker: int, rng: random.Random) -> None:
+    # Chhota text pool — cache hits aur provider calls dono milte hain
+    headers = _auth(ctx["tokens"][worker % len(ctx["tokens"])])
+    route = rng.choice(["split", "parse-task", "boss-lore", "coach", "briefing"])
+    text = rng.choice(_SPLIT_TEXTS) + ("" if rng.random() < 0.5 else f" #{rng.randrange(1000)}")
+    body = {
+        "split": lambda: {"text": text},
+        "parse-task": lambda: {"input": text},
+        "boss-lore": lambda: {"taskText": text, "subtaskCount": 3, "progress": 40},
+        "coach": lambda: {"todos": _todo_summaries(rng)},
+        "briefing": lambda: {"todos": _todo_summaries(rng), "userName": "Bench"},
+    }[route]()
+    await timed(client, rec, f"POST /ai/{route}", "POST", f"/ai/{route}", headers=headers, json=body)
+
+
+SCENARIOS = {
+    "login": op_login,
+    "todos-read": op_todos_read,
+    "todos-write": op_todos_write,
+    "admin-users": op_admin_users,
+    "ai": op_ai,
+}
+
+
+async def run_scenario(
+    base_url: str, ctx: dict, name: str, concurrency: int, duration: float, warmup: float, seed: int
+) -> Dict[str, dict]:
+    """Closed loop: `concurrency` workers, har ek pichla response aane par agla request."""
+    operation = SCENARIOS[name]
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        stop_at = time.monotonic() + warmup + duration
+
+        async def worker(index: int) -> None:
+            rng = random.Random(seed * 1000 + index)
+            while time.monotonic() < stop_at:
+                await operation(client, rec, ctx, index, rng)
+
+        async def measure() -> float:
+            await asyncio.sleep(warmup)
+            rec.enabled = True
+            started = time.monotonic()
+            await asyncio.sleep(max(0.0, stop_at - time.monotonic()))
+            rec.enabled = False
+            return time.monotonic() - started
+
+        window, *_ = await asyncio.gather(measure(), *(worker(i) for i in range(concurrency)))
+
+    return {
+        op: summarize(samples, rec.errors.get(op, 0), rec.statuses[op], window)
+        for op, samples in sorted(rec.latencies.items())
+    }
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    # Nearest-rank
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(q * len(sorted_samples) + 0.5)) - 1))
+    return sorted_samples[index]
+
+
+def summarize(samples: List[float], errors: int, statuses: Dict[str, int], window: float) -> dict:
+    ordered = sorted(samples)
+    ms = lambda q: round(percentile(ordered, q) * 1000, 2)  # noqa: E731
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "errorRate": round(errors / len(ordered), 4) if ordered else 0.0,
+        "rps": round(len(ordered) / window, 2) if window else 0.0,
+        "p50Ms": ms(0.50),
+        "p95Ms": ms(0.95),
+        "p99Ms": ms(0.99),
+        "maxMs": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        "statuses": statuses,
+    }
+
+
+# --- Baseline / regressions ---
+
+
+def compare(
+    results: Dict[str, dict], baseline: Dict[str, dict], threshold: float, min_requests: int
+) -> List[str]:
+    """p95/p99 `threshold` se zyada badhe, rps utna gira, ya errors aaye to flag."""
+    flags = []
+    for key, current in results.items():
+        before = baseline.get(key)
+        # Bahut kam samples (jaise bcrypt wala /login) par percentiles sirf noise
+        if not before or min(before["requests"], current["requests"]) < min_requests:
+            continue
+        for metric in ("p95Ms", "p99Ms"):
+            if before[metric] and current[metric] > before[metric] * (1 + threshold):
+                flags.append(
+                    f"{key}: {metric} {before[metric]} -> {current[metric]} "
+                    f"(+{(current[metric] / before[metric] - 1) * 100:.0f}%)"
+                )
+        if before["rps"] and current["rps"] < before["rps"] * (1 - threshold):
+            flags.append(
+                f"{key}: rps {before['rps']} -> {current['rps']} "
+                f"(-{(1 - current['rps'] / before['rps']) * 100:.0f}%)"
+            )
+        if current["errorRate"] > before["errorRate"] + 0.01:
+            flags.append(f"{key}: errorRate {before['errorRate']} -> {current['errorRate']}")
+    return flags
+
+
+def print_table(results: Dict[str, dict]) -> None:
+    print(
+        f"{'scenario / op':<44} {'reqs':>6} {'err':>5} {'rps':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for key, r in results.items():
+        print(
+            f"{key:<44} {r['requests']:>6} {r['errors']:>5} {r['rps']:>8.1f} "
+            f"{r['p50Ms']:>8.1f} {r['p95Ms']:>8.1f} {r['p99Ms']:>8.1f}"
+        )
+
+
+# Usage:
+#   python scripts/bench_http.py --save-baseline                   # SQLite, boots uvicorn
+#   python scripts/bench_http.py --concurrency 1,16 --scenarios todos-read,ai
+#   python scripts/bench_http.py --database-url postgresql://localhost/todo_bench --workers 4
+#   python scripts/bench_http.py --url http://127.0.0.1:8000       # already running server
+# Exit code 1 agar baseline ke against regression mila (CI mein gate ki tarah).
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end HTTP benchmark for the API hot paths")
+    parser.add_argument("--database-url", default="sqlite:////tmp/todo_bench_http.db")
+    parser.add_argument("--fresh", action="store_true", help="delete the SQLite bench DB first")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--todos-per-user", type=int, default=40)
+    parser.add_argument("--url", default="", help="benchmark this server instead of booting one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds measured per run")
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mock-latency", default=SERVER_ENV["AI_MOCK_LATENCY"])
+    parser.add_argument("--baseline", default=os.path.join(APP_DIR, "bench_http_baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--min-requests", type=int, default=30, help="skip comparing thinner ops")
+    parser.add_argument("--output", default="", help="also write this run's JSON here")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios {unknown}; choose from {list(SCENARIOS)}")
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    if args.fresh and args.database_url.startswith("sqlite:///"):
+        path = args.database_url[len("sqlite:///"):]
+        if os.path.exists(path):
+            os.remove(path)
+    os.environ["DATABASE_URL"] = args.database_url  # seed() ke imports isi DB par
+
+    started = time.monotonic()
+    ctx = seed(args.users, args.todos_per_user)
+    print(f"Seeded {args.users} users x {args.todos_per_user} todos in {time.monotonic() - started:.1f}s")
+
+    proc = None
+    base_url = args.url.rstrip("/")
+    if not base_url:
+        proc = start_server(
+            args.port, args.workers, args.database_url, {"AI_MOCK_LATENCY": args.mock_latency}
+        )
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    results: Dict[str, dict] = {}
+    try:
+        for name in scenarios:
+            for concurrency in levels:
+                ops = asyncio.run(
+                    run_scenario(
+                        base_url, ctx, name, concurrency, args.duration, args.warmup, args.seed
+                    )
+                )
+                for op, summary in ops.items():
+                    results[f"{name} c={concurrency} {op}"] = summary
+                print(f"  {name} c={concurrency}: " + ", ".join(
+                    f"{op} {s['rps']:.0f} rps p95 {s['p95Ms']:.0f}ms" for op, s in ops.items()
+                ))
+    finally:
+        if proc is not None:
+            stop_server(proc)
+
+    print()
+    print_table(results)
+
+    run = {
+        "meta": {
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "database": args.database_url.split("://", 1)[0],
+            "workers": args.workers,
+            "users": args.users,
+            "todosPerUser": args.todos_per_user,
+            "duration": args.duration,
+            "mockLatency": args.mock_latency,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+
+    regressions: List[str] = []
+    baseline: Optional[dict] = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(
+            results, baseline.get("results", {}), args.threshold, args.min_requests
+        )
+        print()
+        if regressions:
+            print(f"REGRESSIONS vs {args.baseline} (threshold {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+        else:
+            print(f"No regressions vs {args.baseline} (threshold {args.threshold:.0%})")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    sys.exit(1 if regressions and not args.save_baseline else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import sys
+import os
+import argparse
+import json
+import re
+import statistics
+import subprocess
+
+# App directory (scripts/ ka parent) — wahi se `import main` hoga
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(APP_DIR, "scripts", "baselines", "import_time.json")
+
+# Ye modules cold start par load nahi hone chahiye (lazy subsystems)
+LAZY_MODULES = ["qrcode", "pyotp", "fastapi_mail", "passlib", "openai", "PIL"]
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def run_once(module: str) -> dict:
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    env.setdefault("DATABASE_URL", "sqlite://")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if not m:
+            continue
+        self_us, cumulative_us, indent, name = m.groups()
+        modules[name] = {
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(indent) - 1) // 2,
+        }
+    return modules
+
+
+def measure(module: str, runs: int, top: int) -> dict:
+    samples = [run_once(module) for _ in range(runs)]
+    totals = [s[module]["cumulative_us"] for s in samples if module in s]
+
+    # Direct imports of the target module, sorted by median cumulative cost
+    direct = {}
+    for s in samples:
+        for name, row in s.items():
+            if row["depth"] == 1:
+                direct.setdefault(name, []).append(row["cumulative_us"])
+    heaviest = sorted(
+        ((name, statistics.median(v)) for name, v in direct.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+
+    loaded = set().union(*(s.keys() for s in samples))
+    eager = sorted(
+        {
+            name
+            for name in loaded
+            for lazy in LAZY_MODULES
+            if name == lazy or name.startswith(lazy + ".")
+        }
+    )
+
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": round(statistics.median(totals) / 1000, 2),
+        "min_ms": round(min(totals) / 1000, 2),
+        "heaviest_ms": {name: round(us / 1000, 2) for name, us in heaviest},
+        "eager_lazy_modules": eager,
+    }
+
+
+def compare(result: dict, baseline: dict, threshold: float) -> list[str]:
+    problems = []
+    limit = baseline["median_ms"] * (1 + threshold)
+    if result["median_ms"] > limit:
+        problems.append(
+            f"median import time {result['median_ms']}ms > baseline "
+            f"{baseline['median_ms']}ms (+{int(threshold * 100)}% allowed)"
+        )
+    new_eager = set(result["eager_lazy_modules"]) - set(
+        baseline.get("eager_lazy_modules", [])
+    )
+    if new_eager:
+        problems.append(f"lazy modules now imported eagerly: {sorted(new_eager)}")
+    return problems
+
+
+# Usage:
+#   python scripts/bench_import_time.py --save-baseline   # baseline record karo
+#   python scripts/bench_import_time.py                   # baseline se compare (CI)
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time benchmark")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed slowdown (0.2 = 20%%)"
+    )
+    args = parser.parse_args()
+
+    result = measure(args.module, args.runs, args.top)
+    print(f"import {result['module']}: median {result['median_ms']}ms "
+          f"(min {result['min_ms']}ms over {result['runs']} runs)")
+    for name, ms in result["heaviest_ms"].items():
+        print(f"  {ms:>9.2f}ms  {name}")
+    if result["eager_lazy_modules"]:
+        print(f"  eager lazy modules: {', '.join(result['eager_lazy_modules'])}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        # Gate hai — bina baseline ke "pass" karna kuch check nahi karta
+        print(f"No baseline at {args.baseline}; run with --save-baseline first.")
+        sys.exit(2)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    problems = compare(result, baseline, args.threshold)
+    if problems:
+        for p in problems:
+            print(f"REGRESSION: {p}")
+        sys.exit(1)
+    print("No import-time regression.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import sys
+import os
+import argparse
+import random
+import time
+
+# Add parent directory to path so we can import 'policy_engine'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import policy_engine as pe
+from policy_rules import POLICY_RULES
+
+
+class _User:
+    __slots__ = ("id", "role")
+
+    def __init__(self, id: int, role: str):
+        self.id = id
+        self.role = role
+
+
+def synthetic_rules(count: int, rng: random.Random) -> list[dict]:
+    """App rules + `count` random extra rules spread over many roles."""
+    actions = [a.value for a in pe.Action]
+    resources = [r.value for r in pe.ResourceType]
+    rules = list(POLICY_RULES)
+    for i in range(count):
+        rules.append(
+            {
+                "id": f"synthetic-{i}",
+                "effect": "deny" if rng.random() < 0.1 else "allow",
+                "roles": [f"ROLE_{rng.randrange(50)}", "*"][: rng.choice([1, 1, 1, 2])],
+                "actions": rng.sample(actions, rng.randint(1, len(actions))),
+                "resources": rng.sample(resources, rng.randint(1, len(resources))),
+                "when": rng.sample(
+                    ["resource_owner", "business_hours"], rng.randint(0, 2)
+                ),
+            }
+        )
+    return rules
+
+
+def bench(rule_count: int, decisions: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    pe.reload_rules(synthetic_rules(rule_count, rng))
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    users = [_User(i, rng.choice(["USER", "ADMIN", f"ROLE_{i % 50}"])) for i in range(200)]
+    resources = [None] + [pe.ResourceMeta(i, rng.randrange(200), 1) for i in range(200)]
+    contexts = [None, None, None, {"hour": 10}, {"hour": 22}]
+    actions = list(pe.Action)
+    res_types = list(pe.ResourceType)
+    calls = [
+        (
+            rng.choice(users),
+            rng.choice(actions),
+            rng.choice(res_types),
+            rng.choice(resources),
+            rng.choice(contexts),
+        )
+        for _ in range(decisions)
+    ]
+
+    can = pe.can
+    # Warm-up: entries ab reload par hi compile hote hain; yeh sirf interpreter caches garam karta hai
+    for call in calls[:1000]:
+        can(*call)
+
+    started = time.perf_counter()
+    for user, action, res_type, resource, context in calls:
+        can(user, action, res_type, resource, context)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "rules": len(pe._table.rules),
+        "compile_ms": round(compile_ms, 2),
+        "ns_per_decision": round(elapsed / decisions * 1e9, 1),
+    }
+
+
+# Usage: python scripts/bench_policy_engine.py --sizes 0,10,100,500,1000
+def main():
+    parser = argparse.ArgumentParser(description="Policy decision micro-benchmark")
+    parser.add_argument("--sizes", default="0,10,100,250,500,1000")
+    parser.add_argument("--decisions", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'rules':>6} {'compile ms':>11} {'ns/decision':>12}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        result = bench(size, args.decisions, args.seed)
+        print(
+            f"{result['rules']:>6} {result['compile_ms']:>11} "
+            f"{result['ns_per_decision']:>12}"
+        )
+    pe.reload_rules()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import sys
+import os
+import argparse
+import random
+import re
+from typing import List, Optional
+
+# Add parent directory to path so we can import 'services'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from services.heuristics import heuristic_split, parse_task_rules
+
+
+# --- Legacy implementation (llm_client se pehle wala) — golden outputs isi se ---
+
+
+def legacy_split(text: str) -> dict:
+    cleaned = text.strip()
+    lines = [ln.strip() for ln in cleaned.splitlines() if ln.strip()]
+    bullet_items: List[str] = []
+    title: Optional[str] = None
+    bullet_re = re.compile(r"^(\s*[-*•]\s+|\s*\d+\.\s+)")
+
+    for raw in lines:
+        if bullet_re.match(raw):
+            item = bullet_re.sub("", raw).strip()
+            if item:
+                bullet_items.append(item)
+        elif not title and not bullet_items:
+            title = raw
+
+    if not bullet_items:
+        parts = re.split(r"[,;]|(?:\band\b)", cleaned, flags=re.IGNORECASE)
+        parts = [p.strip(" .") for p in parts if p.strip()]
+        if len(parts) >= 2:
+            title = parts[0].title() if parts[0] else "New project"
+            bullet_items = [p[:120].capitalize() for p in parts[1:12]]
+        else:
+            words = cleaned.split()
+            title = " ".join(words[:6]).title() if words else "New project"
+            bullet_items = ["Define scope", "Break into steps", "Start first step"]
+
+    if not title:
+        title = bullet_items[0] if bullet_items else "New project"
+    return {"title": title[:120], "subtasks": bullet_items[:12]}
+
+
+def legacy_rules(stripped: str) -> Optional[dict]:
+    nl_patterns = [
+        r"^(?:create|add|make)\s+(.+?)\s+with\s+(.+)$",
+        r"^(.+?)\s+with\s+(.+?)\s+subtasks?$",
+        r"^(.+?):\s*(.+)$",
+    ]
+    for pat in nl_patterns:
+        m = re.match(pat, stripped, re.IGNORECASE)
+        if m:
+            parent = m.group(1).strip(" .")
+            subs_raw = m.group(2)
+            subs = [
+                s.strip(" .")
+                for s in re.split(r"[,;]|(?:\band\b)", subs_raw, flags=re.IGNORECASE)
+                if s.strip()
+            ]
+            if parent and subs:
+                return {"parent": parent[:120], "subtasks": [s[:200] for s in subs[:12]]}
+    return None
+
+
+# --- Corpus ---
+
+FIXED_CASES = [
+    "Plan the team offsite",
+    "Buy milk, eggs and bread",
+    "Launch website\n- design mockups\n- build pages\n* deploy\n1. announce",
+    "- only bullets\n- here",
+    "-\n- \n1.\n2. real item",
+    "  \n\n  ",
+    "Trip: pack bags, book hotel; rent car",
+    "trip:",
+    ": nothing before colon",
+    "Create onboarding doc with intro, setup and FAQ",
+    "ADD Groceries WITH apples AND pears",
+    "make dinner with",
+    "Garage cleanup with sweep floor and sort tools subtasks",
+    "Garage cleanup with sweep floor and sort tools subtask",
+    "Report WİTH charts and tables ſubtasks",
+    "Wıth nothing: here",
+    "The band played, andante and grand finale",
+    "android, ANDROID and Andrew",
+    "one. two. three.",
+    "  ,  ;  and  ",
+    "Title line\nsecond line\n3. numbered after text",
+    "१. devanagari digit bullet\n२. second",
+    "• unicode bullet\n•no space bullet",
+    "x" * 4000,
+    ("word " * 900).strip(),
+    ", ".join(f"item {i}" for i in range(40)),
+    "Q3 plan:\n- hire\n- budget",
+    "create x with y\nand more lines",
+]
+
+_WORDS = [
+    "plan", "and", "AND", "with", "With", "subtasks", "subtask", "create", "Add",
+    "make", "report", "band", "android", "milk", "trip", ":", ",", ";", ".", "-",
+    "*", "•", "1.", "12.", "İ", "ı", "ſ", "café", "\n", "\n- ", "\n2. ", "  ", "\t",
+]
+
+
+def random_case(rng: random.Random, max_len: int) -> str:
+    parts = []
+    size = 0
+    target = rng.randint(0, max_len)
+    while size < target:
+        token = rng.choice(_WORDS)
+        parts.append(token)
+        parts.append(rng.choice([" ", " ", "", "\n"]))
+        size += len(token) + 1
+    text = "".join(parts)[:max_len]
+    if rng.random() < 0.2:
+        text = rng.choice(["create ", "Add ", "make "]) + text
+    if rng.random() < 0.2:
+        text += rng.choice([" subtasks", " subtask", " SUBTASKS"])
+    return text
+
+
+def corpus(count: int, seed: int, max_len: int = 4000) -> List[str]:
+    rng = random.Random(seed)
+    cases = list(FIXED_CASES)
+    cases += [random_case(rng, rng.choice([40, 200, 1000, max_len])) for _ in range(count)]
+    return cases
+
+
+def check(cases: List[str]) -> List[str]:
+    failures = []
+    for text in cases:
+        got = heuristic_split(text)
+        want = legacy_split(text)
+        if {"title": got.title, "subtasks": got.subtasks} != want:
+            failures.append(f"split {text[:60]!r}: {want} != {got}")
+
+        stripped = text.strip()
+        got_rules = parse_task_rules(stripped)
+        want_rules = legacy_rules(stripped)
+        got_rules = got_rules.model_dump() if got_rules else None
+        if got_rules != want_rules:
+            failures.append(f"rules {stripped[:60]!r}: {want_rules} != {got_rules}")
+    return failures
+
+
+# Golden check: naya single-pass engine legacy jaisa hi output de
+#   python scripts/check_heuristics.py --count 20000 --seed 7
+def main():
+    parser = argparse.ArgumentParser(description="Heuristic parser equivalence check")
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    cases = corpus(args.count, args.seed)
+    failures = check(cases)
+    for line in failures[:20]:
+        print(line)
+    print(f"{len(cases)} inputs, {len(failures)} mismatches")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import sys
+import os
+import argparse
+import random
+
+# Add parent directory to path so we can import 'policy_engine' and 'modal'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+import policy_engine as pe
+from modal.user import User
+from modal.todo import Todo
+
+
+# Property check: har random (user, action, resource_type) ke liye
+# `can()` row-by-row aur `predicate()` SQL mein bilkul same rows allow karein.
+#   python scripts/check_policy_pushdown.py --rounds 200 --seed 7
+def check_round(db, rng: random.Random) -> list[str]:
+    db.query(Todo).delete()
+    db.query(User).delete()
+
+    users = [
+        User(
+            id=i,
+            email=f"user{i}@example.com",
+            role=rng.choice(["USER", "USER", "ADMIN", "GUEST"]),
+        )
+        for i in range(1, rng.randint(2, 6))
+    ]
+    db.add_all(users)
+    db.flush()
+
+    user_ids = [u.id for u in users]
+    for i in range(1, rng.randint(1, 40)):
+        db.add(
+            Todo(
+                id=i,
+                text=f"todo {i}",
+                user_id=rng.choice(user_ids + [None]),
+                parent_id=None,
+            )
+        )
+    db.flush()
+
+    failures = []
+    models = {pe.ResourceType.TODO: Todo, pe.ResourceType.USER: User}
+    for user in users:
+        for res_type, model in models.items():
+            rows = db.query(model).all()
+            for action in pe.Action:
+                expected = {r.id for r in rows if pe.can(user, action, res_type, r)}
+                actual = {
+                    r.id
+                    for r in db.query(model)
+                    .filter(pe.predicate(user, action, res_type))
+                    .all()
+                }
+                if expected != actual:
+                    failures.append(
+                        f"user={user.id}({user.role}) {action.value} {res_type.value}: "
+                        f"can={sorted(expected)} predicate={sorted(actual)}"
+                    )
+    db.rollback()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="can() vs predicate() property check")
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    seed = args.seed if args.seed is not None else random.randrange(1 << 30)
+    rng = random.Random(seed)
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    for i in range(args.rounds):
+        failures = check_round(db, rng)
+        if failures:
+            print(f"FAILED (seed={seed}, round={i}):")
+            for f in failures[:20]:
+                print(f"  {f}")
+            sys.exit(1)
+
+    print(f"OK: can() and predicate() agree over {args.rounds} rounds (seed={seed})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import os
+import argparse
+import asyncio
+import random
+import time
+from email import message_from_bytes
+from email.policy import default as default_policy
+
+
+class Stats:
+    def __init__(self):
+        self.connections = 0
+        self.messages = 0
+        self.transient_failures = 0
+        self.rejected = 0
+        self.started = time.monotonic()
+
+
+class LocalSMTPServer:
+    """
+    Tests / load runs ke liye chhota SMTP stand-in (no TLS). Mails memory mein
+    count hoti hain, chaaho to --maildir mein .eml files.
+
+    Fault injection: --fail-rate (451, retry hona chahiye), --reject-domain
+    (550, permanent), --drop-after N (N mails ke baad connection kaat do —
+    client ko reconnect karna padega).
+    """
+
+    def __init__(self, fail_rate: float, reject_domain: str, drop_after: int, maildir: str):
+        self.fail_rate = fail_rate
+        self.reject_domain = reject_domain.lower()
+        self.drop_after = drop_after
+        self.maildir = maildir
+        self.stats = Stats()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        sent_here = 0
+        sender, recipients = None, []
+
+        async def reply(line: str) -> None:
+            writer.write(line.encode() + b"\r\n")
+            await writer.drain()
+
+        await reply("220 localhost ESMTP todo-app stand-in")
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    return
+                line = raw.decode(errors="replace").rstrip("\r\n")
+                verb, _, arg = line.partition(" ")
+                verb = verb.upper()
+
+                if verb == "EHLO":
+                    await reply("250-localhost")
+                    await reply("250-8BITMIME")
+                    await reply("250 AUTH PLAIN LOGIN")
+                elif verb == "HELO":
+                    await reply("250 localhost")
+                elif verb == "AUTH":
+                    # Koi bhi credentials chalenge — sirf protocol flow
+                    if arg.upper().startswith("LOGIN"):
+                        await reply("334 VXNlcm5hbWU6")
+                        await reader.readline()
+                        await reply("334 UGFzc3dvcmQ6")
+                        await reader.readline()
+                    await reply("235 Authentication successful")
+                elif verb == "MAIL":
+                    sender, recipients = arg, []
+                    await reply("250 OK")
+                elif verb == "RCPT":
+                    address = arg.split(":", 1)[-1].strip(" <>").lower()
+                    if self.reject_domain and address.endswith("@" + self.reject_domain):
+                        self.stats.rejected += 1
+                        await reply("550 Mailbox unavailable")
+                    else:
+                        recipients.append(address)
+                        await reply("250 OK")
+                elif verb == "DATA":
+                    if not recipients:
+                        await reply("503 No valid recipients")
+                        continue
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = await self._read_data(reader)
+                    if random.random() < self.fail_rate:
+                        self.stats.transient_failures += 1
+                        await reply("451 Temporary local problem, try again")
+                    else:
+                        self._store(data)
+                        sent_here += 1
+                        await reply("250 OK queued")
+                    sender, recipients = None, []
+                    if self.drop_after and sent_here >= self.drop_after:
+                        return  # Bina QUIT ke connection band
+                elif verb == "RSET":
+                    sender, recipients = None, []
+                    await reply("250 OK")
+                elif verb == "NOOP":
+                    await reply("250 OK")
+                elif verb == "QUIT":
+                    await reply("221 Bye")
+                    return
+                else:
+                    await reply("502 Command not implemented")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_data(reader: asyncio.StreamReader) -> bytes:
+        lines = []
+        while True:
+            line = await reader.readline()
+            if not line or line in (b".\r\n", b".\n"):
+                break
+            if line.startswith(b".."):
+                line = line[1:]  # Dot-unstuffing
+            lines.append(line)
+        return b"".join(lines)
+
+    def _store(self, data: bytes) -> None:
+        self.stats.messages += 1
+        if not self.maildir:
+            return
+        message = message_from_bytes(data, policy=default_policy)
+        name = f"{self.stats.messages:06d}-{message.get('To', 'unknown')}.eml"
+        with open(os.path.join(self.maildir, name.replace("/", "_")), "wb") as f:
+            f.write(data)
+
+
+async def report(server: LocalSMTPServer, every: float) -> None:
+    last = 0
+    while True:
+        await asyncio.sleep(every)
+        s = server.stats
+        if s.messages != last:
+            rate = (s.messages - last) / every
+            print(
+                f"messages={s.messages} ({rate:.0f}/s) connections={s.connections} "
+                f"451s={s.transient_failures} 550s={s.rejected}"
+            )
+            last = s.messages
+
+
+# Usage:
+#   python scripts/local_smtp_server.py --port 8025 --fail-rate 0.05 --reject-domain bounce.test
+#   MAIL_SERVER=127.0.0.1 MAIL_PORT=8025 MAIL_STARTTLS=false MAIL_USE_CREDENTIALS=false uvicorn main:app
+async def serve(args) -> None:
+    if args.maildir:
+        os.makedirs(args.maildir, exist_ok=True)
+    server = LocalSMTPServer(args.fail_rate, args.reject_domain, args.drop_after, args.maildir)
+    listener = await asyncio.start_server(server.handle, args.host, args.port)
+    print(f"Local SMTP listening on {args.host}:{args.port}")
+    asyncio.get_running_loop().create_task(report(server, args.report_every))
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local SMTP stand-in for outbox tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--reject-domain", default="")
+    parser.add_argument("--drop-after", type=int, default=0)
+    parser.add_argument("--maildir", default="")
+    parser.add_argument("--report-every", type=float, default=5.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import sys
+import os
+import argparse
+
+# Add parent directory to path so we can import 'database' and 'services'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+import modal.user  # noqa: F401
+import modal.todo  # noqa: F401  Necessary to register Todo model for relationships
+from services.login_history import (
+    LOGIN_ARCHIVE_RETENTION_DAYS,
+    LOGIN_HISTORY_RETENTION_DAYS,
+    LOGIN_RETENTION_BATCH_SIZE,
+    archive_login_history,
+    count_login_history,
+)
+
+
+# Cron / scheduled task se chalao, e.g. roz raat ko:
+#   python scripts/login_retention.py --days 90
+def main():
+    parser = argparse.ArgumentParser(description="Archive old LoginHistory rows")
+    parser.add_argument("--days", type=int, default=LOGIN_HISTORY_RETENTION_DAYS)
+    parser.add_argument(
+        "--archive-days", type=int, default=LOGIN_ARCHIVE_RETENTION_DAYS
+    )
+    parser.add_argument("--batch-size", type=int, default=LOGIN_RETENTION_BATCH_SIZE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"Before: {count_login_history(db)}")
+        result = archive_login_history(
+            db,
+            retention_days=args.days,
+            archive_retention_days=args.archive_days,
+            batch_size=args.batch_size,
+        )
+        print(f"Archived {result['archived']} rows, purged {result['purged']} rows.")
+        print(f"After: {count_login_history(db)}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
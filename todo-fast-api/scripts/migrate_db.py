@@ -1,57 +1,39 @@
 import sys
 import os
+import argparse
+import logging
 
 # Add parent directory to path so we can import 'database'
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database import engine, Base
-from sqlalchemy import text
-
-
-def migrate():
-    print("Starting migration...")
-    with engine.connect() as conn:
-        conn.execution_options(isolation_level="AUTOCOMMIT")
-
-        # 1. Add 'role' column
-        try:
-            conn.execute(
-                text("ALTER TABLE \"User\" ADD COLUMN role VARCHAR DEFAULT 'USER'")
-            )
-            print("Added 'role' column.")
-        except Exception as e:
-            print(f"Skipped 'role' (might exist): {e}")
-
-        # 2. Add 'mfa_enabled' column
-        try:
-            conn.execute(
-                text('ALTER TABLE "User" ADD COLUMN mfa_enabled BOOLEAN DEFAULT FALSE')
-            )
-            print("Added 'mfa_enabled' column.")
-        except Exception as e:
-            print(f"Skipped 'mfa_enabled' (might exist): {e}")
-
-        # 3. Add 'mfa_secret' column
-        try:
-            conn.execute(text('ALTER TABLE "User" ADD COLUMN mfa_secret VARCHAR'))
-            print("Added 'mfa_secret' column.")
-        except Exception as e:
-            print(f"Skipped 'mfa_secret' (might exist): {e}")
-
-        # 4. Add 'version' column to Todo table
-        try:
-            conn.execute(
-                text('ALTER TABLE "Todo" ADD COLUMN version INTEGER DEFAULT 1')
-            )
-            print("Added 'version' column to Todo.")
-        except Exception as e:
-            print(f"Skipped 'version' (might exist): {e}")
-
-    # 4. Create new tables (like LoginHistory)
-    # This works for completely new tables
-    Base.metadata.create_all(bind=engine)
-    print("Migration finished.")
+from database import engine
+from migrations import get_current_version, latest_version, run_migrations
+
+
+# Usage:
+#   python scripts/migrate_db.py            # saari pending migrations
+#   python scripts/migrate_db.py --status   # sirf current/latest version
+#   python scripts/migrate_db.py --target 2
+def main():
+    parser = argparse.ArgumentParser(description="Versioned schema migrations")
+    parser.add_argument("--status", action="store_true")
+    parser.add_argument("--target", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    current = get_current_version(engine)
+    print(f"Schema version: {current} (latest: {latest_version()})")
+    if args.status:
+        return
+
+    applied = run_migrations(engine, target=args.target)
+    if applied:
+        print(f"Applied: {', '.join(str(v) for v in applied)}")
+    else:
+        print("Already up to date.")
+    print(f"Schema version: {get_current_version(engine)}")
 
 
 if __name__ == "__main__":
-    migrate()
+    main()
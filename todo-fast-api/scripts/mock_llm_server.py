@@ -0,0 +1,107 @@
+import sys
+import os
+import argparse
+import json
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Add parent directory to path so we can import 'services'
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.llm_mock import detect_kind, plan_call
+
+_PATH_RE = re.compile(r"/models/(?P<model>[^/:]+):(?P<method>generateContent|streamGenerateContent)$")
+
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    """Gemini REST API ka chhota stand-in — same latency/error injection (AI_MOCK_*)."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        match = _PATH_RE.search(url.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not match:
+            return self._json(404, {"error": {"message": "not found"}})
+
+        system = " ".join(
+            p.get("text", "") for p in body.get("systemInstruction", {}).get("parts", [])
+        )
+        user = " ".join(
+            p.get("text", "")
+            for c in body.get("contents", [])
+            for p in c.get("parts", [])
+        )
+        model = match.group("model")
+        latency, outcome, text = plan_call(model, detect_kind(system), user)
+
+        if text is None:
+            time.sleep(latency)
+            status = 504 if outcome == "timeout" else 503
+            return self._json(status, {"error": {"message": f"mock {outcome}"}})
+
+        if match.group("method") == "generateContent":
+            time.sleep(latency)
+            return self._json(200, _candidate(text))
+
+        if parse_qs(url.query).get("alt") != ["sse"]:
+            return self._json(400, {"error": {"message": "only alt=sse streaming supported"}})
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        chunks = [text[i : i + 16] for i in range(0, len(text), 16)]
+        time.sleep(latency * 0.3)
+        for chunk in chunks:
+            self.wfile.write(f"data: {json.dumps(_candidate(chunk))}\r\n\r\n".encode())
+            self.wfile.flush()
+            time.sleep(latency * 0.7 / len(chunks))
+        self.close_connection = True
+
+    def _json(self, status: int, payload: dict) -> None:
+        out = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _candidate(text: str) -> dict:
+    return {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]}}]}
+
+
+def serve(host: str, port: int) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), MockGeminiHandler)
+    server.daemon_threads = True
+    return server
+
+
+# Usage:
+#   AI_MOCK_LATENCY=lognormal:400,0.6 AI_MOCK_ERROR_RATE=0.05 python scripts/mock_llm_server.py --port 8799
+#   AI_PROVIDER=gemini GEMINI_API_KEY=mock GEMINI_BASE_URL=http://127.0.0.1:8799 uvicorn main:app
+def main():
+    parser = argparse.ArgumentParser(description="Gemini-compatible mock LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port)
+    print(f"Mock Gemini listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from modal.ai import AIInsightCache
+from modal.user import User
+import schema.ai as ai_schemas
+
+AI_INSIGHT_CACHE_ENABLED = os.getenv("AI_INSIGHT_CACHE_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+
+def bump_todo_version(db: Session, user_id: Optional[int]) -> None:
+    """Todo write ke saath (same transaction) call karo; stored insights stale ho jaate hain."""
+    if user_id is None:
+        return
+    db.query(User).filter(User.id == user_id).update(
+        {User.todo_version: User.todo_version + 1}, synchronize_session=False
+    )
+
+
+def todos_fingerprint(todos: List[ai_schemas.TodoSummary]) -> str:
+    """
+    Client ne jo todos bheje unka stable hash. Fastify/Prisma same DB mein todos
+    likhta hai par todo_version bump nahi karta — isliye asli key payload hai,
+    todo_version sirf extra invalidation signal.
+    """
+    rows = sorted(
+        (t.model_dump(exclude_none=True) for t in todos), key=lambda t: t["id"]
+    )
+    raw = json.dumps(rows, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def params_hash(kind: str, params: Dict[str, Any]) -> str:
+    raw = json.dumps([kind, params], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _lookup(user_id: int, kind: str, phash: str) -> Optional[Tuple[int, Optional[str]]]:
+    """(current todo_version, fresh stored response ya None). User DB mein na ho to None."""
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(
+                User.todo_version,
+                AIInsightCache.todo_version,
+                AIInsightCache.payload_hash,
+                AIInsightCache.response,
+            )
+            .outerjoin(
+                AIInsightCache,
+                and_(AIInsightCache.user_id == User.id, AIInsightCache.kind == kind),
+            )
+            .filter(User.id == user_id)
+            .first()
+        )
+    finally:
+        db.close()
+    if row is None:
+        return None
+    version, stored_version, stored_hash, response = row
+    version = version or 0
+    if response is not None and stored_version == version and stored_hash == phash:
+        return version, response
+    return version, None
+
+
+def _store(user_id: int, kind: str, phash: str, version: int, response: str) -> None:
+    db = SessionLocal()
+    try:
+        updated = (
+            db.query(AIInsightCache)
+            .filter(AIInsightCache.user_id == user_id, AIInsightCache.kind == kind)
+            .update(
+                {
+                    AIInsightCache.todo_version: version,
+                    AIInsightCache.payload_hash: phash,
+                    AIInsightCache.response: response,
+                },
+                synchronize_session=False,
+            )
+        )
+        if not updated:
+            db.add(
+                AIInsightCache(
+                    user_id=user_id,
+                    kind=kind,
+                    todo_version=version,
+                    payload_hash=phash,
+                    response=response,
+                )
+            )
+        db.commit()
+    except IntegrityError:
+        # Parallel request ne same row bana di — uska answer bhi utna hi fresh hai
+        db.rollback()
+    finally:
+        db.close()
+
+
+async def cached_insight(
+    user_id: int,
+    kind: str,
+    params: Dict[str, Any],
+    compute: Callable[[], Awaitable[BaseModel]],
+    response_model: Type[BaseModel],
+) -> BaseModel:
+    """
+    Stored answer: params (todos payload hash samet) aur User.todo_version dono
+    match hon tabhi hit. Miss par compute karke store — version call se *pehle*
+    wala, taaki beech mein hua write answer ko stale kar de.
+    Heuristic fallback answers store nahi hote (agli baar LLM dobara try ho).
+    """
+    from services.llm_client import _call_stats
+
+    if not AI_INSIGHT_CACHE_ENABLED:
+        return await compute()
+
+    phash = params_hash(kind, params)
+    state = await asyncio.to_thread(_lookup, user_id, kind, phash)
+    if state is None:
+        # Token user ki User row nahi mili (Fastify-only account) — store kahan karein
+        return await compute()
+    version, stored = state
+    if stored is not None:
+        return response_model.model_validate_json(stored)
+
+    stats = _call_stats.get()
+    fallbacks_before = stats.fallbacks if stats else 0
+    result = await compute()
+    if not stats or stats.fallbacks == fallbacks_before:
+        await asyncio.to_thread(
+            _store, user_id, kind, phash, version, result.model_dump_json()
+        )
+    return result
+
+
+async def briefing_for_user(
+    user_id: int, todos: List[ai_schemas.TodoSummary], user_name: str
+) -> ai_schemas.AIBriefingResponse:
+    from services.llm_client import ai_briefing
+
+    return await cached_insight(
+        user_id,
+        "briefing",
+        {"userName": user_name, "todos": todos_fingerprint(todos)},
+        lambda: ai_briefing(todos, user_name),
+        ai_schemas.AIBriefingResponse,
+    )
+
+
+async def coach_for_user(
+    user_id: int, todos: List[ai_schemas.TodoSummary], focus_task_id: Optional[int]
+) -> ai_schemas.AICoachResponse:
+    from services.llm_client import ai_coach
+
+    return await cached_insight(
+        user_id,
+        "coach",
+        {"focusTaskId": focus_task_id, "todos": todos_fingerprint(todos)},
+        lambda: ai_coach(todos, focus_task_id),
+        ai_schemas.AICoachResponse,
+    )
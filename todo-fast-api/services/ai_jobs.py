@@ -0,0 +1,232 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+logger = logging.getLogger("ai_jobs")
+
+# Ek worker process mein ek saath kitne AI jobs chal sakte hain
+AI_JOB_WORKERS = int(os.getenv("AI_JOB_WORKERS", "4"))
+# Queue full = 503; ek user ke pending jobs limit se upar = 429
+AI_JOB_MAX_QUEUE = int(os.getenv("AI_JOB_MAX_QUEUE", "500"))
+AI_JOB_MAX_PENDING_PER_USER = int(os.getenv("AI_JOB_MAX_PENDING_PER_USER", "20"))
+# Finished job ka result kitni der tak poll kar sakte ho
+AI_JOB_RESULT_TTL_SECONDS = int(os.getenv("AI_JOB_RESULT_TTL_SECONDS", "600"))
+
+# /ai/* routes 0 par; POST /ai/jobs sirf PRIORITY_BACKGROUND..9 maang sakta hai
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 5
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class AIJob:
+    __slots__ = (
+        "id", "user_id", "kind", "priority", "call", "status", "result", "error",
+        "created_at", "started_at", "finished_at", "future",
+    )
+
+    def __init__(self, user_id: int, kind: str, priority: int, call: Callable[[], Awaitable[Any]]):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.kind = kind
+        self.priority = priority
+        self.call = call
+        self.status = QUEUED
+        self.result: Any = None
+        # (status_code, detail) — HTTPException ko poll/wait par same tarah raise karte hain
+        self.error: Optional[Tuple[int, str]] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = self.result
+        if hasattr(result, "model_dump"):
+            result = result.model_dump()
+        data: Dict[str, Any] = {
+            "jobId": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "priority": self.priority,
+            "result": result,
+            "error": None,
+        }
+        if self.error:
+            data["error"] = {"status": self.error[0], "detail": self.error[1]}
+        if self.started_at:
+            data["queuedMs"] = round((self.started_at - self.created_at) * 1000, 1)
+        if self.finished_at and self.started_at:
+            data["runMs"] = round((self.finished_at - self.started_at) * 1000, 1)
+        return data
+
+
+class AIJobQueue:
+    """
+    Bounded worker pool for LLM work — CRUD requests LLM latency ke peeche nahi phanste.
+
+    Ordering: (priority, user ka pending rank, seq). Rank = submit ke waqt us user
+    ke kitne jobs already pending the, to ek user ke 20 jobs doosre users ke
+    pehle job ko peeche nahi dhakelte (round-robin jaisi fairness).
+    """
+
+    def __init__(self, workers: int = AI_JOB_WORKERS):
+        self.worker_count = workers
+        self._heap: List[Tuple[int, int, int, AIJob]] = []
+        self._seq = itertools.count()
+        self._pending_by_user: Dict[int, int] = {}
+        self._jobs: Dict[str, AIJob] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Condition] = None
+        self._workers: List[asyncio.Task] = []
+        self.completed = 0
+        self.failed = 0
+
+    def _ensure_started(self) -> None:
+        # Workers apne event loop se bandhe hote hain (tests / reload par naya loop)
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Condition()
+        self._heap.clear()
+        self._pending_by_user.clear()
+        self._workers = [
+            loop.create_task(self._worker(i)) for i in range(self.worker_count)
+        ]
+
+    async def stop(self) -> None:
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for _, _, _, job in self._heap:
+            if not job.future.done():
+                job.future.cancel()
+        self._heap.clear()
+        self._pending_by_user.clear()
+
+    async def submit(
+        self,
+        user_id: int,
+        kind: str,
+        call: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> AIJob:
+        self._ensure_started()
+        self._expire_finished()
+        if len(self._heap) >= AI_JOB_MAX_QUEUE:
+            raise HTTPException(status_code=503, detail="AI queue is full. Try again shortly.")
+        pending = self._pending_by_user.get(user_id, 0)
+        if pending >= AI_JOB_MAX_PENDING_PER_USER:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many pending AI jobs ({AI_JOB_MAX_PENDING_PER_USER}).",
+            )
+
+        job = AIJob(user_id, kind, priority, call)
+        self._jobs[job.id] = job
+        self._pending_by_user[user_id] = pending + 1
+        async with self._wakeup:
+            heapq.heappush(self._heap, (priority, pending, next(self._seq), job))
+            self._wakeup.notify()
+        return job
+
+    async def submit_and_wait(
+        self,
+        user_id: int,
+        kind: str,
+        call: Callable[[], Awaitable[Any]],
+        timeout: float,
+        priority: int = PRIORITY_INTERACTIVE,
+    ) -> AIJob:
+        job = await self.submit(user_id, kind, call, priority)
+        await self.wait(job, timeout)
+        return job
+
+    async def wait(self, job: AIJob, timeout: Optional[float]) -> None:
+        """Job khatam hone tak (ya timeout tak; None = bina limit) ruko; job khud cancel nahi hota."""
+        if job.future.done() or (timeout is not None and timeout <= 0):
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(job.future), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def get(self, job_id: str) -> Optional[AIJob]:
+        return self._jobs.get(job_id)
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            async with self._wakeup:
+                while not self._heap:
+                    await self._wakeup.wait()
+                _, _, _, job = heapq.heappop(self._heap)
+            remaining = self._pending_by_user.get(job.user_id, 1) - 1
+            if remaining > 0:
+                self._pending_by_user[job.user_id] = remaining
+            else:
+                self._pending_by_user.pop(job.user_id, None)
+            await self._run(job)
+
+    async def _run(self, job: AIJob) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = await job.call()
+            job.status = DONE
+            self.completed += 1
+        except HTTPException as exc:
+            job.status = FAILED
+            job.error = (exc.status_code, str(exc.detail))
+            self.failed += 1
+        except ValueError as exc:
+            # Invalid input (e.g. focus task not found) — route par 400 tha
+            job.status = FAILED
+            job.error = (400, str(exc))
+            self.failed += 1
+        except Exception as exc:
+            logger.exception("AI job %s (%s) failed", job.id, job.kind)
+            job.status = FAILED
+            job.error = (500, f"AI job failed: {exc}")
+            self.failed += 1
+        finally:
+            job.finished_at = time.time()
+            job.call = None  # closure (request payload) chhod do
+            if not job.future.done():
+                job.future.set_result(None)
+
+    def _expire_finished(self) -> None:
+        cutoff = time.time() - AI_JOB_RESULT_TTL_SECONDS
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        running = sum(1 for job in self._jobs.values() if job.status == RUNNING)
+        return {
+            "workers": self.worker_count,
+            "queued": len(self._heap),
+            "running": running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "usersWaiting": len(self._pending_by_user),
+        }
+
+
+# Global AI Job Queue
+job_queue = AIJobQueue()
@@ -1,37 +1,275 @@
+import asyncio
+import math
 import os
-from datetime import date
-from typing import Dict, Tuple
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
 
-_daily_counts: Dict[int, Tuple[str, int]] = {}
+# Bucket capacity (burst) — purana "per day" limit hi default hai
 DEFAULT_LIMIT = int(os.getenv("AI_MAX_REQUESTS_PER_USER_PER_DAY", "50"))
+# Khaali bucket kitne seconds mein poora refill ho (default 1 din = rolling daily limit)
+AI_RATE_LIMIT_REFILL_SECONDS = float(os.getenv("AI_RATE_LIMIT_REFILL_SECONDS", "86400"))
+# memory = per process; sqlite = saare uvicorn workers ek hi file share karte hain
+AI_RATE_LIMIT_STORE = os.getenv("AI_RATE_LIMIT_STORE", "memory").lower()
+AI_RATE_LIMIT_DB = os.getenv("AI_RATE_LIMIT_DB", "ai_rate_limit.sqlite3")
+# Memory store mein max users; idle (poore refill ho chuke) buckets pehle hatte hain
+AI_RATE_LIMIT_MAX_KEYS = int(os.getenv("AI_RATE_LIMIT_MAX_KEYS", "100000"))
+# Route cost, e.g. "briefing=2,coach=2" — baaki routes 1
+AI_ROUTE_COSTS = os.getenv("AI_ROUTE_COSTS", "")
 
+# (tokens, updated_at) -> (new (tokens, updated_at), result)
+BucketUpdate = Callable[[Optional[Tuple[float, float]]], Tuple[Tuple[float, float], float]]
 
-def check_rate_limit(user_id: int) -> None:
-    today = date.today().isoformat()
-    stored = _daily_counts.get(user_id)
-    if stored and stored[0] == today and stored[1] >= DEFAULT_LIMIT:
-        from fastapi import HTTPException
 
-        raise HTTPException(
+def _parse_costs(raw: str) -> Dict[str, int]:
+    costs: Dict[str, int] = {}
+    for item in raw.split(","):
+        if "=" in item:
+            route, cost = item.split("=", 1)
+            costs[route.strip()] = int(cost)
+    return costs
+
+
+ROUTE_COSTS = _parse_costs(AI_ROUTE_COSTS)
+
+
+def route_cost(route: str) -> int:
+    return ROUTE_COSTS.get(route, 1)
+
+
+class MemoryBucketStore:
+    """Ek process ke andar, lock ke saath atomic. Bounded: LRU + idle eviction."""
+
+    def __init__(self, max_keys: int = AI_RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def apply(self, key: str, update: BucketUpdate) -> float:
+        with self._lock:
+            state, result = update(self._buckets.get(key))
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            if len(self._buckets) > self.max_keys:
+                # Sabse purana bucket sabse zyada refill ho chuka hai — wahi hatao
+                self._buckets.popitem(last=False)
+            return result
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        """Read-only: LRU order / bucket creation nahi."""
+        with self._lock:
+            return self._buckets.get(key)
+
+    def evict_idle(self, idle_before: float) -> int:
+        """updated_at < idle_before wale buckets ab tak full ho chuke — hata do."""
+        with self._lock:
+            stale = [k for k, (_, ts) in self._buckets.items() if ts < idle_before]
+            for key in stale:
+                del self._buckets[key]
+            return len(stale)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class SQLiteBucketStore:
+    """
+    Saare workers ek SQLite file share karte hain. BEGIN IMMEDIATE write lock
+    leta hai, to read-modify-write processes ke beech bhi atomic hai.
+    """
+
+    def __init__(self, path: str = AI_RATE_LIMIT_DB):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ai_rate_buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def apply(self, key: str, update: BucketUpdate) -> float:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated_at FROM ai_rate_buckets WHERE key = ?", (key,)
+            ).fetchone()
+            state, result = update(tuple(row) if row else None)
+            conn.execute(
+                "INSERT OR REPLACE INTO ai_rate_buckets (key, tokens, updated_at) "
+                "VALUES (?, ?, ?)",
+                (key, state[0], state[1]),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    def get(self, key: str) -> Optional[Tuple[float, float]]:
+        # Autocommit SELECT — WAL mein writer ko block nahi karta, koi write lock nahi
+        row = self._conn().execute(
+            "SELECT tokens, updated_at FROM ai_rate_buckets WHERE key = ?", (key,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    def evict_idle(self, idle_before: float) -> int:
+        cur = self._conn().execute(
+            "DELETE FROM ai_rate_buckets WHERE updated_at < ?", (idle_before,)
+        )
+        return cur.rowcount
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM ai_rate_buckets").fetchone()[0]
+
+
+class TokenBucketLimiter:
+    """
+    Per-user token bucket: `capacity` tokens, har second capacity/refill_seconds
+    wapas. consume() check + deduct ek hi atomic step hai (store ke lock/txn mein).
+    """
+
+    def __init__(
+        self,
+        store,
+        capacity: int = DEFAULT_LIMIT,
+        refill_seconds: float = AI_RATE_LIMIT_REFILL_SECONDS,
+    ):
+        self.store = store
+        self.capacity = float(capacity)
+        self.refill_seconds = refill_seconds
+        self.rate = self.capacity / refill_seconds if refill_seconds > 0 else float("inf")
+        self._ops = 0
+
+    def _refilled(self, state: Optional[Tuple[float, float]], now: float) -> float:
+        if state is None:
+            return self.capacity
+        tokens, updated_at = state
+        return min(self.capacity, tokens + (now - updated_at) * self.rate)
+
+    def consume(self, user_id: int, cost: int = 1) -> Tuple[bool, int]:
+        """Tokens hon to kaato. Returns (allowed, remaining)."""
+        now = time.time()
+        outcome = {}
+
+        def update(state):
+            tokens = self._refilled(state, now)
+            outcome["allowed"] = tokens >= cost
+            if outcome["allowed"]:
+                tokens -= cost
+            return (tokens, now), tokens
+
+        remaining = self.store.apply(str(user_id), update)
+        self._maybe_evict(now)
+        return outcome["allowed"], int(remaining)
+
+    def refund(self, user_id: int, cost: int = 1) -> int:
+        now = time.time()
+
+        def update(state):
+            tokens = min(self.capacity, self._refilled(state, now) + cost)
+            return (tokens, now), tokens
+
+        return int(self.store.apply(str(user_id), update))
+
+    def remaining(self, user_id: int) -> int:
+        """Read-only: refill compute hota hai, store mein likha nahi jaata."""
+        return int(self._refilled(self.store.get(str(user_id)), time.time()))
+
+    def seconds_until(self, user_id: int, cost: int = 1) -> float:
+        """`cost` tokens kitni der mein wapas aayenge (0 = abhi available)."""
+        tokens = self._refilled(self.store.get(str(user_id)), time.time())
+        if tokens >= cost:
+            return 0.0
+        if cost > self.capacity or self.rate <= 0:
+            return float("inf")
+        return (cost - tokens) / self.rate
+
+    def _maybe_evict(self, now: float) -> None:
+        self._ops += 1
+        if self._ops % 1000 == 0:
+            self.store.evict_idle(now - self.refill_seconds)
+
+
+def _make_store():
+    if AI_RATE_LIMIT_STORE == "sqlite":
+        return SQLiteBucketStore(AI_RATE_LIMIT_DB)
+    return MemoryBucketStore()
+
+
+# Global AI Rate Limiter
+limiter = TokenBucketLimiter(_make_store())
+
+
+def _limit_exceeded(user_id: int, cost: int = 1):
+    """429 + Retry-After: bucket lagataar refill hota hai, to "kal" nahi — asli wait."""
+    from fastapi import HTTPException
+
+    wait = limiter.seconds_until(user_id, cost)
+    if math.isinf(wait):
+        return HTTPException(
             status_code=429,
-            detail=f"Daily AI limit reached ({DEFAULT_LIMIT} requests). Try again tomorrow.",
+            detail=f"AI request cost {cost} exceeds the limit of {DEFAULT_LIMIT} requests.",
         )
+    retry_after = max(1, math.ceil(wait))
+    return HTTPException(
+        status_code=429,
+        detail=(
+            f"AI limit reached ({DEFAULT_LIMIT} requests per "
+            f"{AI_RATE_LIMIT_REFILL_SECONDS / 3600:g}h, refilled continuously). "
+            f"Try again in {_humanize(retry_after)}."
+        ),
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def _humanize(seconds: int) -> str:
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{math.ceil(seconds / 60)}m"
+    return f"{seconds // 3600}h {seconds % 3600 // 60}m"
+
+
+async def _run_store(fn, *args):
+    """
+    SQLite store ka BEGIN IMMEDIATE doosre worker ke txn par (5s tak) ruk sakta
+    hai — async routes / job workers se thread mein, event loop free rehta hai.
+    Memory store ka lock bas dict update hai, wo inline.
+    """
+    if isinstance(limiter.store, SQLiteBucketStore):
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+def _consume(user_id: int, cost: int) -> None:
+    allowed, _ = limiter.consume(user_id, cost)
+    if not allowed:
+        raise _limit_exceeded(user_id, cost)
+
+
+async def consume_or_raise(user_id: int, route: str, units: int = 1) -> int:
+    """
+    Route ka cost (x units, e.g. batch mein merged items) atomically kaato,
+    warna 429. Returns charged cost (refund ke liye).
+    """
+    cost = route_cost(route) * units
+    await _run_store(_consume, user_id, cost)
+    return cost
 
 
-def increment_rate_limit(user_id: int) -> int:
-    today = date.today().isoformat()
-    stored = _daily_counts.get(user_id)
-    if not stored or stored[0] != today:
-        count = 1
-    else:
-        count = stored[1] + 1
-    _daily_counts[user_id] = (today, count)
-    return count
+async def refund(user_id: int, cost: int) -> int:
+    return await _run_store(limiter.refund, user_id, cost)
 
 
 def get_remaining(user_id: int) -> int:
-    today = date.today().isoformat()
-    stored = _daily_counts.get(user_id)
-    if not stored or stored[0] != today:
-        return DEFAULT_LIMIT
-    return max(0, DEFAULT_LIMIT - stored[1])
+    return limiter.remaining(user_id)
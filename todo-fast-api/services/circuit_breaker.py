@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+AI_CB_WINDOW_SECONDS = float(os.getenv("AI_CB_WINDOW_SECONDS", "60"))
+AI_CB_MIN_CALLS = int(os.getenv("AI_CB_MIN_CALLS", "5"))
+# Window mein itne % calls fail hon to circuit open
+AI_CB_FAILURE_RATE = float(os.getenv("AI_CB_FAILURE_RATE", "0.5"))
+# Is se slow call "slow" hai; itne % slow hon to bhi open
+AI_CB_SLOW_CALL_SECONDS = float(os.getenv("AI_CB_SLOW_CALL_SECONDS", "15"))
+AI_CB_SLOW_RATE = float(os.getenv("AI_CB_SLOW_RATE", "0.8"))
+# Open ke baad itni der baad ek probe call (half-open)
+AI_CB_OPEN_SECONDS = float(os.getenv("AI_CB_OPEN_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Rolling window (error + latency) wala circuit breaker, ek model ke liye.
+    closed -> (failure/slow rate zyada) -> open -> (cool-off) -> half_open
+    -> probe success = closed, probe fail = open.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = AI_CB_WINDOW_SECONDS,
+        min_calls: int = AI_CB_MIN_CALLS,
+        failure_rate: float = AI_CB_FAILURE_RATE,
+        slow_call_seconds: float = AI_CB_SLOW_CALL_SECONDS,
+        slow_rate: float = AI_CB_SLOW_RATE,
+        open_seconds: float = AI_CB_OPEN_SECONDS,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._probe_in_flight = False
+        # (timestamp, ok, latency_seconds)
+        self._calls: Deque[Tuple[float, bool, float]] = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record(self, ok: bool, latency: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if ok and latency < self.slow_call_seconds:
+                    self.state = CLOSED
+                    self._calls.clear()
+                else:
+                    self._open(now)
+                return
+
+            self._calls.append((now, ok, latency))
+            self._prune(now)
+            total = len(self._calls)
+            if self.state != CLOSED or total < self.min_calls:
+                return
+            failures = sum(1 for _, success, _ in self._calls if not success)
+            slow = sum(1 for _, _, lat in self._calls if lat >= self.slow_call_seconds)
+            if failures / total >= self.failure_rate or slow / total >= self.slow_rate:
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self.times_opened += 1
+
+    def release_probe(self) -> None:
+        """Probe cancel ho gaya (hedge loser) — agla caller probe kar sake."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        """Window ki successful calls ka percentile latency; kam data ho to None."""
+        with self._lock:
+            self._prune(time.monotonic())
+            latencies = sorted(lat for _, ok, lat in self._calls if ok)
+        if len(latencies) < self.min_calls:
+            return None
+        index = min(len(latencies) - 1, int(pct * len(latencies)))
+        return latencies[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._prune(time.monotonic())
+            total = len(self._calls)
+            failures = sum(1 for _, ok, _ in self._calls if not ok)
+            state = self.state
+        return {
+            "state": state,
+            "windowCalls": total,
+            "windowFailures": failures,
+            "timesOpened": self.times_opened,
+        }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _registry_lock:
+            breaker = _breakers.setdefault(name, CircuitBreaker(name))
+    return breaker
+
+
+def snapshot_all() -> Dict[str, Dict[str, Any]]:
+    return {name: b.snapshot() for name, b in list(_breakers.items())}
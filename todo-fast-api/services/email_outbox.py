@@ -0,0 +1,360 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from modal.email import EmailOutbox
+
+logger = logging.getLogger("email_outbox")
+
+# SMTP settings — utils_email ke same MAIL_* env vars
+MAIL_SERVER = os.getenv("MAIL_SERVER", "smtp.gmail.com")
+MAIL_PORT = int(os.getenv("MAIL_PORT", 587))
+MAIL_USERNAME = os.getenv("MAIL_USERNAME", "user@example.com")
+MAIL_PASSWORD = os.getenv("MAIL_PASSWORD", "password")
+MAIL_FROM = os.getenv("MAIL_FROM", "noreply@todoapp.com")
+# Local stand-in (scripts/local_smtp_server.py) ke liye dono false
+MAIL_STARTTLS = os.getenv("MAIL_STARTTLS", "true").lower() in ("1", "true", "yes")
+MAIL_USE_CREDENTIALS = os.getenv("MAIL_USE_CREDENTIALS", "true").lower() in ("1", "true", "yes")
+
+EMAIL_OUTBOX_WORKER_ENABLED = os.getenv("EMAIL_OUTBOX_WORKER_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+# Ek claim mein kitni mails; har SMTP session apna hissa sequentially bhejta hai
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "200"))
+EMAIL_SMTP_CONNECTIONS = int(os.getenv("EMAIL_SMTP_CONNECTIONS", "2"))
+# Doosre process ki queued mails bhi uthane ke liye DB poll
+EMAIL_OUTBOX_POLL_SECONDS = float(os.getenv("EMAIL_OUTBOX_POLL_SECONDS", "5"))
+# Itni der koi mail na jaaye to SMTP session band
+EMAIL_SMTP_IDLE_SECONDS = float(os.getenv("EMAIL_SMTP_IDLE_SECONDS", "30"))
+EMAIL_SMTP_TIMEOUT_SECONDS = float(os.getenv("EMAIL_SMTP_TIMEOUT_SECONDS", "15"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+# Retry backoff: base * 2^(attempt-1), max tak, +-20% jitter
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+EMAIL_RETRY_MAX_SECONDS = float(os.getenv("EMAIL_RETRY_MAX_SECONDS", "3600"))
+# Worker crash ho gaya to "sending" row itni der baad dobara pending
+EMAIL_CLAIM_STALE_SECONDS = float(os.getenv("EMAIL_CLAIM_STALE_SECONDS", "600"))
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+
+def queue_email(db: Session, to_address: str, subject: str, html: str) -> EmailOutbox:
+    """
+    Outbox row add karo — commit caller ka (user insert ke saath same transaction,
+    to "user bana par mail kabhi queue nahi hui" wala case hota hi nahi).
+    Commit ke baad `outbox.notify()` worker ko turant jagata hai.
+    """
+    row = EmailOutbox(to_address=to_address, subject=subject, body=html)
+    db.add(row)
+    return row
+
+
+def queue_emails(db: Session, messages: List[Dict[str, str]]) -> None:
+    """Bulk: [{"to_address", "subject", "body"}] ek executemany mein."""
+    now = datetime.utcnow()
+    db.bulk_insert_mappings(
+        EmailOutbox,
+        [
+            {**m, "status": PENDING, "attempts": 0, "next_attempt_at": now, "created_at": now}
+            for m in messages
+        ],
+    )
+
+
+def retry_delay(attempts: int) -> float:
+    delay = min(EMAIL_RETRY_MAX_SECONDS, EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _permanent(exc: Exception) -> bool:
+    # 5xx = server ne mana kiya (bad recipient, auth) — retry se kuch nahi badlega
+    import aiosmtplib
+
+    if isinstance(exc, aiosmtplib.SMTPRecipientsRefused):
+        return True
+    code = getattr(exc, "code", None)
+    return isinstance(code, int) and 500 <= code < 600
+
+
+def _connection_broken(exc: Exception) -> bool:
+    # 4xx/5xx reply = session theek hai; sirf network/timeout (aiosmtplib ke
+    # disconnect/timeout errors OSError hain) par naya connection
+    return isinstance(exc, OSError)
+
+
+class _SMTPSession:
+    """Ek persistent SMTP connection; toot jaye to agli mail par reconnect."""
+
+    def __init__(self):
+        self._smtp = None
+        self.last_used = 0.0
+
+    async def _connect(self):
+        import aiosmtplib
+
+        smtp = aiosmtplib.SMTP(
+            hostname=MAIL_SERVER,
+            port=MAIL_PORT,
+            start_tls=MAIL_STARTTLS,
+            timeout=EMAIL_SMTP_TIMEOUT_SECONDS,
+        )
+        await smtp.connect()
+        if MAIL_USE_CREDENTIALS:
+            await smtp.login(MAIL_USERNAME, MAIL_PASSWORD)
+        self._smtp = smtp
+        return smtp
+
+    async def send(self, message: EmailMessage) -> None:
+        import aiosmtplib
+
+        loop = asyncio.get_running_loop()
+        smtp = self._smtp if self._smtp is not None and self._smtp.is_connected else None
+        if smtp is None:
+            smtp = await self._connect()
+        try:
+            await smtp.send_message(message)
+        except (aiosmtplib.SMTPServerDisconnected, ConnectionError):
+            # Server ne idle connection kaat di — ek baar naya session
+            self._smtp = None
+            smtp = await self._connect()
+            await smtp.send_message(message)
+        self.last_used = loop.time()
+
+    async def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None and smtp.is_connected:
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+
+
+class EmailOutboxWorker:
+    """
+    Background thread (apna event loop) jo outbox rows claim karke persistent
+    SMTP sessions par bhejta hai. Request path kabhi SMTP ka wait nahi karta.
+    Claim token se multiple processes ek hi row do baar nahi bhejte.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = EMAIL_OUTBOX_BATCH_SIZE,
+        connections: int = EMAIL_SMTP_CONNECTIONS,
+    ):
+        self.batch_size = batch_size
+        self.connections = max(1, connections)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._stopping = False
+                self._thread = threading.Thread(
+                    target=lambda: asyncio.run(self._main()),
+                    name="email-outbox-worker",
+                    daemon=True,
+                )
+                self._thread.start()
+
+    def notify(self) -> None:
+        """Nayi rows commit hui — poll interval ka wait mat karo."""
+        if EMAIL_OUTBOX_WORKER_ENABLED:
+            self.start()
+        self._wake.set()
+
+    def close(self, timeout: float = 10.0) -> None:
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    async def _main(self) -> None:
+        sessions = [_SMTPSession() for _ in range(self.connections)]
+        loop = asyncio.get_running_loop()
+        try:
+            while not self._stopping:
+                try:
+                    rows = await asyncio.to_thread(self._claim)
+                except Exception as exc:
+                    logger.warning("Email outbox claim failed: %s", exc)
+                    rows = []
+                if rows:
+                    # Round-robin slices: har session apni mails ek connection par bhejta hai
+                    await asyncio.gather(
+                        *(
+                            self._send_all(session, rows[i :: len(sessions)])
+                            for i, session in enumerate(sessions)
+                        )
+                    )
+                    if len(rows) == self.batch_size:
+                        continue  # Aur bhi pending ho sakti hain
+                for session in sessions:
+                    idle = loop.time() - session.last_used
+                    if session.last_used and idle > EMAIL_SMTP_IDLE_SECONDS:
+                        await session.close()
+                        session.last_used = 0.0
+                await asyncio.to_thread(self._wake.wait, EMAIL_OUTBOX_POLL_SECONDS)
+                self._wake.clear()
+        finally:
+            for session in sessions:
+                await session.close()
+
+    def _claim(self) -> List[Dict[str, Any]]:
+        from database import SessionLocal
+
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=EMAIL_CLAIM_STALE_SECONDS)
+        token = uuid.uuid4().hex
+        due = or_(
+            and_(EmailOutbox.status == PENDING, EmailOutbox.next_attempt_at <= now),
+            and_(EmailOutbox.status == SENDING, EmailOutbox.claimed_at < stale),
+        )
+        db = SessionLocal()
+        try:
+            ids = [
+                row_id
+                for (row_id,) in db.query(EmailOutbox.id)
+                .filter(due)
+                .order_by(EmailOutbox.next_attempt_at)
+                .limit(self.batch_size)
+            ]
+            if not ids:
+                return []
+            # Conditional update: doosre worker ne beech mein le li ho to yahan skip
+            db.query(EmailOutbox).filter(EmailOutbox.id.in_(ids), due).update(
+                {
+                    EmailOutbox.status: SENDING,
+                    EmailOutbox.claim_token: token,
+                    EmailOutbox.claimed_at: now,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+            return [
+                {
+                    "id": r.id,
+                    "to": r.to_address,
+                    "subject": r.subject,
+                    "body": r.body,
+                    "attempts": r.attempts,
+                }
+                for r in db.query(EmailOutbox).filter(EmailOutbox.claim_token == token)
+            ]
+        finally:
+            db.close()
+
+    async def _send_all(self, session: _SMTPSession, rows: List[Dict[str, Any]]) -> None:
+        outcomes = []
+        for row in rows:
+            message = EmailMessage()
+            message["From"] = MAIL_FROM
+            message["To"] = row["to"]
+            message["Subject"] = row["subject"]
+            message.set_content(row["body"] or "", subtype="html")
+            try:
+                await session.send(message)
+                outcomes.append((row, None))
+            except Exception as exc:
+                outcomes.append((row, exc))
+                if _connection_broken(exc):
+                    await session.close()  # Agli mail reconnect karegi
+        if not outcomes:
+            return
+        try:
+            await asyncio.to_thread(self._record, outcomes)
+        except Exception as exc:
+            # Rows "sending" reh jaati hain; stale claim ke baad dobara uthengi
+            logger.warning("Email outbox result write failed: %s", exc)
+
+    def _record(self, outcomes: List[tuple]) -> None:
+        from database import SessionLocal
+
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            sent_ids = [row["id"] for row, exc in outcomes if exc is None]
+            if sent_ids:
+                db.query(EmailOutbox).filter(EmailOutbox.id.in_(sent_ids)).update(
+                    {
+                        EmailOutbox.status: SENT,
+                        EmailOutbox.body: None,  # Credentials DB mein na padi rahein
+                        EmailOutbox.attempts: EmailOutbox.attempts + 1,
+                        EmailOutbox.sent_at: now,
+                        EmailOutbox.claim_token: None,
+                    },
+                    synchronize_session=False,
+                )
+                self.sent += len(sent_ids)
+            for row, exc in outcomes:
+                if exc is None:
+                    continue
+                attempts = row["attempts"] + 1
+                values: Dict[Any, Any] = {
+                    EmailOutbox.attempts: attempts,
+                    EmailOutbox.last_error: str(exc)[:500],
+                    EmailOutbox.claim_token: None,
+                }
+                if attempts >= EMAIL_MAX_ATTEMPTS or _permanent(exc):
+                    values[EmailOutbox.status] = FAILED
+                    # Password wali body nahi rakhte; recovery = admin reset-password route
+                    values[EmailOutbox.body] = None
+                    self.failed += 1
+                    logger.warning("Email %s failed permanently: %s", row["id"], exc)
+                else:
+                    delay = timedelta(seconds=retry_delay(attempts))
+                    values[EmailOutbox.status] = PENDING
+                    values[EmailOutbox.next_attempt_at] = now + delay
+                    self.retried += 1
+                db.query(EmailOutbox).filter(EmailOutbox.id == row["id"]).update(
+                    values, synchronize_session=False
+                )
+            db.commit()
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        from database import SessionLocal
+
+        db = SessionLocal()
+        try:
+            by_status = dict(
+                db.query(EmailOutbox.status, func.count(EmailOutbox.id))
+                .group_by(EmailOutbox.status)
+                .all()
+            )
+        finally:
+            db.close()
+        return {
+            "workerRunning": self._thread is not None,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "byStatus": by_status,
+        }
+
+
+# Global Email Outbox Worker
+outbox = EmailOutboxWorker()
@@ -0,0 +1,118 @@
+import re
+from typing import List, Optional
+
+import schema.ai as ai_schemas
+
+# LLM ke bina split / parse-task (AI off, ya provider fail). Pure functions —
+# patterns module load par ek baar compile, text par jitna kam scan utna accha.
+
+# Line pehle hi strip ho chuki hoti hai, isliye leading \s* ki zaroorat nahi
+_BULLET_RE = re.compile(r"[-*•]\s+|\d+\.\s+")
+_SEPARATOR_RE = re.compile(r"[,;]|(?:\band\b)", re.IGNORECASE)
+
+# ai_parse_task ke natural-language shapes, priority order mein
+_CREATE_WITH_RE = re.compile(r"^(?:create|add|make)\s+(.+?)\s+with\s+(.+)$", re.IGNORECASE)
+_WITH_SUBTASKS_RE = re.compile(r"^(.+?)\s+with\s+(.+?)\s+subtasks?$", re.IGNORECASE)
+_COLON_RE = re.compile(r"^(.+?):\s*(.+)$", re.IGNORECASE)
+
+_DEFAULT_STEPS = ("Define scope", "Break into steps", "Start first step")
+_REASONING = "Generated with offline heuristic parser (no LLM key configured)."
+
+
+def split_items(text: str, limit: int = 12) -> List[str]:
+    """
+    `,` / `;` / "and" par todo — pehle `limit` non-empty items (" ." strip karke).
+    Lazy scan: 4000-char list mein bhi sirf utna padhte hain jitna chahiye.
+    """
+    if "," not in text and ";" not in text and "and" not in text.lower():
+        item = text.strip(" .")
+        return [item] if text.strip() else []
+
+    items: List[str] = []
+    pos = 0
+    for m in _SEPARATOR_RE.finditer(text):
+        piece = text[pos : m.start()]
+        pos = m.end()
+        if piece.strip():
+            items.append(piece.strip(" ."))
+            if len(items) == limit:
+                return items
+    piece = text[pos:]
+    if piece.strip():
+        items.append(piece.strip(" ."))
+    return items
+
+
+def heuristic_split(text: str) -> ai_schemas.AISplitResponse:
+    cleaned = text.strip()
+    bullet_items: List[str] = []
+    title: Optional[str] = None
+    bullet_match = _BULLET_RE.match
+
+    # Ek pass: har line ek baar strip, bullet hai to item, warna pehli line title
+    for line in cleaned.splitlines():
+        raw = line.strip()
+        if not raw:
+            continue
+        m = bullet_match(raw)
+        if m:
+            item = raw[m.end() :].strip()
+            if item:
+                bullet_items.append(item)
+                if len(bullet_items) == 12:
+                    break  # Aage ki lines se na title badalta hai na subtasks
+        elif title is None and not bullet_items:
+            title = raw
+
+    if not bullet_items:
+        parts = split_items(cleaned)
+        if len(parts) >= 2:
+            title = parts[0].title() if parts[0] else "New project"
+            bullet_items = [p[:120].capitalize() for p in parts[1:12]]
+        else:
+            words = cleaned.split(None, 6)[:6]
+            title = " ".join(words).title() if words else "New project"
+            bullet_items = list(_DEFAULT_STEPS)
+
+    if not title:
+        title = bullet_items[0] if bullet_items else "New project"
+
+    return ai_schemas.AISplitResponse(
+        title=title[:120],
+        subtasks=bullet_items[:12],
+        reasoning=_REASONING,
+    )
+
+
+def parse_task_rules(stripped: str) -> Optional[ai_schemas.AIParseTaskResponse]:
+    """
+    "create X with a, b", "X with a and b subtasks", "X: a, b" — match na ho to None.
+    Sasta substring check pehle, taaki har input par teeno regex na chalein.
+    """
+    lower = stripped.lower()
+    if not lower.isascii():
+        # re.IGNORECASE "i"/"s" ko İ / ı / ſ se bhi match karta hai, str.lower() nahi —
+        # fold na karein to pre-check kuch matching inputs chhod dega
+        lower = lower.replace("i\u0307", "i").replace("\u0131", "i").replace("\u017f", "s")
+    candidates = []
+    if "with" in lower:
+        if lower.startswith(("create", "add", "make")):
+            candidates.append(_CREATE_WITH_RE)
+        if lower.endswith("subtask") or lower.endswith("subtasks"):
+            candidates.append(_WITH_SUBTASKS_RE)
+    if ":" in stripped:
+        candidates.append(_COLON_RE)
+
+    for pattern in candidates:
+        m = pattern.match(stripped)
+        if not m:
+            continue
+        parent = m.group(1).strip(" .")
+        subs_raw = m.group(2)
+        subs = split_items(subs_raw)
+        if parent and subs:
+            return ai_schemas.AIParseTaskResponse(
+                parent=parent[:120],
+                subtasks=[s[:200] for s in subs],
+            )
+    return None
@@ -0,0 +1,44 @@
+import asyncio
+import os
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+# Per-provider connection pool limits (ek worker mein kitne concurrent LLM calls)
+AI_HTTP_MAX_CONNECTIONS = int(os.getenv("AI_HTTP_MAX_CONNECTIONS", "20"))
+AI_HTTP_MAX_KEEPALIVE = int(os.getenv("AI_HTTP_MAX_KEEPALIVE", "10"))
+AI_HTTP_TIMEOUT = float(os.getenv("AI_HTTP_TIMEOUT", "45"))
+
+# provider -> (event loop, client). AsyncClient apne loop se bandha hota hai,
+# isliye loop badle (tests / reload) to naya client banta hai.
+_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+
+
+def get_client(provider: str) -> httpx.AsyncClient:
+    """Shared keep-alive client: TLS handshake ek baar, phir connections reuse."""
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(provider)
+    if entry and entry[0] is loop and not entry[1].is_closed:
+        return entry[1]
+
+    # Provider-specific override, e.g. AI_HTTP_MAX_CONNECTIONS_GEMINI=50
+    max_connections = int(
+        os.getenv(f"AI_HTTP_MAX_CONNECTIONS_{provider.upper()}", AI_HTTP_MAX_CONNECTIONS)
+    )
+    client = httpx.AsyncClient(
+        timeout=httpx.Timeout(AI_HTTP_TIMEOUT, connect=10.0),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(AI_HTTP_MAX_KEEPALIVE, max_connections),
+        ),
+    )
+    _clients[provider] = (loop, client)
+    return client
+
+
+async def aclose_all(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    loop = loop or asyncio.get_running_loop()
+    for provider, (client_loop, client) in list(_clients.items()):
+        if client_loop is loop:
+            await client.aclose()
+            del _clients[provider]
@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+AI_CACHE_ENABLED = os.getenv("AI_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", "3600"))
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "1000"))
+# SQLite file path: set karo to entries restart ke baad bhi bachi rahengi
+AI_CACHE_PATH = os.getenv("AI_CACHE_PATH", "")
+AI_CACHE_DISK_MAX_ENTRIES = int(os.getenv("AI_CACHE_DISK_MAX_ENTRIES", "50000"))
+
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_payload(user: str) -> str:
+    """JSON payload ho to canonical JSON (sorted keys), warna whitespace collapse."""
+    try:
+        return json.dumps(json.loads(user), sort_keys=True, separators=(",", ":"))
+    except (ValueError, TypeError):
+        return _SPACE_RE.sub(" ", user).strip()
+
+
+def make_key(provider: str, model: str, system: str, user: str) -> str:
+    raw = json.dumps([provider, model, system, normalize_payload(user)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache: key = hash(provider, model, system prompt, payload).
+    Memory mein LRU + TTL; AI_CACHE_PATH diya ho to SQLite mein bhi (write-through).
+    get/set async hain: memory tier loop par hi, disk I/O asyncio.to_thread mein
+    (alag lock — slow disk memory hits ko nahi rokta).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = AI_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = AI_CACHE_TTL_SECONDS,
+        path: str = AI_CACHE_PATH,
+        enabled: bool = AI_CACHE_ENABLED,
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self._entries: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_cache_expires ON llm_cache (expires_at)"
+            )
+            self._db.commit()
+        return self._db
+
+    async def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        row = await asyncio.to_thread(self._read_disk, key, now) if self.path else None
+        with self._lock:
+            if row:
+                self._put_memory(key, row[0], row[1])
+                self.hits += 1
+                self.disk_hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    async def set(self, key: str, value: str) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._put_memory(key, value, expires_at)
+        if self.path:
+            await asyncio.to_thread(self._write_disk, key, value, expires_at)
+
+    def _read_disk(self, key: str, now: float) -> Optional[tuple]:
+        with self._disk_lock:
+            return self._disk().execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+
+    def _write_disk(self, key: str, value: str, expires_at: float) -> None:
+        with self._disk_lock:
+            db = self._disk()
+            db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._disk_writes += 1
+            if self._disk_writes % 100 == 0:
+                self._trim_disk(db)
+            db.commit()
+
+    def _put_memory(self, key: str, value: str, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _trim_disk(self, db: sqlite3.Connection) -> None:
+        db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        count = db.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if count > AI_CACHE_DISK_MAX_ENTRIES:
+            db.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY expires_at LIMIT ?)",
+                (count - AI_CACHE_DISK_MAX_ENTRIES,),
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        with self._disk_lock:
+            db = self._disk()
+            if db is not None:
+                db.execute("DELETE FROM llm_cache")
+                db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "diskHits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "persistent": bool(self.path),
+        }
+
+
+# Global LLM Response Cache
+response_cache = LLMResponseCache()
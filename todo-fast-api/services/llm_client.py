@@ -1,19 +1,35 @@
+import asyncio
+import functools
 import json
+import logging
 import os
 import re
-import urllib.error
-import urllib.request
-from typing import Any, Dict, List, Optional
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 import schema.ai as ai_schemas
+from services import prompt_builder
+from services.llm_cache import make_key, response_cache
+from services.http_pool import AI_HTTP_TIMEOUT, get_client
+from services.circuit_breaker import get_breaker
+from services.heuristics import heuristic_split, parse_task_rules
+from services.llm_metrics import last_usage, metrics, record_usage
+
+logger = logging.getLogger("llm_client")
 
 AI_PROVIDER = os.getenv("AI_PROVIDER", "openai").lower()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+GEMINI_BASE_URL = os.getenv(
+    "GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta"
+).rstrip("/")
 
 _DEFAULT_MODELS = {
     "openai": "gpt-4o-mini",
     "gemini": "gemini-2.0-flash",
+    "mock": "mock-1",
 }
 AI_MODEL = os.getenv("AI_MODEL", _DEFAULT_MODELS.get(AI_PROVIDER, "gpt-4o-mini"))
 
@@ -23,28 +39,80 @@ GEMINI_FALLBACK_MODELS = [
     "gemini-1.5-flash",
 ]
 
+# Poore fallback chain ka overall deadline (har model ka nahi)
+AI_DEADLINE_SECONDS = float(os.getenv("AI_DEADLINE_SECONDS", "20"))
+# Ek model attempt ka timeout — deadline se kam, taaki hung model ke baad agla try ho
+# (0 = deadline ka aadha)
+AI_MODEL_TIMEOUT_SECONDS = (
+    float(os.getenv("AI_MODEL_TIMEOUT_SECONDS", "0")) or AI_DEADLINE_SECONDS / 2
+)
+# Hedged requests: current model AI_HEDGE_PERCENTILE latency cross kare to agla model bhi start
+AI_HEDGE_ENABLED = os.getenv("AI_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+AI_HEDGE_PERCENTILE = float(os.getenv("AI_HEDGE_PERCENTILE", "0.9"))
+
+
+class LLMProvider:
+    """
+    Registry entry: `models()` = fallback order, `call_model(model, system, user, kind)`
+    ek model ko call karta hai (fail = None). Breakers/deadline/hedging sab par same.
+    """
+
+    __slots__ = ("name", "configured", "models", "call_model")
+
+    def __init__(
+        self,
+        name: str,
+        configured: Callable[[], bool],
+        models: Callable[[], List[str]],
+        call_model: Callable[[str, str, str, str], Awaitable[Optional[str]]],
+    ):
+        self.name = name
+        self.configured = configured
+        self.models = models
+        self.call_model = call_model
+
+
+PROVIDERS: Dict[str, LLMProvider] = {}
+
+
+def register_provider(provider: LLMProvider) -> None:
+    PROVIDERS[provider.name] = provider
 
-def _model_dump(obj: Any) -> Dict[str, Any]:
-    if hasattr(obj, "model_dump"):
-        return obj.model_dump()
-    return obj.dict()
+
+def get_provider() -> LLMProvider:
+    # Unknown AI_PROVIDER purane behaviour jaisa OpenAI par jata hai
+    return PROVIDERS.get(AI_PROVIDER) or PROVIDERS["openai"]
 
 
 def is_ai_configured() -> bool:
-    if AI_PROVIDER == "gemini":
-        return bool(GEMINI_API_KEY)
-    return bool(OPENAI_API_KEY)
+    return get_provider().configured()
 
 
-def _call_openai(system: str, user: str) -> Optional[str]:
-    if not OPENAI_API_KEY:
-        return None
-    try:
-        from openai import OpenAI
+_openai_clients: Dict[int, Any] = {}
+
+
+def _get_openai_client():
+    from openai import AsyncOpenAI
+
+    http_client = get_client("openai")
+    # Ek hi AsyncOpenAI per pooled http client (har call par naya client nahi)
+    client = _openai_clients.get(id(http_client))
+    if client is None:
+        _openai_clients.clear()
+        client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY, http_client=http_client, timeout=AI_HTTP_TIMEOUT
+        )
+        _openai_clients[id(http_client)] = client
+    return client
+
 
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        resp = client.chat.completions.create(
-            model=AI_MODEL,
+async def _call_openai_model(
+    model: str, system: str, user: str, kind: str = ""
+) -> Optional[str]:
+    try:
+        client = _get_openai_client()
+        resp = await client.chat.completions.create(
+            model=model,
             messages=[
                 {"role": "system", "content": system},
                 {"role": "user", "content": user},
@@ -53,34 +121,126 @@ def _call_openai(system: str, user: str) -> Optional[str]:
             max_tokens=800,
             response_format={"type": "json_object"},
         )
+        if resp.usage:
+            record_usage(resp.usage.prompt_tokens, resp.usage.completion_tokens)
         return resp.choices[0].message.content
     except Exception as exc:
-        print(f"OpenAI call failed: {exc}")
+        logger.warning("OpenAI call failed (%s): %s", model, exc)
         return None
 
 
-def _call_gemini(system: str, user: str) -> Optional[str]:
-    if not GEMINI_API_KEY:
+def _hedge_delay(provider: str, model: str) -> Optional[float]:
+    if not AI_HEDGE_ENABLED:
+        return None
+    return get_breaker(f"{provider}:{model}").latency_percentile(AI_HEDGE_PERCENTILE)
+
+
+async def _call_with_fallback(
+    provider: str,
+    models: List[str],
+    call_model: Callable[[str], Awaitable[Optional[str]]],
+    kind: str = "",
+) -> Optional[str]:
+    """
+    Models ko order mein try karta hai, har model ka apna circuit breaker.
+    - Open circuit wala model skip; saare open = turant None (heuristic answer).
+    - Failure par agla model turant (45s timeout ka wait nahi); har attempt
+      AI_MODEL_TIMEOUT_SECONDS ke baad failure gina jata hai aur chain aage.
+    - Hedging (AI_HEDGE_ENABLED): current model apni p-percentile latency se
+      slow ho to agla model parallel start, jo pehle aaye wo jeetta hai.
+    - Poora kaam AI_DEADLINE_SECONDS ke andar, warna None.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + AI_DEADLINE_SECONDS
+    queue = list(models)
+    running: Dict[asyncio.Task, str] = {}
+    next_hedge_at: Optional[float] = None
+    deadline_hit = False
+
+    async def timed(model: str) -> Optional[str]:
+        breaker = get_breaker(f"{provider}:{model}")
+        started = loop.time()
+        usage = [0, 0]
+        last_usage.set(usage)
+        try:
+            result = await asyncio.wait_for(call_model(model), AI_MODEL_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            # Hung / bahut slow model: failure, breaker trip ho sake aur chain aage badhe
+            latency = loop.time() - started
+            breaker.record(False, latency)
+            metrics.record_attempt(kind, provider, model, "timeout", latency * 1000)
+            return None
+        except asyncio.CancelledError:
+            latency = loop.time() - started
+            if deadline_hit:
+                # Deadline tak jawab nahi — slow call, breaker ko pata chale
+                breaker.record(False, latency)
+                metrics.record_attempt(kind, provider, model, "timeout", latency * 1000)
+            else:
+                # Hedge loser (ya caller chala gaya) — model ki failure nahi
+                breaker.release_probe()
+                metrics.record_attempt(kind, provider, model, "cancelled", latency * 1000)
+            raise
+        latency = loop.time() - started
+        breaker.record(result is not None, latency)
+        if result is None:
+            outcome = "error"
+        else:
+            outcome = "ok" if _is_json(result) else "invalid"
+        metrics.record_attempt(kind, provider, model, outcome, latency * 1000, *usage)
+        return result
+
+    def launch() -> bool:
+        nonlocal next_hedge_at
+        while queue:
+            model = queue.pop(0)
+            if get_breaker(f"{provider}:{model}").allow():
+                running[asyncio.create_task(timed(model))] = model
+                delay = _hedge_delay(provider, model) if queue else None
+                next_hedge_at = loop.time() + delay if delay is not None else None
+                return True
+        return False
+
+    if not launch():
+        metrics.record_attempt(kind, provider, "*", "circuit_open", 0.0)
         return None
 
-    models_to_try = GEMINI_FALLBACK_MODELS if AI_PROVIDER == "gemini" else [AI_MODEL]
-    seen: set[str] = set()
-    for model in models_to_try:
-        if model in seen:
-            continue
-        seen.add(model)
-        result = _call_gemini_model(model, system, user)
-        if result is not None:
-            return result
-    return None
+    try:
+        while running:
+            now = loop.time()
+            if now >= deadline:
+                logger.warning("%s call exceeded %ss deadline", provider, AI_DEADLINE_SECONDS)
+                deadline_hit = True
+                return None
+            wait_until = deadline
+            if next_hedge_at is not None:
+                wait_until = min(wait_until, next_hedge_at)
 
+            done, _ = await asyncio.wait(
+                running, timeout=max(0.0, wait_until - now), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                if next_hedge_at is not None and loop.time() >= next_hedge_at:
+                    # Hedge: slow model ke saath agla model bhi chalao
+                    if not launch():
+                        next_hedge_at = None
+                continue
+
+            for task in done:
+                running.pop(task)
+                result = task.result()
+                if result is not None:
+                    return result
+            if not running:
+                launch()
+        return None
+    finally:
+        for task in running:
+            task.cancel()
 
-def _call_gemini_model(model: str, system: str, user: str) -> Optional[str]:
-    url = (
-        f"https://generativelanguage.googleapis.com/v1beta/models/"
-        f"{model}:generateContent?key={GEMINI_API_KEY}"
-    )
-    payload = {
+
+def _gemini_payload(system: str, user: str) -> Dict[str, Any]:
+    return {
         "systemInstruction": {"parts": [{"text": system}]},
         "contents": [{"role": "user", "parts": [{"text": user}]}],
         "generationConfig": {
@@ -90,38 +250,212 @@ def _call_gemini_model(model: str, system: str, user: str) -> Optional[str]:
         },
     }
 
-    req = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
 
+async def _call_gemini_model(
+    model: str, system: str, user: str, kind: str = ""
+) -> Optional[str]:
+    url = f"{GEMINI_BASE_URL}/models/{model}:generateContent"
     try:
-        with urllib.request.urlopen(req, timeout=45) as resp:
-            data = json.loads(resp.read().decode("utf-8"))
-            candidates = data.get("candidates") or []
-            if not candidates:
-                print("Gemini call failed: no candidates in response")
-                return None
-            parts = candidates[0].get("content", {}).get("parts") or []
-            if not parts:
-                print("Gemini call failed: no parts in response")
-                return None
-            return parts[0].get("text")
-    except urllib.error.HTTPError as exc:
-        body = exc.read().decode("utf-8", errors="replace")
-        print(f"Gemini HTTP error {exc.code} ({model}): {body}")
-        return None
+        resp = await get_client("gemini").post(
+            url, params={"key": GEMINI_API_KEY}, json=_gemini_payload(system, user)
+        )
+        if resp.status_code >= 400:
+            logger.warning("Gemini HTTP error %s (%s): %s", resp.status_code, model, resp.text)
+            return None
+        data = resp.json()
+        usage = data.get("usageMetadata")
+        if usage:
+            record_usage(usage.get("promptTokenCount", 0), usage.get("candidatesTokenCount", 0))
+        candidates = data.get("candidates") or []
+        if not candidates:
+            logger.warning("Gemini call failed (%s): no candidates in response", model)
+            return None
+        parts = candidates[0].get("content", {}).get("parts") or []
+        if not parts:
+            logger.warning("Gemini call failed (%s): no parts in response", model)
+            return None
+        return parts[0].get("text")
     except Exception as exc:
-        print(f"Gemini call failed ({model}): {exc}")
+        logger.warning("Gemini call failed (%s): %s", model, exc)
         return None
 
 
-def _call_llm(system: str, user: str) -> Optional[str]:
-    if AI_PROVIDER == "gemini":
-        return _call_gemini(system, user)
-    return _call_openai(system, user)
+class LLMCallStats:
+    """Ek request mein kitne LLM calls cache se aaye aur kitne provider tak gaye."""
+
+    __slots__ = ("cache_hits", "provider_calls", "coalesced", "fallbacks", "unbilled_units")
+
+    def __init__(self):
+        self.cache_hits = 0
+        self.provider_calls = 0
+        # Provider calls jo kisi aur request ke in-flight call se share hue
+        self.coalesced = 0
+        # Kitne answers LLM ki jagah heuristic se bane
+        self.fallbacks = 0
+        # Merged batch ke items jo provider tak gaye hi nahi (cache / repeat) — refund
+        self.unbilled_units = 0
+
+    @property
+    def served_from_cache(self) -> bool:
+        return self.cache_hits > 0 and self.provider_calls == 0
+
+
+_call_stats: ContextVar[Optional[LLMCallStats]] = ContextVar("llm_call_stats", default=None)
+
+# Same key ke in-flight provider calls: baaki concurrent callers isi ka result await karte hain
+_inflight: Dict[str, "asyncio.Task[Optional[str]]"] = {}
+_coalesced_total = 0
+
+
+@contextmanager
+def track_llm_calls():
+    stats = LLMCallStats()
+    token = _call_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _call_stats.reset(token)
+
+
+# ai_* function ke andar: answer kahan se aaya ("llm" default / "heuristic" / "rules")
+_answer_source: ContextVar[Optional[List[str]]] = ContextVar("llm_answer_source", default=None)
+
+
+def _note_fallback(source: str = "heuristic") -> None:
+    stats = _call_stats.get()
+    if stats and source == "heuristic":
+        stats.fallbacks += 1
+    holder = _answer_source.get()
+    if holder is not None:
+        holder.append(source)
+
+
+def _instrumented(kind: str):
+    """Har ai_* call ka answer source metrics mein (heuristic fallback rate)."""
+
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            if _answer_source.get() is not None:
+                return await fn(*args, **kwargs)  # Nested call (e.g. "/ai " prefix)
+            holder: List[str] = []
+            token = _answer_source.set(holder)
+            try:
+                result = await fn(*args, **kwargs)
+            finally:
+                _answer_source.reset(token)
+            metrics.record_answer(kind, holder[-1] if holder else "llm")
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def coalescing_stats() -> Dict[str, int]:
+    return {"inFlight": len(_inflight), "coalescedTotal": _coalesced_total}
+
+
+async def _call_mock_model(model: str, system: str, user: str, kind: str = "") -> Optional[str]:
+    from services import llm_mock
+
+    return await llm_mock.call_model(model, system, user, kind)
+
+
+register_provider(
+    LLMProvider("openai", lambda: bool(OPENAI_API_KEY), lambda: [AI_MODEL], _call_openai_model)
+)
+register_provider(
+    LLMProvider(
+        "gemini",
+        lambda: bool(GEMINI_API_KEY),
+        lambda: list(dict.fromkeys(GEMINI_FALLBACK_MODELS)),
+        _call_gemini_model,
+    )
+)
+# Offline load testing: latency / error / timeout injection (services/llm_mock.py)
+register_provider(
+    LLMProvider(
+        "mock",
+        lambda: True,
+        lambda: list(dict.fromkeys([AI_MODEL] + _mock_models())),
+        _call_mock_model,
+    )
+)
+
+
+def _mock_models() -> List[str]:
+    from services.llm_mock import AI_MOCK_MODELS
+
+    return AI_MOCK_MODELS
+
+
+async def _call_provider(system: str, user: str, kind: str = "") -> Optional[str]:
+    provider = get_provider()
+    if not provider.configured():
+        return None
+    return await _call_with_fallback(
+        provider.name,
+        provider.models(),
+        lambda model: provider.call_model(model, system, user, kind),
+        kind,
+    )
+
+
+async def _call_llm(system: str, user: str, kind: str = "") -> Optional[str]:
+    global _coalesced_total
+    if not get_provider().configured():
+        # No-LLM mode: seedha heuristic — na prompt hash, na job charge (refund ho jaata hai)
+        return None
+    stats = _call_stats.get()
+    started = time.perf_counter()
+    key = make_key(AI_PROVIDER, AI_MODEL, system, user)
+    cached = await response_cache.get(key)
+    if cached is not None:
+        if stats:
+            stats.cache_hits += 1
+        metrics.record_request(kind, "cache_hit", (time.perf_counter() - started) * 1000)
+        return cached
+
+    # Follower bhi provider call ka hissa hai, isliye leader ki tarah charge hota hai
+    if stats:
+        stats.provider_calls += 1
+    task = _inflight.get(key)
+    leader = task is None
+    if leader:
+        task = asyncio.ensure_future(_fetch_and_cache(key, system, user, kind))
+        _inflight[key] = task
+        task.add_done_callback(
+            lambda done: _inflight.pop(key) if _inflight.get(key) is done else None
+        )
+    else:
+        _coalesced_total += 1
+        if stats:
+            stats.coalesced += 1
+    # shield: ek caller disconnect/cancel ho to shared call baaki sab ke liye chalta rahe
+    content = await asyncio.shield(task)
+    if not leader:
+        outcome = "coalesced"
+    else:
+        outcome = "llm" if content is not None and _is_json(content) else "failed"
+    metrics.record_request(kind, outcome, (time.perf_counter() - started) * 1000)
+    return content
+
+
+async def _fetch_and_cache(key: str, system: str, user: str, kind: str) -> Optional[str]:
+    content = await _call_provider(system, user, kind)
+    if content is not None and _is_json(content):
+        # Sirf parse hone wala content cache karo; kachra response dobara try ho
+        await response_cache.set(key, content)
+    return content
+
+
+def _is_json(content: str) -> bool:
+    try:
+        _parse_json(content)
+        return True
+    except (json.JSONDecodeError, ValueError):
+        return False
 
 
 def _parse_json(content: str) -> Dict[str, Any]:
@@ -134,52 +468,15 @@ def _parse_json(content: str) -> Dict[str, Any]:
         raise
 
 
-def _heuristic_split(text: str) -> ai_schemas.AISplitResponse:
-    cleaned = text.strip()
-    lines = [ln.strip() for ln in cleaned.splitlines() if ln.strip()]
-    bullet_items: List[str] = []
-    title: Optional[str] = None
-    bullet_re = re.compile(r"^(\s*[-*•]\s+|\s*\d+\.\s+)")
-
-    for raw in lines:
-        if bullet_re.match(raw):
-            item = bullet_re.sub("", raw).strip()
-            if item:
-                bullet_items.append(item)
-        elif not title and not bullet_items:
-            title = raw
-
-    if not bullet_items:
-        parts = re.split(r"[,;]|(?:\band\b)", cleaned, flags=re.IGNORECASE)
-        parts = [p.strip(" .") for p in parts if p.strip()]
-        if len(parts) >= 2:
-            title = parts[0].title() if parts[0] else "New project"
-            bullet_items = [p[:120].capitalize() for p in parts[1:12]]
-        else:
-            words = cleaned.split()
-            title = " ".join(words[:6]).title() if words else "New project"
-            bullet_items = [
-                "Define scope",
-                "Break into steps",
-                "Start first step",
-            ]
-
-    if not title:
-        title = bullet_items[0] if bullet_items else "New project"
-
-    return ai_schemas.AISplitResponse(
-        title=title[:120],
-        subtasks=bullet_items[:12],
-        reasoning="Generated with offline heuristic parser (no LLM key configured).",
-    )
-
-
-def ai_split(text: str) -> ai_schemas.AISplitResponse:
+@_instrumented("split")
+async def ai_split(text: str) -> ai_schemas.AISplitResponse:
     system = (
         "You are a task breakdown assistant. Return JSON only: "
         '{"title": string, "subtasks": string[] (max 12, short, actionable), "reasoning": string}'
     )
-    content = _call_llm(system, f'Break this into a parent task and subtasks:\n"{text}"')
+    content = await _call_llm(
+        system, f'Break this into a parent task and subtasks:\n"{text}"', "split"
+    )
     if content:
         try:
             data = _parse_json(content)
@@ -190,7 +487,8 @@ def ai_split(text: str) -> ai_schemas.AISplitResponse:
             )
         except (json.JSONDecodeError, KeyError, TypeError):
             pass
-    return _heuristic_split(text)
+    _note_fallback()
+    return heuristic_split(text)
 
 
 def _coach_score(t: ai_schemas.TodoSummary, focus_task_id: Optional[int] = None) -> float:
@@ -303,13 +601,9 @@ def _parse_coach_response(
     )
 
 
-def ai_coach(
-    todos: List[ai_schemas.TodoSummary], focus_task_id: Optional[int] = None
-) -> ai_schemas.AICoachResponse:
-    incomplete = [t for t in todos if not t.done]
-    if not incomplete:
-        raise ValueError("No incomplete tasks")
-
+def _coach_prompt(
+    incomplete: List[ai_schemas.TodoSummary], focus_task_id: Optional[int]
+) -> tuple[str, str]:
     system = (
         "You are an expert focus coach for a todo app. Pick ONE incomplete task the user "
         "should complete FIRST. Be direct and actionable.\n"
@@ -322,12 +616,25 @@ def ai_coach(
         '"estimatedMinutes": number|null, '
         '"prioritySuggestion": "high"|"medium"|"low"|"none"|null}'
     )
-    summary = json.dumps([_model_dump(t) for t in incomplete[:30]])
-    user_msg = f"Incomplete tasks: {summary}"
-    if focus_task_id:
-        user_msg += f"\nAvoid recommending taskId {focus_task_id} if possible."
+    avoid = (
+        f"\nAvoid recommending taskId {focus_task_id} if possible." if focus_task_id else ""
+    )
+    tasks = prompt_builder.fit_tasks(
+        incomplete,
+        lambda t: _coach_score(t, focus_task_id),
+        max_items=30,
+        token_budget=prompt_builder.payload_budget(system, "Incomplete tasks: " + avoid),
+    )
+    user_msg = f"Incomplete tasks: {prompt_builder.compact_json(tasks)}{avoid}"
+    prompt_builder.report("coach", system, user_msg, len(tasks), len(incomplete))
+    return system, user_msg
+
 
-    content = _call_llm(system, user_msg)
+def _coach_result(
+    content: Optional[str],
+    incomplete: List[ai_schemas.TodoSummary],
+    focus_task_id: Optional[int],
+) -> ai_schemas.AICoachResponse:
     if content:
         try:
             data = _parse_json(content)
@@ -337,31 +644,56 @@ def ai_coach(
         except (json.JSONDecodeError, KeyError, TypeError, ValueError):
             pass
 
+    _note_fallback()
     pick = max(incomplete, key=lambda t: _coach_score(t, focus_task_id))
     return _coach_from_pick(pick)
 
 
-def ai_boss_lore(
-    task_text: str, subtask_count: int, progress: int
-) -> ai_schemas.AIBossLoreResponse:
-    system = (
-        "Generate playful RPG boss flavor for a todo parent task. "
-        'Return JSON: {"bossName": string, "taunt": string, "defeatMessage": string}. '
-        "Keep it friendly, not offensive."
+def _incomplete_or_raise(todos: List[ai_schemas.TodoSummary]) -> List[ai_schemas.TodoSummary]:
+    incomplete = [t for t in todos if not t.done]
+    if not incomplete:
+        raise ValueError("No incomplete tasks")
+    return incomplete
+
+
+@_instrumented("coach")
+async def ai_coach(
+    todos: List[ai_schemas.TodoSummary], focus_task_id: Optional[int] = None
+) -> ai_schemas.AICoachResponse:
+    incomplete = _incomplete_or_raise(todos)
+    system, user_msg = _coach_prompt(incomplete, focus_task_id)
+    content = await _call_llm(system, user_msg, "coach")
+    return _coach_result(content, incomplete, focus_task_id)
+
+
+_BOSS_LORE_SYSTEM = (
+    "Generate playful RPG boss flavor for a todo parent task. "
+    'Return JSON: {"bossName": string, "taunt": string, "defeatMessage": string}. '
+    "Keep it friendly, not offensive."
+)
+_BOSS_LORE_BATCH_SYSTEM = (
+    "Generate playful RPG boss flavor for each numbered todo parent task. "
+    'Return JSON: {"bosses": [{"bossName": string, "taunt": string, "defeatMessage": string}]} '
+    "with exactly one object per task, in the same order. Keep it friendly, not offensive."
+)
+
+
+def _boss_lore_user(task_text: str, subtask_count: int, progress: int) -> str:
+    # Progress 10% buckets mein — lore ke liye exact % zaroori nahi, cache hit rate badhta hai
+    progress_bucket = (progress // 10) * 10
+    return f'Task: "{task_text}", subtasks: {subtask_count}, progress: {progress_bucket}%'
+
+
+def _boss_lore_from(data: Dict[str, Any]) -> ai_schemas.AIBossLoreResponse:
+    return ai_schemas.AIBossLoreResponse(
+        bossName=str(data["bossName"])[:80],
+        taunt=str(data["taunt"])[:200],
+        defeatMessage=str(data["defeatMessage"])[:200],
     )
-    user_msg = f'Task: "{task_text}", subtasks: {subtask_count}, progress: {progress}%'
-    content = _call_llm(system, user_msg)
-    if content:
-        try:
-            data = _parse_json(content)
-            return ai_schemas.AIBossLoreResponse(
-                bossName=str(data["bossName"])[:80],
-                taunt=str(data["taunt"])[:200],
-                defeatMessage=str(data["defeatMessage"])[:200],
-            )
-        except (json.JSONDecodeError, KeyError, TypeError):
-            pass
 
+
+def _boss_lore_fallback(task_text: str, subtask_count: int) -> ai_schemas.AIBossLoreResponse:
+    _note_fallback()
     base = task_text.split()[0].title() if task_text.split() else "Task"
     return ai_schemas.AIBossLoreResponse(
         bossName=f"The {base} Behemoth",
@@ -370,9 +702,86 @@ def ai_boss_lore(
     )
 
 
-def ai_briefing(
+@_instrumented("boss-lore")
+async def ai_boss_lore(
+    task_text: str, subtask_count: int, progress: int
+) -> ai_schemas.AIBossLoreResponse:
+    user_msg = _boss_lore_user(task_text, subtask_count, progress)
+    content = await _call_llm(_BOSS_LORE_SYSTEM, user_msg, "boss-lore")
+    if content:
+        try:
+            return _boss_lore_from(_parse_json(content))
+        except (json.JSONDecodeError, KeyError, TypeError):
+            pass
+    return _boss_lore_fallback(task_text, subtask_count)
+
+
+async def ai_boss_lore_many(
+    items: List[ai_schemas.AIBossLoreRequest],
+) -> ai_schemas.AIBossLoreBatchResponse:
+    """
+    Kai boss-lore ek hi provider call mein. Har item pehle single-route cache mein
+    dekha jaata hai, aur merged answer bhi per-item cache hota hai — /ai/boss-lore
+    aur batch ek doosre ke cache hits share karte hain.
+    """
+    stats = _call_stats.get()
+    users = [_boss_lore_user(i.taskText, i.subtaskCount, i.progress) for i in items]
+    keys = [make_key(AI_PROVIDER, AI_MODEL, _BOSS_LORE_SYSTEM, u) for u in users]
+    answers: Dict[str, ai_schemas.AIBossLoreResponse] = {}
+    sources: Dict[str, str] = {}
+
+    missing: List[str] = []
+    for key in dict.fromkeys(keys):
+        cached = await response_cache.get(key)
+        if cached is not None:
+            try:
+                answers[key] = _boss_lore_from(_parse_json(cached))
+                sources[key] = "llm"
+                if stats:
+                    stats.cache_hits += 1
+                continue
+            except (json.JSONDecodeError, KeyError, TypeError):
+                pass
+        missing.append(key)
+
+    if stats:
+        # Alag /ai/boss-lore calls mein ye items cache hit hote (refund) — yahan bhi
+        stats.unbilled_units += len(items) - len(missing)
+
+    if missing:
+        user_by_key = dict(zip(keys, users))
+        batch_user = "\n".join(
+            f"{n}. {user_by_key[key]}" for n, key in enumerate(missing, start=1)
+        )
+        content = await _call_llm(_BOSS_LORE_BATCH_SYSTEM, batch_user, "boss-lore-batch")
+        bosses: List[Any] = []
+        if content:
+            try:
+                bosses = _parse_json(content).get("bosses") or []
+            except (json.JSONDecodeError, AttributeError):
+                bosses = []
+        for key, boss in zip(missing, bosses):
+            try:
+                answers[key] = _boss_lore_from(boss)
+            except (KeyError, TypeError):
+                continue
+            sources[key] = "llm"
+            await response_cache.set(key, answers[key].model_dump_json())
+
+    # Model ne kam objects diye / kuch invalid — sirf un items ka heuristic
+    results = []
+    for item, key in zip(items, keys):
+        if key not in answers:
+            answers[key] = _boss_lore_fallback(item.taskText, item.subtaskCount)
+            sources[key] = "heuristic"
+        results.append(answers[key])
+        metrics.record_answer("boss-lore", sources[key])
+    return ai_schemas.AIBossLoreBatchResponse(items=results)
+
+
+def _briefing_prompt(
     todos: List[ai_schemas.TodoSummary], user_name: str
-) -> ai_schemas.AIBriefingResponse:
+) -> tuple[str, str]:
     incomplete = [t for t in todos if not t.done]
     bosses = [t for t in incomplete if t.subtaskCount > 0]
     overall_done = sum(1 for t in todos if t.done)
@@ -383,16 +792,26 @@ def ai_briefing(
         "Write a brief daily todo briefing. Max 3 sentences in summary. "
         'Return JSON: {"greeting": string, "summary": string, "topPriorities": string[], "encouragement": string}'
     )
-    payload = json.dumps(
-        {
-            "userName": user_name,
-            "incompleteCount": len(incomplete),
-            "bossCount": len(bosses),
-            "overallPercent": overall_pct,
-            "tasks": [_model_dump(t) for t in incomplete[:15]],
-        }
+    header = {
+        "userName": user_name,
+        "incompleteCount": len(incomplete),
+        "bossCount": len(bosses),
+        "overallPercent": overall_pct,
+    }
+    tasks = prompt_builder.fit_tasks(
+        incomplete,
+        _coach_score,
+        max_items=15,
+        token_budget=prompt_builder.payload_budget(system, prompt_builder.compact_json(header)),
     )
-    content = _call_llm(system, payload)
+    payload = prompt_builder.compact_json({**header, "tasks": tasks})
+    prompt_builder.report("briefing", system, payload, len(tasks), len(incomplete))
+    return system, payload
+
+
+def _briefing_result(
+    content: Optional[str], todos: List[ai_schemas.TodoSummary], user_name: str
+) -> ai_schemas.AIBriefingResponse:
     if content:
         try:
             data = _parse_json(content)
@@ -406,6 +825,11 @@ def ai_briefing(
         except (json.JSONDecodeError, KeyError, TypeError):
             pass
 
+    _note_fallback()
+    incomplete = [t for t in todos if not t.done]
+    bosses = [t for t in incomplete if t.subtaskCount > 0]
+    overall_done = sum(1 for t in todos if t.done)
+    overall_pct = round((overall_done / (len(todos) or 1)) * 100)
     top = sorted(
         incomplete,
         key=lambda t: (
@@ -428,40 +852,33 @@ def ai_briefing(
     )
 
 
-def ai_parse_task(text: str) -> ai_schemas.AIParseTaskResponse:
+@_instrumented("briefing")
+async def ai_briefing(
+    todos: List[ai_schemas.TodoSummary], user_name: str
+) -> ai_schemas.AIBriefingResponse:
+    system, payload = _briefing_prompt(todos, user_name)
+    content = await _call_llm(system, payload, "briefing")
+    return _briefing_result(content, todos, user_name)
+
+
+@_instrumented("parse-task")
+async def ai_parse_task(text: str) -> ai_schemas.AIParseTaskResponse:
     stripped = text.strip()
-    lower = stripped.lower()
 
-    nl_patterns = [
-        r"^(?:create|add|make)\s+(.+?)\s+with\s+(.+)$",
-        r"^(.+?)\s+with\s+(.+?)\s+subtasks?$",
-        r"^(.+?):\s*(.+)$",
-    ]
-    for pat in nl_patterns:
-        m = re.match(pat, stripped, re.IGNORECASE)
-        if m:
-            parent = m.group(1).strip(" .")
-            subs_raw = m.group(2)
-            subs = [
-                s.strip(" .")
-                for s in re.split(r"[,;]|(?:\band\b)", subs_raw, flags=re.IGNORECASE)
-                if s.strip()
-            ]
-            if parent and subs:
-                return ai_schemas.AIParseTaskResponse(
-                    parent=parent[:120],
-                    subtasks=[s[:200] for s in subs[:12]],
-                )
-
-    if lower.startswith("/ai "):
-        return ai_parse_task(stripped[4:].strip())
+    parsed = parse_task_rules(stripped)
+    if parsed is not None:
+        _note_fallback("rules")  # Regex se hi ho gaya, LLM call nahi
+        return parsed
+
+    if stripped[:4].lower() == "/ai ":
+        return await ai_parse_task(stripped[4:].strip())
 
     system = (
         "Parse natural language into a parent task and subtasks. "
         'Return JSON: {"parent": string, "subtasks": string[]}. '
         "If input is a single simple task with no subtasks, return subtasks as empty array."
     )
-    content = _call_llm(system, stripped)
+    content = await _call_llm(system, stripped, "parse-task")
     if content:
         try:
             data = _parse_json(content)
@@ -472,7 +889,8 @@ def ai_parse_task(text: str) -> ai_schemas.AIParseTaskResponse:
         except (json.JSONDecodeError, KeyError, TypeError):
             pass
 
-    split = _heuristic_split(stripped)
+    _note_fallback()
+    split = heuristic_split(stripped)
     if len(split.subtasks) >= 2:
         return ai_schemas.AIParseTaskResponse(
             parent=split.title, subtasks=split.subtasks
@@ -0,0 +1,173 @@
+import bisect
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+# Latency histogram bucket upper bounds (ms); last bucket = +Inf
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000, 20000]
+
+# Attempt outcomes (ek model call): ok / error / invalid (non-JSON) / timeout /
+# cancelled (hedge loser) / circuit_open
+# Request outcomes (_call_llm / stream): llm / cache_hit / coalesced / failed
+# Answer sources (ai_* function): llm / heuristic / rules
+
+
+class _Series:
+    __slots__ = ("count", "sum_ms", "buckets", "prompt_tokens", "completion_tokens")
+
+    def __init__(self):
+        self.count = 0
+        self.sum_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def observe(self, latency_ms: float, prompt_tokens: int = 0, completion_tokens: int = 0):
+        self.count += 1
+        self.sum_ms += latency_ms
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Bucket upper bound jisme q-th observation padi (Prometheus-style estimate)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else None
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avgMs": round(self.sum_ms / self.count, 1) if self.count else None,
+            "p50Ms": self.quantile(0.5),
+            "p95Ms": self.quantile(0.95),
+            "p99Ms": self.quantile(0.99),
+            "promptTokens": self.prompt_tokens,
+            "completionTokens": self.completion_tokens,
+        }
+
+
+# Attempt ka [prompt_tokens, completion_tokens] holder. Caller set karta hai, provider
+# record_usage() se bharta hai — list mutate hoti hai, isliye asyncio.wait_for ke alag
+# task (copied context) se bhi value caller tak pahunchti hai
+last_usage: ContextVar[Optional[List[int]]] = ContextVar("llm_last_usage", default=None)
+
+
+def record_usage(prompt_tokens: int, completion_tokens: int) -> None:
+    holder = last_usage.get()
+    if holder is not None:
+        holder[:] = [prompt_tokens, completion_tokens]
+
+
+class LLMMetrics:
+    """In-process LLM metrics: per (endpoint, provider, model, outcome) histograms + counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._attempts: Dict[Tuple[str, str, str, str], _Series] = {}
+        self._requests: Dict[Tuple[str, str], _Series] = {}
+        self._answers: Dict[Tuple[str, str], int] = {}
+
+    def record_attempt(
+        self,
+        endpoint: str,
+        provider: str,
+        model: str,
+        outcome: str,
+        latency_ms: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+    ) -> None:
+        key = (endpoint or "generic", provider, model, outcome)
+        with self._lock:
+            series = self._attempts.get(key)
+            if series is None:
+                series = self._attempts[key] = _Series()
+            series.observe(latency_ms, prompt_tokens, completion_tokens)
+
+    def record_request(self, endpoint: str, outcome: str, latency_ms: float) -> None:
+        key = (endpoint or "generic", outcome)
+        with self._lock:
+            series = self._requests.get(key)
+            if series is None:
+                series = self._requests[key] = _Series()
+            series.observe(latency_ms)
+
+    def record_answer(self, endpoint: str, source: str) -> None:
+        key = (endpoint or "generic", source)
+        with self._lock:
+            self._answers[key] = self._answers.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = [
+                {"endpoint": e, "provider": p, "model": m, "outcome": o, **s.to_dict()}
+                for (e, p, m, o), s in sorted(self._attempts.items())
+            ]
+            requests = [
+                {"endpoint": e, "outcome": o, **s.to_dict()}
+                for (e, o), s in sorted(self._requests.items())
+            ]
+            answers: Dict[str, Dict[str, Any]] = {}
+            for (endpoint, source), n in sorted(self._answers.items()):
+                answers.setdefault(endpoint, {})[source] = n
+        for counts in answers.values():
+            total = sum(counts.values())
+            counts["heuristicRate"] = round(counts.get("heuristic", 0) / total, 3)
+        return {"attempts": attempts, "requests": requests, "answers": answers}
+
+    def summary(self) -> Dict[str, Any]:
+        """/ai/status ke liye chhota view: endpoint-wise request count, p95, fallback rate."""
+        snap = self.snapshot()
+        out: Dict[str, Dict[str, Any]] = {}
+        for row in snap["requests"]:
+            entry = out.setdefault(row["endpoint"], {"requests": 0, "outcomes": {}})
+            entry["requests"] += row["count"]
+            entry["outcomes"][row["outcome"]] = row["count"]
+            if row["outcome"] == "llm":
+                entry["llmP95Ms"] = row["p95Ms"]
+        for endpoint, counts in snap["answers"].items():
+            out.setdefault(endpoint, {"requests": 0, "outcomes": {}})["heuristicRate"] = counts[
+                "heuristicRate"
+            ]
+        return out
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = [
+            "# TYPE llm_attempt_latency_ms histogram",
+        ]
+        with self._lock:
+            items = sorted(self._attempts.items())
+            requests = sorted(self._requests.items())
+            answers = sorted(self._answers.items())
+        for (endpoint, provider, model, outcome), s in items:
+            labels = (
+                f'endpoint="{endpoint}",provider="{provider}",model="{model}",outcome="{outcome}"'
+            )
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS_MS + ["+Inf"], s.buckets):
+                cumulative += n
+                lines.append(f'llm_attempt_latency_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"llm_attempt_latency_ms_sum{{{labels}}} {s.sum_ms:.1f}")
+            lines.append(f"llm_attempt_latency_ms_count{{{labels}}} {s.count}")
+            lines.append(f'llm_tokens_total{{{labels},type="prompt"}} {s.prompt_tokens}')
+            lines.append(f'llm_tokens_total{{{labels},type="completion"}} {s.completion_tokens}')
+        lines.append("# TYPE llm_requests_total counter")
+        for (endpoint, outcome), s in requests:
+            lines.append(
+                f'llm_requests_total{{endpoint="{endpoint}",outcome="{outcome}"}} {s.count}'
+            )
+        lines.append("# TYPE llm_answers_total counter")
+        for (endpoint, source), n in answers:
+            lines.append(f'llm_answers_total{{endpoint="{endpoint}",source="{source}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+# Global LLM Metrics
+metrics = LLMMetrics()
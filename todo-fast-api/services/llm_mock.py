@@ -0,0 +1,185 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from services.llm_metrics import record_usage
+
+# Offline load testing ke liye fake LLM (AI_PROVIDER=mock, ya scripts/mock_llm_server.py).
+#
+# Latency spec:  fixed:200 | uniform:100,400 | lognormal:300,0.5 (median ms, sigma)
+AI_MOCK_LATENCY = os.getenv("AI_MOCK_LATENCY", "lognormal:300,0.5")
+AI_MOCK_ERROR_RATE = float(os.getenv("AI_MOCK_ERROR_RATE", "0"))
+# Itne % calls hang ho jaate hain (AI_MOCK_TIMEOUT_SECONDS tak) phir fail
+AI_MOCK_TIMEOUT_RATE = float(os.getenv("AI_MOCK_TIMEOUT_RATE", "0"))
+AI_MOCK_TIMEOUT_SECONDS = float(os.getenv("AI_MOCK_TIMEOUT_SECONDS", "45"))
+# Itne % calls JSON ki jagah kachra text dete hain (parse fail / cache skip path)
+AI_MOCK_INVALID_RATE = float(os.getenv("AI_MOCK_INVALID_RATE", "0"))
+AI_MOCK_SEED = os.getenv("AI_MOCK_SEED")
+AI_MOCK_MODELS = [
+    m.strip() for m in os.getenv("AI_MOCK_MODELS", "mock-1,mock-2").split(",") if m.strip()
+]
+
+logger = logging.getLogger("llm_mock")
+
+_rng = random.Random(int(AI_MOCK_SEED)) if AI_MOCK_SEED else random.Random()
+
+
+class MockFailure(Exception):
+    pass
+
+
+# Per-model override, e.g. AI_MOCK_ERROR_RATE_MOCK_1=0.5 (fallback/breaker test)
+def _model_env(name: str, model: str, default: float) -> float:
+    key = f"{name}_{re.sub(r'[^A-Za-z0-9]', '_', model).upper()}"
+    return float(os.getenv(key, default))
+
+
+def sample_latency(spec: str = AI_MOCK_LATENCY) -> float:
+    """Seconds."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()]
+    if kind == "fixed":
+        return values[0] / 1000
+    if kind == "uniform":
+        return _rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal":
+        median, sigma = values[0], values[1] if len(values) > 1 else 0.5
+        return median * _rng.lognormvariate(0, sigma) / 1000
+    raise ValueError(f"Unknown AI_MOCK_LATENCY spec: {spec}")
+
+
+def detect_kind(system: str) -> str:
+    """HTTP stand-in ko kind nahi milta — system prompt se pehchano."""
+    lower = system.lower()
+    if "focus coach" in lower:
+        return "coach"
+    if "briefing" in lower:
+        return "briefing"
+    if "each numbered" in lower and "boss" in lower:
+        return "boss-lore-batch"
+    if "boss" in lower:
+        return "boss-lore"
+    if "breakdown" in lower:
+        return "split"
+    if "parse natural language" in lower:
+        return "parse-task"
+    return "generic"
+
+
+def _json_tasks(user: str) -> List[Dict[str, Any]]:
+    start = user.find("[")
+    if start < 0:
+        return []
+    try:
+        tasks = json.loads(user[start : user.rfind("]") + 1])
+    except ValueError:
+        try:
+            tasks = json.loads(user).get("tasks", [])
+        except (ValueError, AttributeError):
+            return []
+    return [t for t in tasks if isinstance(t, dict)]
+
+
+def _words(text: str, limit: int = 6) -> str:
+    return " ".join(re.findall(r"[\w']+", text)[:limit]) or "task"
+
+
+def mock_response(kind: str, user: str) -> Dict[str, Any]:
+    """Har prompt type ke response schema se match karta JSON."""
+    if kind == "coach":
+        tasks = _json_tasks(user)
+        pick = tasks[0] if tasks else {"id": 0, "text": "task"}
+        return {
+            "taskId": pick.get("id", 0),
+            "taskText": pick.get("text", ""),
+            "priorityMessage": f"Finish \"{pick.get('text', '')}\" first.",
+            "recommendation": "It is the highest-scoring open task.",
+            "completionPlan": ["Block 25 minutes.", "Do the first step.", "Mark it done."],
+            "estimatedMinutes": 25,
+            "prioritySuggestion": "high",
+        }
+    if kind == "briefing":
+        tasks = _json_tasks(user)
+        return {
+            "greeting": "Hello there.",
+            "summary": f"You have {len(tasks)} open tasks in view. Start with the first one.",
+            "topPriorities": [t.get("text", "") for t in tasks[:3]],
+            "encouragement": "Small steps add up.",
+        }
+    if kind == "boss-lore":
+        name = _words(user.split('"')[1] if '"' in user else user, 2).title()
+        return {
+            "bossName": f"The {name} Wyrm",
+            "taunt": "You will never finish me!",
+            "defeatMessage": f"The {name} Wyrm is defeated.",
+        }
+    if kind == "boss-lore-batch":
+        lines = [ln.split(". ", 1)[-1] for ln in user.splitlines() if ln.strip()]
+        return {"bosses": [mock_response("boss-lore", ln) for ln in lines]}
+    if kind == "split":
+        title = _words(user.split("\n", 1)[-1])
+        return {
+            "title": title,
+            "subtasks": [f"Plan {title}", f"Do {title}", f"Review {title}"],
+            "reasoning": "mock",
+        }
+    if kind == "parse-task":
+        return {"parent": _words(user), "subtasks": []}
+    return {"ok": True}
+
+
+def _outcome(model: str) -> str:
+    """ok / error / timeout / invalid — per-model rates override kar sakte ho."""
+    roll = _rng.random()
+    for name, default in (
+        ("AI_MOCK_ERROR_RATE", AI_MOCK_ERROR_RATE),
+        ("AI_MOCK_TIMEOUT_RATE", AI_MOCK_TIMEOUT_RATE),
+        ("AI_MOCK_INVALID_RATE", AI_MOCK_INVALID_RATE),
+    ):
+        rate = _model_env(name, model, default)
+        if roll < rate:
+            return name.split("_")[2].lower()
+        roll -= rate
+    return "ok"
+
+
+def plan_call(model: str, kind: str, user: str) -> tuple:
+    """(latency seconds, outcome, text) — in-process aur HTTP dono isi se chalte hain."""
+    outcome = _outcome(model)
+    if outcome == "timeout":
+        return AI_MOCK_TIMEOUT_SECONDS, outcome, None
+    latency = sample_latency()
+    if outcome == "error":
+        return latency, outcome, None
+    if outcome == "invalid":
+        return latency, outcome, "Sorry, I cannot help with that."
+    return latency, outcome, json.dumps(mock_response(kind, user))
+
+
+async def call_model(model: str, system: str, user: str, kind: str = "") -> Optional[str]:
+    latency, outcome, text = plan_call(model, kind or detect_kind(system), user)
+    await asyncio.sleep(latency)
+    if text is None:
+        logger.warning("Mock LLM %s (%s)", outcome, model)
+        return None
+    # Real providers usage batate hain; mock ~4 chars/token estimate deta hai
+    record_usage((len(system) + len(user)) // 4, len(text) // 4)
+    return text
+
+
+async def stream_model(model: str, system: str, user: str) -> AsyncIterator[str]:
+    latency, outcome, text = plan_call(model, detect_kind(system), user)
+    if text is None:
+        await asyncio.sleep(latency)
+        raise MockFailure(f"mock {outcome}")
+    # Pehla token ~latency ka 30% par, baaki chunks baraabar baant ke
+    chunks = [text[i : i + 16] for i in range(0, len(text), 16)]
+    await asyncio.sleep(latency * 0.3)
+    per_chunk = latency * 0.7 / max(1, len(chunks))
+    for chunk in chunks:
+        yield chunk
+        await asyncio.sleep(per_chunk)
@@ -0,0 +1,304 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from services.circuit_breaker import get_breaker
+from services.http_pool import get_client
+from services.llm_cache import make_key, response_cache
+from services.llm_metrics import metrics
+from services.prompt_builder import estimate_tokens
+import services.llm_client as llm
+
+logger = logging.getLogger("llm_stream")
+
+
+# --- Partial JSON: adhure stream se jitne fields ban sakein utne nikaalo ---
+
+
+def _close_partial(text: str) -> str:
+    """Khule strings / arrays / objects band kar do taaki json.loads try ho sake."""
+    stack: List[str] = []
+    in_str = False
+    escaped = False
+    for ch in text:
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch == "{":
+            stack.append("}")
+        elif ch == "[":
+            stack.append("]")
+        elif ch in "}]" and stack:
+            stack.pop()
+    if escaped:
+        text = text[:-1]
+    return text + ('"' if in_str else "") + "".join(reversed(stack))
+
+
+def _boundaries(text: str) -> List[int]:
+    """String ke bahar wale ',' '{' '[' — yahan tak kaat ke JSON valid ho sakta hai."""
+    cuts: List[int] = []
+    in_str = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_str:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_str = False
+        elif ch == '"':
+            in_str = True
+        elif ch == ",":
+            cuts.append(i)
+        elif ch in "{[":
+            cuts.append(i + 1)
+    return cuts
+
+
+def parse_partial(text: str) -> Optional[Dict[str, Any]]:
+    start = text.find("{")
+    if start < 0:
+        return None
+    text = text[start:]
+    candidates = [len(text)] + sorted(_boundaries(text), reverse=True)
+    # Pehle poora (strings band karke), phir peeche ke separators tak kaat ke
+    for cut in candidates[:8]:
+        try:
+            value = json.loads(_close_partial(text[:cut]))
+        except ValueError:
+            continue
+        return value if isinstance(value, dict) else None
+    return None
+
+
+class PartialJSON:
+    """Stream deltas feed karo; har baar sirf badle hue top-level fields milte hain."""
+
+    def __init__(self):
+        self._buf = ""
+        self._emitted: Dict[str, Any] = {}
+
+    def feed(self, delta: str) -> Optional[Dict[str, Any]]:
+        self._buf += delta
+        snapshot = parse_partial(self._buf)
+        if not snapshot:
+            return None
+        changed = {k: v for k, v in snapshot.items() if self._emitted.get(k) != v}
+        self._emitted.update(changed)
+        return changed or None
+
+
+# --- Provider token streams ---
+
+
+async def _stream_openai(model: str, system: str, user: str) -> AsyncIterator[str]:
+    client = llm._get_openai_client()
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ],
+        temperature=0.4,
+        max_tokens=800,
+        response_format={"type": "json_object"},
+        stream=True,
+    )
+    async for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
+
+
+async def _stream_gemini(model: str, system: str, user: str) -> AsyncIterator[str]:
+    url = f"{llm.GEMINI_BASE_URL}/models/{model}:streamGenerateContent"
+    async with get_client("gemini").stream(
+        "POST",
+        url,
+        params={"key": llm.GEMINI_API_KEY, "alt": "sse"},
+        json=llm._gemini_payload(system, user),
+    ) as resp:
+        if resp.status_code >= 400:
+            body = await resp.aread()
+            raise RuntimeError(f"Gemini HTTP error {resp.status_code}: {body[:300]!r}")
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = json.loads(line[5:].strip())
+            for candidate in (data.get("candidates") or [])[:1]:
+                for part in candidate.get("content", {}).get("parts") or []:
+                    if part.get("text"):
+                        yield part["text"]
+
+
+async def _stream_mock(model: str, system: str, user: str) -> AsyncIterator[str]:
+    from services import llm_mock
+
+    async for chunk in llm_mock.stream_model(model, system, user):
+        yield chunk
+
+
+_STREAMERS = {"openai": _stream_openai, "gemini": _stream_gemini, "mock": _stream_mock}
+
+
+def _stream_targets() -> List[tuple]:
+    provider = llm.get_provider()
+    if not provider.configured():
+        return []
+    stream_fn = _STREAMERS[provider.name]
+    return [(provider.name, model, stream_fn) for model in provider.models()]
+
+
+async def stream_text(system: str, user: str, kind: str = "") -> AsyncIterator[str]:
+    """
+    Provider ke tokens aate hi yield. Circuit breaker + fallback non-stream jaisa,
+    par sirf pehle token se pehle — text bhej diya to model switch nahi hota.
+    Poora stream AI_DEADLINE_SECONDS ke andar.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + llm.AI_DEADLINE_SECONDS
+
+    targets = _stream_targets()
+    launched = False
+    for provider, model, stream_fn in targets:
+        breaker = get_breaker(f"{provider}:{model}")
+        if not breaker.allow():
+            continue
+        launched = True
+        started = loop.time()
+        yielded = False
+        chars = 0
+        agen = stream_fn(model, system, user)
+
+        def observe(outcome: str) -> None:
+            # Stream mein provider usage nahi milta — ~4 chars/token estimate
+            metrics.record_attempt(
+                kind,
+                provider,
+                model,
+                outcome,
+                (loop.time() - started) * 1000,
+                estimate_tokens(system) + estimate_tokens(user),
+                chars // 4,
+            )
+
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                try:
+                    delta = await asyncio.wait_for(agen.__anext__(), remaining)
+                except StopAsyncIteration:
+                    break
+                yielded = True
+                chars += len(delta)
+                yield delta
+        except (asyncio.CancelledError, GeneratorExit):
+            # Client disconnect — model ki galti nahi
+            breaker.release_probe()
+            observe("cancelled")
+            raise
+        except Exception as exc:
+            logger.warning("%s stream failed (%s): %r", provider, model, exc)
+            breaker.record(False, loop.time() - started)
+            observe("error")
+            if yielded or loop.time() >= deadline:
+                return
+            continue
+        finally:
+            await agen.aclose()
+        breaker.record(yielded, loop.time() - started)
+        observe("ok" if yielded else "error")
+        return
+
+    if targets and not launched:
+        metrics.record_attempt(kind, targets[0][0], "*", "circuit_open", 0.0)
+
+
+# --- SSE ---
+
+
+def sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def stream_events(
+    system: str,
+    user: str,
+    finalize: Callable[[Optional[str]], BaseModel],
+    stats: "llm.LLMCallStats",
+    kind: str = "",
+) -> AsyncIterator[str]:
+    """
+    `partial` events (badle hue fields, provider ke tokens ke saath),
+    phir ek `final` event — response model se validated (ya heuristic fallback).
+    Cache non-stream routes ke saath shared hai.
+    """
+    started = time.perf_counter()
+    key = make_key(llm.AI_PROVIDER, llm.AI_MODEL, system, user)
+    cached = await response_cache.get(key)
+    if cached is not None:
+        stats.cache_hits += 1
+        metrics.record_request(kind, "cache_hit", (time.perf_counter() - started) * 1000)
+        yield sse("final", _finalize(kind, finalize, cached))
+        return
+
+    stats.provider_calls += 1
+    chunks: List[str] = []
+    partial = PartialJSON()
+    async for delta in stream_text(system, user, kind):
+        chunks.append(delta)
+        changed = partial.feed(delta)
+        if changed:
+            yield sse("partial", changed)
+
+    content = "".join(chunks) or None
+    ok = content is not None and llm._is_json(content)
+    if ok:
+        await response_cache.set(key, content)
+    metrics.record_request(kind, "llm" if ok else "failed", (time.perf_counter() - started) * 1000)
+    yield sse("final", _finalize(kind, finalize, content))
+
+
+def _finalize(kind: str, finalize: Callable[[Optional[str]], BaseModel], content) -> Dict[str, Any]:
+    # Non-stream ai_* jaisa answer-source metric (heuristic fallback rate)
+    holder: List[str] = []
+    token = llm._answer_source.set(holder)
+    try:
+        result = finalize(content)
+    finally:
+        llm._answer_source.reset(token)
+    metrics.record_answer(kind, holder[-1] if holder else "llm")
+    return result.model_dump()
+
+
+def briefing_events(todos, user_name: str, stats) -> AsyncIterator[str]:
+    system, payload = llm._briefing_prompt(todos, user_name)
+    return stream_events(
+        system, payload, lambda c: llm._briefing_result(c, todos, user_name), stats, "briefing"
+    )
+
+
+def coach_events(todos, focus_task_id: Optional[int], stats) -> AsyncIterator[str]:
+    # ValueError (no incomplete tasks) yahin raise — stream shuru hone se pehle 400
+    incomplete = llm._incomplete_or_raise(todos)
+    system, user_msg = llm._coach_prompt(incomplete, focus_task_id)
+    return stream_events(
+        system,
+        user_msg,
+        lambda c: llm._coach_result(c, incomplete, focus_task_id),
+        stats,
+        "coach",
+    )
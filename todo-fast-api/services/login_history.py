@@ -0,0 +1,163 @@
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from modal.user import LoginHistory, LoginHistoryArchive, LoginRollup, LoginStatus
+
+# Hot table mein itne din ki history rahegi, uske baad archive mein jaati hai
+LOGIN_HISTORY_RETENTION_DAYS = int(os.getenv("LOGIN_HISTORY_RETENTION_DAYS", "90"))
+# Archive se bhi purge karna ho to set karo (0 = archive kabhi purge nahi hota)
+LOGIN_ARCHIVE_RETENTION_DAYS = int(os.getenv("LOGIN_ARCHIVE_RETENTION_DAYS", "0"))
+LOGIN_RETENTION_BATCH_SIZE = int(os.getenv("LOGIN_RETENTION_BATCH_SIZE", "5000"))
+
+_ROLLUP_COLUMNS = {
+    LoginStatus.SUCCESS.value: LoginRollup.success_count,
+    LoginStatus.FAILED.value: LoginRollup.failed_count,
+    LoginStatus.MFA_PENDING.value: LoginRollup.mfa_pending_count,
+}
+
+
+def _bump_rollup(db: Session, user_id: int, day: date, status: str) -> None:
+    column = _ROLLUP_COLUMNS.get(status)
+    if column is None:
+        return
+
+    # Atomic increment; row pehli login par hi banti hai
+    updated = (
+        db.query(LoginRollup)
+        .filter(LoginRollup.user_id == user_id, LoginRollup.day == day)
+        .update({column: column + 1}, synchronize_session=False)
+    )
+    if updated:
+        return
+
+    counts = {c.key: 0 for c in _ROLLUP_COLUMNS.values()}
+    counts[column.key] = 1
+    try:
+        with db.begin_nested():
+            db.add(LoginRollup(user_id=user_id, day=day, **counts))
+    except IntegrityError:
+        # Kisi aur worker ne isi beech row bana di, ab update chal jayega
+        db.query(LoginRollup).filter(
+            LoginRollup.user_id == user_id, LoginRollup.day == day
+        ).update({column: column + 1}, synchronize_session=False)
+
+
+def record_login(
+    db: Session,
+    user_id: int,
+    status: str,
+    ip_address: Optional[str] = None,
+    user_agent: Optional[str] = None,
+) -> None:
+    """History row aur us din ka rollup ek hi transaction mein likhta hai."""
+    now = datetime.utcnow()
+    db.add(
+        LoginHistory(
+            user_id=user_id,
+            ip_address=ip_address,
+            user_agent=user_agent,
+            status=status,
+            timestamp=now,
+        )
+    )
+    _bump_rollup(db, user_id, now.date(), status)
+    db.commit()
+
+
+def get_login_stats(db: Session, user_id: int, days: int = 30) -> Dict[str, Any]:
+    since = datetime.utcnow().date() - timedelta(days=max(days, 1) - 1)
+    rows = (
+        db.query(LoginRollup)
+        .filter(LoginRollup.user_id == user_id, LoginRollup.day >= since)
+        .order_by(LoginRollup.day.desc())
+        .all()
+    )
+
+    daily = [
+        {
+            "day": row.day.isoformat(),
+            "success": row.success_count,
+            "failed": row.failed_count,
+            "mfaPending": row.mfa_pending_count,
+        }
+        for row in rows
+    ]
+    totals = {
+        "success": sum(d["success"] for d in daily),
+        "failed": sum(d["failed"] for d in daily),
+        "mfaPending": sum(d["mfaPending"] for d in daily),
+    }
+    return {"userId": user_id, "days": days, "totals": totals, "daily": daily}
+
+
+def archive_login_history(
+    db: Session,
+    retention_days: int = LOGIN_HISTORY_RETENTION_DAYS,
+    archive_retention_days: int = LOGIN_ARCHIVE_RETENTION_DAYS,
+    batch_size: int = LOGIN_RETENTION_BATCH_SIZE,
+) -> Dict[str, int]:
+    """
+    Rolling archive: cutoff se purani rows batches mein LoginHistoryArchive mein
+    move hoti hain. Har batch alag commit hai taaki hot table par lock lamba na chale.
+    Rollups touch nahi hote, isliye stats archive ke baad bhi sahi rehte hain.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    archived = 0
+
+    while True:
+        batch = (
+            db.query(LoginHistory)
+            .filter(LoginHistory.timestamp < cutoff)
+            .order_by(LoginHistory.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+
+        now = datetime.utcnow()
+        db.bulk_insert_mappings(
+            LoginHistoryArchive,
+            [
+                {
+                    "id": row.id,
+                    "user_id": row.user_id,
+                    "ip_address": row.ip_address,
+                    "user_agent": row.user_agent,
+                    "timestamp": row.timestamp,
+                    "status": row.status,
+                    "archived_at": now,
+                }
+                for row in batch
+            ],
+        )
+        db.query(LoginHistory).filter(
+            LoginHistory.id.in_([row.id for row in batch])
+        ).delete(synchronize_session=False)
+        db.commit()
+        db.expunge_all()
+        archived += len(batch)
+
+    purged = 0
+    if archive_retention_days > 0:
+        purge_cutoff = datetime.utcnow() - timedelta(days=archive_retention_days)
+        purged = (
+            db.query(LoginHistoryArchive)
+            .filter(LoginHistoryArchive.timestamp < purge_cutoff)
+            .delete(synchronize_session=False)
+        )
+        db.commit()
+
+    return {"archived": archived, "purged": purged}
+
+
+def count_login_history(db: Session) -> Dict[str, int]:
+    return {
+        "live": db.query(func.count(LoginHistory.id)).scalar() or 0,
+        "archived": db.query(func.count(LoginHistoryArchive.id)).scalar() or 0,
+    }
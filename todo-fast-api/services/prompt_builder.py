@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Sequence
+
+import schema.ai as ai_schemas
+
+logger = logging.getLogger("prompt_builder")
+
+# System + user prompt ka token budget (estimate: ~4 chars per token)
+AI_PROMPT_TOKEN_BUDGET = int(os.getenv("AI_PROMPT_TOKEN_BUDGET", "1500"))
+# Task text / parentText isse lambe hon to kaat do
+AI_PROMPT_MAX_TEXT_CHARS = int(os.getenv("AI_PROMPT_MAX_TEXT_CHARS", "200"))
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def compact_json(value: Any) -> str:
+    # Default separators har item par ", " / ": " — bekaar tokens
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def compact_task(
+    t: ai_schemas.TodoSummary, max_text: int = AI_PROMPT_MAX_TEXT_CHARS
+) -> Dict[str, Any]:
+    """Sirf kaam ke fields: nulls, done=False aur subtaskCount=0 hata do, text kaat do."""
+    item: Dict[str, Any] = {"id": t.id, "text": _truncate(t.text, max_text)}
+    if t.priority:
+        item["priority"] = t.priority
+    if t.subtaskCount:
+        item["subtaskCount"] = t.subtaskCount
+    if t.parentText:
+        item["parentText"] = _truncate(t.parentText, max_text)
+    if t.progress is not None:
+        item["progress"] = t.progress
+    if t.bossHp is not None:
+        item["bossHp"] = t.bossHp
+    return item
+
+
+def fit_tasks(
+    todos: Sequence[ai_schemas.TodoSummary],
+    score: Callable[[ai_schemas.TodoSummary], float],
+    max_items: int,
+    token_budget: int,
+) -> List[Dict[str, Any]]:
+    """
+    Score ke hisaab se best tasks pehle; budget bhar jaye to ruk jao.
+    Kam se kam ek task hamesha jaata hai.
+    """
+    ranked = sorted(todos, key=score, reverse=True)[:max_items]
+    char_budget = token_budget * CHARS_PER_TOKEN
+    used = 2  # "[]"
+    selected: List[Dict[str, Any]] = []
+    for t in ranked:
+        item = compact_task(t)
+        cost = len(compact_json(item)) + 1
+        if selected and used + cost > char_budget:
+            break
+        selected.append(item)
+        used += cost
+    return selected
+
+
+def payload_budget(system: str, overhead: str = "") -> int:
+    """System prompt aur fixed text ke baad tasks ke liye kitne tokens bache."""
+    return max(1, AI_PROMPT_TOKEN_BUDGET - estimate_tokens(system) - estimate_tokens(overhead))
+
+
+class PromptSizeStats:
+    """Per-kind prompt size: calls, tokens (avg/max), kitne tasks budget se bahar rahe."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_kind: Dict[str, Dict[str, int]] = {}
+
+    def record(self, kind: str, tokens: int, dropped: int) -> None:
+        with self._lock:
+            s = self._by_kind.setdefault(
+                kind, {"calls": 0, "tokens": 0, "maxTokens": 0, "tasksDropped": 0}
+            )
+            s["calls"] += 1
+            s["tokens"] += tokens
+            s["maxTokens"] = max(s["maxTokens"], tokens)
+            s["tasksDropped"] += dropped
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                kind: {
+                    "calls": s["calls"],
+                    "avgTokens": round(s["tokens"] / s["calls"], 1),
+                    "maxTokens": s["maxTokens"],
+                    "tasksDropped": s["tasksDropped"],
+                }
+                for kind, s in self._by_kind.items()
+            }
+
+
+prompt_stats = PromptSizeStats()
+
+
+def report(kind: str, system: str, user: str, included: int, total: int) -> int:
+    tokens = estimate_tokens(system) + estimate_tokens(user)
+    prompt_stats.record(kind, tokens, total - included)
+    logger.info(
+        "prompt %s: ~%d tokens (budget %d), tasks %d/%d",
+        kind, tokens, AI_PROMPT_TOKEN_BUDGET, included, total,
+    )
+    return tokens
@@ -0,0 +1,237 @@
+import codecs
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import secrets
+import string
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import modal.user as user_models
+import schema.user as user_schemas
+from services.email_outbox import outbox, queue_emails
+from utils import get_password_hash
+from utils_email import WELCOME_SUBJECT, welcome_email_html
+
+logger = logging.getLogger("user_provisioning")
+
+# Ek DB transaction / duplicate-check IN (...) / hash map mein kitni rows
+BULK_USER_CHUNK_SIZE = int(os.getenv("BULK_USER_CHUNK_SIZE", "500"))
+BULK_USER_MAX_ROWS = int(os.getenv("BULK_USER_MAX_ROWS", "20000"))
+# Upload size cap; itne tak memory mein, upar disk par spool
+BULK_USER_MAX_BYTES = int(os.getenv("BULK_USER_MAX_BYTES", str(20 * 1024 * 1024)))
+# bcrypt CPU-bound hai — processes, threads nahi (GIL). 0 = os.cpu_count()
+BULK_HASH_WORKERS = int(os.getenv("BULK_HASH_WORKERS", "0")) or os.cpu_count() or 1
+
+CREATED = "created"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+FAILED = "failed"
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # fork nahi: app process mein outbox/job threads chal rahe hain,
+                # fork hue child unke held locks par deadlock ho sakte hain
+                _pool = ProcessPoolExecutor(
+                    max_workers=BULK_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                )
+    return _pool
+
+
+def shutdown_hash_pool() -> None:
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+_PASSWORD_ALPHABET = string.ascii_letters + string.digits
+
+
+def temp_password() -> str:
+    # Credentials hain — CSPRNG (secrets), random module nahi
+    return "".join(secrets.choice(_PASSWORD_ALPHABET) for _ in range(10))
+
+
+def iter_rows(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """(row number, raw dict ya parse error string) — file ek pass mein, line by line."""
+    text = codecs.getreader("utf-8-sig")(stream, errors="replace")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for n, record in enumerate(reader, start=1):
+            # Khaali cell = key hi nahi, taaki BulkUserRow ke defaults (role=USER) lagein
+            yield n, {
+                k.strip().lower(): v.strip() for k, v in record.items() if k and v and v.strip()
+            }
+        return
+    for n, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield n, f"Invalid JSON: {exc}"
+            continue
+        yield n, record if isinstance(record, dict) else "Row must be a JSON object"
+
+
+def _chunks(rows: Iterator[Tuple[int, Any]], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    chunk: List[Tuple[int, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _result(n: int, email: Optional[str], status: str, error: str) -> Dict[str, Any]:
+    return {"row": n, "email": email, "status": status, "error": error}
+
+
+def _welcome(row: user_schemas.BulkUserRow, password: str) -> Dict[str, str]:
+    return {
+        "to_address": row.email,
+        "subject": WELCOME_SUBJECT,
+        "body": welcome_email_html(row.email, password),
+    }
+
+
+def _existing_emails(db: Session, emails: List[str]) -> set:
+    if not emails:
+        return set()
+    return {
+        email
+        for (email,) in db.query(user_models.User.email).filter(
+            user_models.User.email.in_(emails)
+        )
+    }
+
+
+def provision_users(db: Session, stream: IO[bytes], fmt: str) -> Dict[str, Any]:
+    """
+    Bulk import: har chunk par ek set-based duplicate check, process pool mein
+    hashing, ek batch INSERT ... RETURNING, aur welcome mails usi commit mein
+    outbox mein. Har row ka result (created / duplicate / invalid / failed).
+    """
+    results: List[Dict[str, Any]] = []
+    seen: set = set()
+    pool = get_hash_pool()
+
+    for chunk in _chunks(iter_rows(stream, fmt), BULK_USER_CHUNK_SIZE):
+        valid: List[Tuple[int, user_schemas.BulkUserRow]] = []
+        truncated = False
+        for n, record in chunk:
+            if n > BULK_USER_MAX_ROWS:
+                limit = f"Row limit {BULK_USER_MAX_ROWS} exceeded; rest skipped"
+                results.append(_result(n, None, INVALID, limit))
+                truncated = True
+                break
+            if isinstance(record, str):
+                results.append(_result(n, None, INVALID, record))
+                continue
+            try:
+                row = user_schemas.BulkUserRow.model_validate(record)
+            except ValidationError as exc:
+                error = "; ".join(
+                    f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors()
+                )
+                results.append(_result(n, record.get("email"), INVALID, error))
+                continue
+            if row.email in seen:
+                results.append(_result(n, row.email, DUPLICATE, "Repeated in upload"))
+                continue
+            seen.add(row.email)
+            valid.append((n, row))
+
+        existing = _existing_emails(db, [row.email for _, row in valid])
+        fresh = []
+        for n, row in valid:
+            if row.email in existing:
+                results.append(_result(n, row.email, DUPLICATE, "User already exists"))
+            else:
+                fresh.append((n, row))
+
+        if fresh:
+            passwords = [temp_password() for _ in fresh]
+            # chunksize: har worker ko ek baar mein kai hashes — IPC overhead kam
+            chunksize = max(1, len(passwords) // (4 * BULK_HASH_WORKERS))
+            hashes = list(pool.map(get_password_hash, passwords, chunksize=chunksize))
+            results.extend(_insert_chunk(db, fresh, passwords, hashes))
+        if truncated:
+            break
+
+    created = sum(1 for r in results if r["status"] == CREATED)
+    if created:
+        outbox.notify()
+    results.sort(key=lambda r: r["row"])
+    summary = {status: 0 for status in (CREATED, DUPLICATE, INVALID, FAILED)}
+    for r in results:
+        summary[r["status"]] += 1
+    return {"total": len(results), **summary, "results": results}
+
+
+def _insert_chunk(
+    db: Session,
+    fresh: List[Tuple[int, user_schemas.BulkUserRow]],
+    passwords: List[str],
+    hashes: List[str],
+) -> List[Dict[str, Any]]:
+    values = [
+        {"email": row.email, "password": hashed, "name": row.name, "role": row.role.value}
+        for (_, row), hashed in zip(fresh, hashes)
+    ]
+    try:
+        # SQLAlchemy 2 "insertmanyvalues": batched multi-row INSERT, ids RETURNING se
+        ids = {
+            email: user_id
+            for user_id, email in db.execute(
+                insert(user_models.User).returning(user_models.User.id, user_models.User.email),
+                values,
+            )
+        }
+        queue_emails(db, [_welcome(row, p) for (_, row), p in zip(fresh, passwords)])
+        db.commit()
+    except IntegrityError:
+        # Check aur insert ke beech kisi ne same email bana di — ye chunk row by row
+        db.rollback()
+        return [_insert_one(db, n, row, p, h) for (n, row), p, h in zip(fresh, passwords, hashes)]
+    return [
+        {"row": n, "email": row.email, "status": CREATED, "userId": ids.get(row.email)}
+        for n, row in fresh
+    ]
+
+
+def _insert_one(
+    db: Session, n: int, row: user_schemas.BulkUserRow, password: str, hashed: str
+) -> Dict[str, Any]:
+    user = user_models.User(email=row.email, password=hashed, name=row.name, role=row.role.value)
+    db.add(user)
+    queue_emails(db, [_welcome(row, password)])
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return _result(n, row.email, DUPLICATE, "User already exists")
+    except Exception as exc:
+        db.rollback()
+        logger.warning("Bulk user row %d failed: %s", n, exc)
+        return _result(n, row.email, FAILED, str(exc)[:200])
+    return {"row": n, "email": row.email, "status": CREATED, "userId": user.id}
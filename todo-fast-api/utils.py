@@ -1,4 +1,4 @@
-from passlib.context import CryptContext
+from functools import lru_cache
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from typing import Optional
@@ -19,20 +19,28 @@ SECRET_KEY = os.getenv(
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 5760  # 4 Days (4 * 24 * 60)
 
+
 # Password hashing setup (bcrypt use kar rahe hain)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Lazy: passlib + bcrypt backend pehle login/register par load hota hai, import par nahi
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
 # OAuth2 scheme: Ye batata hai ki token kahan se milega ("token" route se for Swagger UI)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
 # Password verify karne ke liye helper
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 # Password ko hash karne ke liye helper
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 # JWT Token generate karne ka function
@@ -1,25 +1,34 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
+from functools import lru_cache
 from pydantic import EmailStr
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=os.getenv("MAIL_USERNAME", "user@example.com"),
-    MAIL_PASSWORD=os.getenv("MAIL_PASSWORD", "password"),
-    MAIL_FROM=os.getenv("MAIL_FROM", "noreply@todoapp.com"),
-    MAIL_PORT=int(os.getenv("MAIL_PORT", 587)),
-    MAIL_SERVER=os.getenv("MAIL_SERVER", "smtp.gmail.com"),
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
-    VALIDATE_CERTS=True,
-)
 
+# fastapi_mail heavy import hai (email validators, jinja); pehli email par hi load hota hai
+@lru_cache(maxsize=1)
+def get_mail_config():
+    from fastapi_mail import ConnectionConfig
 
-async def send_welcome_email(email: EmailStr, password: str):
-    html = f"""
+    return ConnectionConfig(
+        MAIL_USERNAME=os.getenv("MAIL_USERNAME", "user@example.com"),
+        MAIL_PASSWORD=os.getenv("MAIL_PASSWORD", "password"),
+        MAIL_FROM=os.getenv("MAIL_FROM", "noreply@todoapp.com"),
+        MAIL_PORT=int(os.getenv("MAIL_PORT", 587)),
+        MAIL_SERVER=os.getenv("MAIL_SERVER", "smtp.gmail.com"),
+        MAIL_STARTTLS=True,
+        MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=True,
+        VALIDATE_CERTS=True,
+    )
+
+
+WELCOME_SUBJECT = "Welcome to Todo App - Your Credentials"
+
+
+def welcome_email_html(email: str, password: str) -> str:
+    return f"""
     <h3>Welcome to Todo App</h3>
     <p>Your account has been created by the administrator.</p>
     <p><b>Username:</b> {email}</p>
@@ -27,23 +36,23 @@ async def send_welcome_email(email: EmailStr, password: str):
     <p>Please login and change your password immediately.</p>
     """
 
-    message = MessageSchema(
-        subject="Welcome to Todo App - Your Credentials",
-        recipients=[email],
-        body=html,
-        subtype=MessageType.html,
-    )
 
-    fm = FastMail(conf)
-    try:
-        await fm.send_message(message)
-        return True
-    except Exception as e:
-        print(f"Error sending email: {e}")
-        return False
+PASSWORD_RESET_SUBJECT = "Todo App - Your Password Was Reset"
+
+
+def password_reset_email_html(email: str, password: str) -> str:
+    return f"""
+    <h3>Password Reset</h3>
+    <p>The administrator has reset your password.</p>
+    <p><b>Username:</b> {email}</p>
+    <p><b>Temporary Password:</b> {password}</p>
+    <p>Please login and change your password immediately.</p>
+    """
 
 
 async def send_otp_email(email: EmailStr, otp: str):
+    from fastapi_mail import FastMail, MessageSchema, MessageType
+
     html = f"""
     <h3>OTP Verification</h3>
     <p>Your OTP for login is: <b>{otp}</b></p>
@@ -57,7 +66,7 @@ async def send_otp_email(email: EmailStr, otp: str):
         subtype=MessageType.html,
     )
 
-    fm = FastMail(conf)
+    fm = FastMail(get_mail_config())
     try:
         await fm.send_message(message)
         return True